@@ -1,6 +1,7 @@
-from fastapi import Header, HTTPException, status
+from fastapi import Header, HTTPException, Request, status
 from typing import Optional
 
+from common.services.agent_registry import AgentRegistry
 from core.config import settings
 from core.logger import get_logger
 
@@ -46,4 +47,25 @@ async def get_current_user():
     """
     # En una implementación completa, esta función verificaría tokens JWT
     # o algún otro mecanismo de autenticación.
-    return {"id": "demo_user", "role": "admin"}
\ No newline at end of file
+    return {"id": "demo_user", "role": "admin"}
+
+
+def get_agent_registry(request: Request) -> AgentRegistry:
+    """
+    Dependencia para obtener el registro de agentes de la aplicación.
+    
+    El registro se crea en el lifespan de la aplicación; si no existe
+    (por ejemplo, en un TestClient sin lifespan), se crea de forma perezosa.
+    
+    Args:
+        request: Petición actual
+        
+    Returns:
+        AgentRegistry: Registro compartido de agentes y clientes LLM
+    """
+    registry = getattr(request.app.state, "agent_registry", None)
+    if registry is None:
+        registry = AgentRegistry()
+        request.app.state.agent_registry = registry
+        logger.warning("Registro de agentes creado fuera del lifespan de la aplicación")
+    return registry
@@ -0,0 +1,65 @@
+from typing import Callable, Coroutine, Any
+import time
+
+from fastapi import HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+
+from core.metrics import (
+    errors_total,
+    exception_name,
+    http_request_duration_seconds,
+    http_requests_in_flight
+)
+
+
+class MetricsRoute(APIRoute):
+    """
+    Ruta que mide la latencia, las peticiones en curso y los errores.
+
+    Se activa con APIRouter(route_class=MetricsRoute). La ruta se etiqueta con
+    su plantilla (por ejemplo, "/api/v1/linkedin/authors/{author_id}") para no
+    crear una serie por cada valor de los parámetros. En las respuestas en
+    streaming la latencia llega hasta el inicio de la respuesta; la duración
+    de la generación se mide en el histograma de llamadas al modelo.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        """
+        Envuelve el handler de la ruta con la instrumentación.
+
+        Returns:
+            Callable: Handler instrumentado
+        """
+        handler = super().get_route_handler()
+        route = self.path_format
+
+        async def instrumented_handler(request: Request) -> Response:
+            started_at = time.perf_counter()
+            status_code = 500
+            http_requests_in_flight.inc(route=route)
+            try:
+                response = await handler(request)
+                status_code = response.status_code
+                return response
+            except HTTPException as e:
+                status_code = e.status_code
+                if status_code >= 500:
+                    errors_total.inc(component="http", exception=exception_name(e))
+                raise
+            except RequestValidationError:
+                status_code = 422
+                raise
+            except Exception as e:
+                errors_total.inc(component="http", exception=exception_name(e))
+                raise
+            finally:
+                http_requests_in_flight.dec(route=route)
+                http_request_duration_seconds.observe(
+                    time.perf_counter() - started_at,
+                    method=request.method,
+                    route=route,
+                    status=str(status_code)
+                )
+
+        return instrumented_handler
@@ -1,18 +1,66 @@
 
-from fastapi import FastAPI, Depends
+from contextlib import asynccontextmanager
+import asyncio
+
+from fastapi import FastAPI, Depends, Response
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 from core.config import settings
-from core.logger import app_logger
+from core.logger import app_logger, get_logging_stats
+from core.metrics import metrics_registry, CONTENT_TYPE as METRICS_CONTENT_TYPE
 from api.router import api_router
+from api.dependencies import get_agent_registry
+from api.middleware import RequestIDMiddleware, REQUEST_ID_HEADER
+from common.services.agent_registry import AgentRegistry
+from common.services.url_fetcher import url_fetcher
+from common.services.pdf_extraction import pdf_extraction_pool
+from common.services.prompt_cache_stats import prompt_cache_stats
+from common.services.response_cache import response_cache
+from common.services.semantic_cache import linkedin_draft_cache
+from common.services.rate_limiter import llm_rate_limiter
+from common.services.single_flight import llm_single_flight
+from common.utils.helpers import token_counter
+
+
+# Manejo del ciclo de vida
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Gestiona los recursos compartidos durante el ciclo de vida de la aplicación."""
+    app_logger.info("Iniciando aplicación...")
+    # Verificar configuraciones críticas
+    if not settings.OPENAI_API_KEY:
+        app_logger.warning("API Key de OpenAI no configurada. Algunas funcionalidades pueden no estar disponibles.")
+    
+    # Registro de agentes y clientes LLM compartidos por todas las peticiones
+    app.state.agent_registry = AgentRegistry()
+    
+    # Procesos para la extracción de texto de PDFs
+    pdf_extraction_pool.start()
+    
+    # Precargar los codificadores de tokens para no penalizar la primera petición
+    try:
+        await asyncio.to_thread(token_counter.warm_up, [settings.OPENAI_MODEL, *settings.tokenizer_warmup_models])
+    except Exception as e:
+        app_logger.warning(f"No se pudieron precargar los codificadores de tokens: {str(e)}")
+    
+    app_logger.info(f"Aplicación configurada en: {settings.HOST}:{settings.PORT}")
+    
+    yield
+    
+    app_logger.info("Cerrando aplicación...")
+    await app.state.agent_registry.close()
+    await url_fetcher.close()
+    pdf_extraction_pool.shutdown()
+
 
 # Crear aplicación FastAPI
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description=settings.PROJECT_DESCRIPTION,
     version=settings.PROJECT_VERSION,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 # Configurar CORS
@@ -22,26 +70,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[REQUEST_ID_HEADER],
 )
 
+# Identificador de correlación por petición (se añade el último para envolver al resto)
+app.add_middleware(RequestIDMiddleware)
+
 # Incluir rutas API
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
-# Manejo de eventos
-@app.on_event("startup")
-async def startup_event():
-    app_logger.info("Iniciando aplicación...")
-    # Verificar configuraciones críticas
-    if not settings.OPENAI_API_KEY:
-        app_logger.warning("API Key de OpenAI no configurada. Algunas funcionalidades pueden no estar disponibles.")
-    
-    app_logger.info(f"Aplicación configurada en: {settings.HOST}:{settings.PORT}")
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    app_logger.info("Cerrando aplicación...")
-
 
 @app.get("/")
 async def root():
@@ -54,9 +91,26 @@ async def root():
 
 
 @app.get("/health")
-async def health_check():
+async def health_check(registry: AgentRegistry = Depends(get_agent_registry)):
     """Endpoint para verificar el estado de la API."""
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "agent_pool": registry.get_stats(),
+        "url_fetcher": url_fetcher.get_stats(),
+        "pdf_extraction": pdf_extraction_pool.get_stats(),
+        "prompt_cache": prompt_cache_stats.get_stats(),
+        "llm_single_flight": llm_single_flight.get_stats(),
+        "llm_rate_limiter": llm_rate_limiter.get_stats(),
+        "response_cache": response_cache.get_stats() if response_cache is not None else None,
+        "linkedin_drafts": linkedin_draft_cache.get_stats() if linkedin_draft_cache is not None else None,
+        "logging": get_logging_stats()
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    """Endpoint con las métricas de la aplicación en formato de texto de Prometheus."""
+    return Response(content=metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,65 @@
+from uuid import uuid4
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.request_context import request_id_var
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Longitud máxima aceptada para un identificador enviado por el cliente
+MAX_REQUEST_ID_LENGTH = 128
+
+
+class RequestIDMiddleware:
+    """
+    Asigna un identificador de correlación a cada petición HTTP.
+
+    Reutiliza la cabecera X-Request-ID si el cliente la envía (y es válida) o
+    genera una nueva, la expone a los logs a través de request_id_var y la
+    devuelve en la respuesta. Es un middleware ASGI puro para no interferir
+    con las respuestas en streaming.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """
+        Inicializa el middleware.
+
+        Args:
+            app: Aplicación ASGI envuelta
+        """
+        self.app = app
+
+    @staticmethod
+    def _resolve_request_id(scope: Scope) -> str:
+        """
+        Obtiene el identificador de la petición o genera uno nuevo.
+
+        Args:
+            scope: Scope ASGI de la petición
+
+        Returns:
+            str: Identificador de la petición
+        """
+        request_id = Headers(scope=scope).get(REQUEST_ID_HEADER)
+        if request_id and len(request_id) <= MAX_REQUEST_ID_LENGTH and request_id.isprintable():
+            return request_id
+        return uuid4().hex
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = self._resolve_request_id(scope)
+        token = request_id_var.set(request_id)
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[REQUEST_ID_HEADER] = request_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
@@ -1,7 +1,7 @@
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Union, Tuple, AsyncIterator
 import json
 
-from common.base_agent import BaseAgent
+from common.base_agent import BaseAgent, GenerationContext, LLMProvider
 from blog.prompts.blog_prompts import BlogPromptTemplate, GeneralInterestPromptTemplate, SuccessCasePromptTemplate
 from blog.models.blog_models import (
     GeneralInterestRequest, 
@@ -10,12 +10,20 @@ from blog.models.blog_models import (
     SuccessCaseResponse,
     BlogPromptCustomizationRequest
 )
-from common.utils.helpers import extract_text_from_pdf, extract_content_from_url, format_content_for_readability
+from common.utils.helpers import format_content_for_readability
+from common.utils.token_budget import ContextItem
+from common.services.url_fetcher import url_fetcher
+from common.services.pdf_extraction import pdf_extraction_pool
+from common.services.response_cache import CachePolicy, DEFAULT_CACHE_POLICY
 from core.logger import get_logger
 from core.config import settings
+from core.request_context import generation_trace, trace_stage
 
 logger = get_logger("blog_agent")
 
+# Marcadores de las secciones de un caso de éxito
+SUCCESS_CASE_SECTION_MARKERS = ("versión corta", "resumen ejecutivo", "versión completa", "versión detallada")
+
 
 class BlogAgent(BaseAgent):
     """Agente base para generación de artículos de blog."""
@@ -25,7 +33,8 @@ class BlogAgent(BaseAgent):
         prompt_template: BlogPromptTemplate,
         model: str = settings.OPENAI_MODEL,
         temperature: float = settings.DEFAULT_TEMPERATURE,
-        max_tokens: int = settings.DEFAULT_MAX_TOKENS
+        max_tokens: int = settings.DEFAULT_MAX_TOKENS,
+        llm_provider: Optional[LLMProvider] = None
     ):
         """
         Inicializa el agente para blog.
@@ -35,8 +44,9 @@ class BlogAgent(BaseAgent):
             model: Modelo de lenguaje a utilizar
             temperature: Temperatura para la generación
             max_tokens: Número máximo de tokens en la respuesta
+            llm_provider: Proveedor de clientes LLM compartidos (opcional)
         """
-        super().__init__(prompt_template, model, temperature, max_tokens)
+        super().__init__(prompt_template, model, temperature, max_tokens, llm_provider)
     
     async def update_customization(self, request: BlogPromptCustomizationRequest) -> None:
         """
@@ -81,6 +91,62 @@ class BlogAgent(BaseAgent):
         
         logger.info("Configuración del agente de blog actualizada")
     
+    def _resolve_template(self, system_components: Optional[Dict[str, str]]) -> BlogPromptTemplate:
+        """
+        Obtiene la plantilla a usar en una petición, aplicando los system_components.
+        
+        No modifica la plantilla del agente: si hay componentes válidos devuelve
+        una plantilla nueva solo para esta petición.
+        
+        Args:
+            system_components: Componentes del system prompt proporcionados en la solicitud
+            
+        Returns:
+            BlogPromptTemplate: Plantilla a utilizar
+        """
+        original_template = self.prompt_template
+        if not system_components:
+            return original_template
+        
+        # Verificar qué campos de system_components son válidos para la plantilla
+        valid_fields = {
+            'role_description', 'content_objective', 'style_guidance', 
+            'structure_description', 'tone', 'format_guide', 
+            'seo_guidelines', 'limitations', 'additional_instructions'
+        }
+        
+        # Filtrar solo los campos válidos
+        filtered_components = {
+            k: v for k, v in system_components.items() 
+            if k in valid_fields and v is not None
+        }
+        
+        if not filtered_components:
+            return original_template
+        
+        # Log para debugging
+        logger.debug(f"Usando plantilla temporal con campos: {filtered_components.keys()}")
+        
+        # Copia de la plantilla con los campos proporcionados; el resto conserva los valores originales
+        return original_template.copy_with(**filtered_components)
+    
+    def _create_request_context(self, request: Union[GeneralInterestRequest, SuccessCaseRequest]) -> GenerationContext:
+        """
+        Crea el contexto de generación de una solicitud de blog.
+        
+        Args:
+            request: Solicitud de generación
+            
+        Returns:
+            GenerationContext: Contexto con plantilla y configuración del modelo
+        """
+        return self.create_context(
+            prompt_template=self._resolve_template(request.system_components),
+            model=request.model,
+            temperature=request.temperature,
+            max_tokens=request.max_tokens
+        )
+    
     @staticmethod
     def _parse_blog_response(response_text: str) -> Dict[str, Any]:
         """
@@ -140,6 +206,47 @@ class BlogAgent(BaseAgent):
                 "content": response_text
             }
     
+    @staticmethod
+    def _parse_metadata_line(line: str, state: Dict[str, Any]) -> None:
+        """
+        Extrae la meta descripción y las palabras clave de una línea completa.
+        
+        Como en el parseo del texto completo, solo se tiene en cuenta la primera
+        aparición de cada etiqueta.
+        
+        Args:
+            line: Línea de la respuesta
+            state: Estado del parseo incremental
+        """
+        lowered = line.lower()
+        if "meta_descripcion" not in state:
+            meta_match = lowered.find("meta descripción")
+            if meta_match != -1:
+                parts = line[meta_match:].split(":", 1)
+                state["meta_descripcion"] = parts[1].strip() if len(parts) > 1 else None
+        
+        if "palabras_clave" not in state:
+            keywords_match = lowered.find("palabras clave")
+            if keywords_match != -1:
+                parts = line[keywords_match:].split(":", 1)
+                state["palabras_clave"] = (
+                    [k.strip() for k in parts[1].strip().split(",")] if len(parts) > 1 else []
+                )
+    
+    @staticmethod
+    def _parse_blog_line(line: str, line_number: int, state: Dict[str, Any]) -> None:
+        """
+        Parsea de forma incremental una línea de un artículo en streaming.
+        
+        Args:
+            line: Línea completa de la respuesta
+            line_number: Posición de la línea en la respuesta
+            state: Estado del parseo incremental
+        """
+        if line_number == 0:
+            state["titulo"] = line.replace("# ", "")
+        BlogAgent._parse_metadata_line(line, state)
+    
     @staticmethod
     def _parse_success_case_response(response_text: str) -> Dict[str, Any]:
         """
@@ -240,6 +347,29 @@ class BlogAgent(BaseAgent):
                 "palabras_clave": []
             }
     
+    @staticmethod
+    def _parse_success_case_line(line: str, line_number: int, state: Dict[str, Any]) -> None:
+        """
+        Parsea de forma incremental una línea de un caso de éxito en streaming.
+        
+        El título es la primera línea no vacía anterior a las secciones de versión
+        corta y versión completa; la sección actual se guarda en el estado.
+        
+        Args:
+            line: Línea completa de la respuesta
+            line_number: Posición de la línea en la respuesta
+            state: Estado del parseo incremental
+        """
+        lowered = line.lower()
+        for marker in SUCCESS_CASE_SECTION_MARKERS:
+            if marker in lowered:
+                state["_section"] = marker
+                break
+        
+        if "_section" not in state and (line_number == 0 or (line.strip() and not state["titulo"].strip())):
+            state["titulo"] = line.replace("# ", "")
+        BlogAgent._parse_metadata_line(line, state)
+    
     async def generate_content(self, **kwargs) -> Union[BlogArticleResponse, SuccessCaseResponse]:
         """
         Método abstracto que debe ser implementado por las subclases.
@@ -255,7 +385,8 @@ class GeneralInterestBlogAgent(BlogAgent):
         prompt_template: Optional[GeneralInterestPromptTemplate] = None,
         model: str = settings.OPENAI_MODEL,
         temperature: float = settings.DEFAULT_TEMPERATURE,
-        max_tokens: int = settings.DEFAULT_MAX_TOKENS
+        max_tokens: int = settings.DEFAULT_MAX_TOKENS,
+        llm_provider: Optional[LLMProvider] = None
     ):
         """
         Inicializa el agente para artículos de interés general.
@@ -264,12 +395,13 @@ class GeneralInterestBlogAgent(BlogAgent):
             prompt_template: Plantilla de prompts para artículos de interés general
             model: Modelo de lenguaje a utilizar
             temperature: Temperatura para la generación
+            llm_provider: Proveedor de clientes LLM compartidos (opcional)
         """
         template = prompt_template or GeneralInterestPromptTemplate()
-        super().__init__(template, model, temperature, max_tokens)
+        super().__init__(template, model, temperature, max_tokens, llm_provider)
         logger.info(f"Agente de blog para artículos de interés general inicializado con modelo {model}")
     
-    async def _get_url_contents(self, urls: List[str]) -> str:
+    async def _get_url_contents(self, urls: List[str]) -> List[ContextItem]:
         """
         Obtiene contenido de las URLs proporcionadas.
         
@@ -277,151 +409,156 @@ class GeneralInterestBlogAgent(BlogAgent):
             urls: Lista de URLs
             
         Returns:
-            str: Contenido extraído
+            List[ContextItem]: Contenido extraído de cada URL, listo para repartir el presupuesto de tokens
         """
-        contents = []
-        for url in urls:
-            try:
-                content = extract_content_from_url(url)
-                # Limitar tamaño para evitar tokens excesivos
-                if content:
-                    summary = content[:2000]
-                    contents.append(f"Contenido de {url}:\n{summary}\n")
-            except Exception as e:
-                logger.error(f"Error al extraer contenido de URL {url}: {str(e)}")
-                contents.append(f"No se pudo extraer contenido de {url}\n")
+        items = []
+        # Descarga concurrente con plazo total: las URLs que fallan no bloquean al resto
+        results = await url_fetcher.fetch_many([str(url) for url in urls])
+        for index, result in enumerate(results):
+            if result.error is not None:
+                # Los avisos de error son cortos y se priorizan sobre el contenido
+                items.append(ContextItem(
+                    key=f"url:{index}",
+                    text=f"No se pudo extraer contenido de {result.url}\n",
+                    priority=1
+                ))
+            elif result.content:
+                items.append(ContextItem(key=f"url:{index}", text=f"Contenido de {result.url}:\n{result.content}\n"))
+        
+        return items
+    
+    async def _prepare_generation(self, request: GeneralInterestRequest) -> Tuple[GenerationContext, Dict[str, Any]]:
+        """
+        Prepara el contexto y las variables del prompt para un artículo de interés general.
+        
+        Args:
+            request: Solicitud de generación
+            
+        Returns:
+            Tuple[GenerationContext, Dict[str, Any]]: Contexto de generación y variables del prompt
+        """
+        # Contexto de generación propio de esta petición
+        context = self._create_request_context(request)
+        
+        # Extraer contenido de URLs si se proporcionaron
+        url_items = []
+        if request.urls_referencia:
+            with trace_stage("fetch"):
+                url_items = await self._get_url_contents(request.urls_referencia)
+            
+        # Preparar kwargs para el prompt
+        kwargs = {
+            "tema": request.tema,
+            "palabras_clave_primarias": ", ".join(request.palabras_clave_primarias),
+            "palabras_clave_secundarias": ", ".join(request.palabras_clave_secundarias),
+            "longitud": request.longitud,
+            "publico_objetivo": request.publico_objetivo,
+            "objetivo": request.objetivo,
+            "tono_especifico": request.tono_especifico,
+            "llamada_accion": request.llamada_accion,
+            "elementos_evitar": ", ".join(request.elementos_evitar),
+            "urls_referencia": ", ".join([str(url) for url in request.urls_referencia]),
+            "comentarios_adicionales": request.comentarios_adicionales or ""
+        }
         
-        if not contents:
-            return ""
+        # Añadir información de URLs al prompt, recortada al espacio libre de la ventana de contexto
+        if url_items:
+            with trace_stage("prompt"):
+                plan = self._fit_context(context, kwargs, url_items)
+            urls_content = "\n".join(plan.texts[item.key] for item in url_items if plan.texts[item.key])
+            if urls_content:
+                kwargs["comentarios_adicionales"] += f"\n\nInformación adicional de las URLs:\n{urls_content}"
         
-        return "\n".join(contents)
+        return context, kwargs
     
-    async def generate_content(self, request: GeneralInterestRequest) -> BlogArticleResponse:
+    def _build_response(self, request: GeneralInterestRequest, response_text: str) -> BlogArticleResponse:
+        """
+        Construye la respuesta estructurada a partir del texto generado.
+        
+        Args:
+            request: Solicitud de generación
+            response_text: Texto completo generado por el modelo
+            
+        Returns:
+            BlogArticleResponse: Artículo estructurado
+        """
+        # Formatear para legibilidad
+        # response_text = format_content_for_readability(response_text)
+        
+        # Procesar la respuesta
+        parsed_response = self._parse_blog_response(response_text)
+        
+        # Crear respuesta estructurada
+        return BlogArticleResponse(
+            content=parsed_response["content"],
+            titulo=parsed_response["titulo"],
+            meta_descripcion=parsed_response.get("meta_descripcion"),
+            palabras_clave=parsed_response.get("palabras_clave", []),
+            metadata={
+                "article_type": "general_interest",
+                "topic": request.tema,
+                "target_audience": request.publico_objetivo,
+                "primary_keywords": request.palabras_clave_primarias,
+                "secondary_keywords": request.palabras_clave_secundarias
+            }
+        )
+    
+    async def generate_content(
+        self,
+        request: GeneralInterestRequest,
+        cache_policy: CachePolicy = DEFAULT_CACHE_POLICY
+    ) -> BlogArticleResponse:
         """
         Genera un artículo de blog de interés general.
         
         Args:
             request: Solicitud de generación
+            cache_policy: Uso de la caché de respuestas (opcional)
             
         Returns:
             BlogArticleResponse: Artículo generado
         """
         try:
-            # Actualizar configuración del modelo si se especifica
-            if request.model or request.temperature is not None:
-                self.update_model_settings(
-                    model=request.model or self.model,
-                    temperature=request.temperature if request.temperature is not None else self.temperature,
-                    max_tokens=request.max_tokens if request.max_tokens is not None else self.max_tokens
+            with generation_trace("blog.general_interest"):
+                context, kwargs = await self._prepare_generation(request)
+                
+                # Generar contenido con la plantilla de la petición
+                return await self._generate_response(
+                    context,
+                    kwargs,
+                    build_response=lambda text: self._build_response(request, text),
+                    response_model=BlogArticleResponse,
+                    cache_policy=cache_policy
                 )
+        
+        except Exception as e:
+            logger.error(f"Error al generar artículo de interés general: {str(e)}")
+            raise
+    
+    async def stream_content(self, request: GeneralInterestRequest) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Genera un artículo de blog de interés general en streaming.
+        
+        Args:
+            request: Solicitud de generación
             
-            # Extraer contenido de URLs si se proporcionaron
-            urls_content = ""
-            if request.urls_referencia:
-                urls_content = await self._get_url_contents(request.urls_referencia)
+        Yields:
+            Dict[str, Any]: Eventos de generación ("token", "partial" y "result")
+        """
+        try:
+            with generation_trace("blog.general_interest.stream"):
+                context, kwargs = await self._prepare_generation(request)
                 
-            # Preparar kwargs para el prompt
-            kwargs = {
-                "tema": request.tema,
-                "palabras_clave_primarias": ", ".join(request.palabras_clave_primarias),
-                "palabras_clave_secundarias": ", ".join(request.palabras_clave_secundarias),
-                "longitud": request.longitud,
-                "publico_objetivo": request.publico_objetivo,
-                "objetivo": request.objetivo,
-                "tono_especifico": request.tono_especifico,
-                "llamada_accion": request.llamada_accion,
-                "elementos_evitar": ", ".join(request.elementos_evitar),
-                "urls_referencia": ", ".join([str(url) for url in request.urls_referencia]),
-                "comentarios_adicionales": request.comentarios_adicionales or ""
-            }
-            
-            # Añadir información de URLs al prompt si está disponible
-            if urls_content:
-                kwargs["comentarios_adicionales"] += f"\n\nInformación adicional de las URLs:\n{urls_content}"
-            
-            # Manejar system_components si se proporcionaron
-            if request.system_components:
-                original_template = self.prompt_template
-                try:
-                    # Verificar qué campos de system_components son válidos para el constructor
-                    valid_fields = {
-                        'role_description', 'content_objective', 'style_guidance', 
-                        'structure_description', 'tone', 'format_guide', 
-                        'seo_guidelines', 'limitations', 'additional_instructions'
-                    }
-                    
-                    # Filtrar solo los campos válidos
-                    filtered_components = {
-                        k: v for k, v in request.system_components.items() 
-                        if k in valid_fields and v is not None
-                    }
-                    
-                    # Si hay campos válidos, crear una nueva plantilla
-                    if filtered_components:
-                        # Crear una nueva plantilla con los campos proporcionados
-                        # y mantener los valores originales para los campos no proporcionados
-                        template_args = {
-                            'role_description': original_template.role_description,
-                            'content_objective': original_template.content_objective,
-                            'style_guidance': original_template.style_guidance,
-                            'structure_description': original_template.structure_description,
-                            'tone': original_template.tone if hasattr(original_template, 'tone') else "",
-                            'format_guide': original_template.format_guide if hasattr(original_template, 'format_guide') else "",
-                            'seo_guidelines': original_template.seo_guidelines if hasattr(original_template, 'seo_guidelines') else "",
-                            'limitations': original_template.limitations if hasattr(original_template, 'limitations') else "",
-                            'additional_instructions': original_template.additional_instructions
-                        }
-                        
-                        # Actualizar con los campos proporcionados
-                        template_args.update(filtered_components)
-                        
-                        # Crear la plantilla temporal
-                        temp_template = type(original_template)(**template_args)
-                        self.update_prompt_template(temp_template)
-                        
-                        
-                        # Log para debugging
-                        logger.debug(f"Usando plantilla temporal con campos: {filtered_components.keys()}")
-                     
-
-                    # Generar contenido
-                    response_text = await self._call_llm(**kwargs)
-                    
-                    # Restaurar plantilla original
-                    self.update_prompt_template(original_template)
-                except Exception as e:
-                    # Asegurar que se restaure la plantilla original incluso si hay error
-                    self.update_prompt_template(original_template)
-                    logger.error(f"Error al usar system_components: {str(e)}")
-                    raise e
-            else:
-                # Generar contenido con la plantilla actual
-
-                response_text = await self._call_llm(**kwargs)
-               
-            # Formatear para legibilidad
-            # response_text = format_content_for_readability(response_text)
-            
-            # Procesar la respuesta
-            parsed_response = self._parse_blog_response(response_text)
-            
-            # Crear respuesta estructurada
-            return BlogArticleResponse(
-                content=parsed_response["content"],
-                titulo=parsed_response["titulo"],
-                meta_descripcion=parsed_response.get("meta_descripcion"),
-                palabras_clave=parsed_response.get("palabras_clave", []),
-                metadata={
-                    "article_type": "general_interest",
-                    "topic": request.tema,
-                    "target_audience": request.publico_objetivo,
-                    "primary_keywords": request.palabras_clave_primarias,
-                    "secondary_keywords": request.palabras_clave_secundarias
-                }
-            )
+                async for event in self._stream_generation(
+                    context,
+                    kwargs,
+                    parse_line=self._parse_blog_line,
+                    build_response=lambda text: self._build_response(request, text)
+                ):
+                    yield event
         
         except Exception as e:
-            logger.error(f"Error al generar artículo de interés general: {str(e)}")
+            logger.error(f"Error al generar artículo de interés general en streaming: {str(e)}")
             raise
 
 
@@ -433,7 +570,8 @@ class SuccessCaseBlogAgent(BlogAgent):
         prompt_template: Optional[SuccessCasePromptTemplate] = None,
         model: str = settings.OPENAI_MODEL,
         temperature: float = settings.DEFAULT_TEMPERATURE,
-        max_tokens: int = settings.DEFAULT_MAX_TOKENS
+        max_tokens: int = settings.DEFAULT_MAX_TOKENS,
+        llm_provider: Optional[LLMProvider] = None
     ):
         """
         Inicializa el agente para casos de éxito.
@@ -442,132 +580,163 @@ class SuccessCaseBlogAgent(BlogAgent):
             prompt_template: Plantilla de prompts para casos de éxito
             model: Modelo de lenguaje a utilizar
             temperature: Temperatura para la generación
+            llm_provider: Proveedor de clientes LLM compartidos (opcional)
         """
         template = prompt_template or SuccessCasePromptTemplate()
-        super().__init__(template, model, temperature, max_tokens)
+        super().__init__(template, model, temperature, max_tokens, llm_provider)
         logger.info(f"Agente de blog para casos de éxito inicializado con modelo {model}")
     
-    async def generate_content(self, request: SuccessCaseRequest, pdf_content: Optional[bytes] = None) -> SuccessCaseResponse:
+    async def _prepare_generation(
+        self,
+        request: SuccessCaseRequest,
+        pdf_content: Optional[bytes] = None
+    ) -> Tuple[GenerationContext, Dict[str, Any]]:
+        """
+        Prepara el contexto y las variables del prompt para un caso de éxito.
+        
+        Args:
+            request: Solicitud de generación
+            pdf_content: Contenido del PDF con detalles del caso (opcional)
+            
+        Returns:
+            Tuple[GenerationContext, Dict[str, Any]]: Contexto de generación y variables del prompt
+        """
+        # Contexto de generación propio de esta petición
+        context = self._create_request_context(request)
+        
+        # Extraer información del PDF si se proporcionó
+        pages = []
+        caso_exito_info = ""
+        if pdf_content:
+            try:
+                # Las páginas se parsean en el pool de procesos y se dejan de leer al cubrir el presupuesto
+                with trace_stage("pdf"):
+                    async for page_text in pdf_extraction_pool.iter_pages(pdf_content):
+                        pages.append(page_text)
+            except Exception as e:
+                logger.error(f"Error al procesar PDF: {str(e) or type(e).__name__}")
+                caso_exito_info = "No se pudo extraer información del PDF proporcionado."
+        
+        # Preparar kwargs para el prompt
+        kwargs = {
+            "tema": request.tema,
+            "publico_objetivo": request.publico_objetivo,
+            "objetivo": request.objetivo,
+            "tono_especifico": request.tono_especifico,
+            "llamada_accion": request.llamada_accion,
+            "elementos_evitar": ", ".join(request.elementos_evitar),
+            "comentarios_adicionales": request.comentarios_adicionales or "",
+            "informacion_caso_exito": caso_exito_info
+        }
+        
+        # Recortar el PDF al espacio libre de la ventana de contexto, conservando las primeras páginas
+        if pages:
+            page_items = [
+                ContextItem(key=f"page:{index}", text=page_text, priority=-index)
+                for index, page_text in enumerate(pages)
+            ]
+            with trace_stage("prompt"):
+                plan = self._fit_context(context, kwargs, page_items)
+            kwargs["informacion_caso_exito"] = "\n".join(plan.texts[item.key] for item in page_items if plan.texts[item.key])
+        
+        return context, kwargs
+    
+    def _build_response(self, request: SuccessCaseRequest, response_text: str, with_pdf: bool) -> SuccessCaseResponse:
+        """
+        Construye la respuesta estructurada a partir del texto generado.
+        
+        Args:
+            request: Solicitud de generación
+            response_text: Texto completo generado por el modelo
+            with_pdf: Indica si se proporcionó un PDF
+            
+        Returns:
+            SuccessCaseResponse: Caso de éxito estructurado
+        """
+        # Formatear para legibilidad
+        response_text = format_content_for_readability(response_text)
+        
+        # Procesar la respuesta
+        parsed_response = self._parse_success_case_response(response_text)
+        
+        # Crear respuesta estructurada
+        return SuccessCaseResponse(
+            content=parsed_response["contenido_completo"],
+            titulo=parsed_response["titulo"],
+            resumen_corto=parsed_response["resumen_corto"],
+            contenido_completo=parsed_response["contenido_completo"],
+            meta_descripcion=parsed_response.get("meta_descripcion"),
+            palabras_clave=parsed_response.get("palabras_clave", []),
+            metadata={
+                "article_type": "success_case",
+                "topic": request.tema,
+                "target_audience": request.publico_objetivo,
+                "with_pdf": with_pdf
+            }
+        )
+    
+    async def generate_content(
+        self,
+        request: SuccessCaseRequest,
+        pdf_content: Optional[bytes] = None,
+        cache_policy: CachePolicy = DEFAULT_CACHE_POLICY
+    ) -> SuccessCaseResponse:
         """
         Genera un artículo de caso de éxito.
         
         Args:
             request: Solicitud de generación
             pdf_content: Contenido del PDF con detalles del caso (opcional)
+            cache_policy: Uso de la caché de respuestas (opcional)
             
         Returns:
             SuccessCaseResponse: Artículo de caso de éxito generado
         """
         try:
-            # Actualizar configuración del modelo si se especifica
-            if request.model or request.temperature is not None:
-                self.update_model_settings(
-                    model=request.model or self.model,
-                    temperature=request.temperature if request.temperature is not None else self.temperature,
-                    max_tokens=request.max_tokens if request.max_tokens is not None else self.max_tokens
+            with generation_trace("blog.success_case"):
+                context, kwargs = await self._prepare_generation(request, pdf_content)
+                
+                # Generar contenido con la plantilla de la petición
+                return await self._generate_response(
+                    context,
+                    kwargs,
+                    build_response=lambda text: self._build_response(request, text, with_pdf=pdf_content is not None),
+                    response_model=SuccessCaseResponse,
+                    cache_policy=cache_policy,
+                    cache_metadata={"with_pdf": pdf_content is not None}
                 )
-            
-            # Extraer información del PDF si se proporcionó
-            caso_exito_info = ""
-            if pdf_content:
-                try:
-                    pdf_text = extract_text_from_pdf(pdf_content)
-                    caso_exito_info = pdf_text
-                except Exception as e:
-                    logger.error(f"Error al procesar PDF: {str(e)}")
-                    caso_exito_info = "No se pudo extraer información del PDF proporcionado."
-            
-            # Preparar kwargs para el prompt
-            kwargs = {
-                "tema": request.tema,
-                "publico_objetivo": request.publico_objetivo,
-                "objetivo": request.objetivo,
-                "tono_especifico": request.tono_especifico,
-                "llamada_accion": request.llamada_accion,
-                "elementos_evitar": ", ".join(request.elementos_evitar),
-                "comentarios_adicionales": request.comentarios_adicionales or "",
-                "informacion_caso_exito": caso_exito_info
-            }
-            
-            # Manejar system_components si se proporcionaron
-            if request.system_components:
-                original_template = self.prompt_template
-                try:
-                    # Verificar qué campos de system_components son válidos para el constructor
-                    valid_fields = {
-                        'role_description', 'content_objective', 'style_guidance', 
-                        'structure_description', 'tone', 'format_guide', 
-                        'seo_guidelines', 'limitations', 'additional_instructions'
-                    }
-                    
-                    # Filtrar solo los campos válidos
-                    filtered_components = {
-                        k: v for k, v in request.system_components.items() 
-                        if k in valid_fields and v is not None
-                    }
-                    
-                    # Si hay campos válidos, crear una nueva plantilla
-                    if filtered_components:
-                        # Crear una nueva plantilla con los campos proporcionados
-                        # y mantener los valores originales para los campos no proporcionados
-                        template_args = {
-                            'role_description': original_template.role_description,
-                            'content_objective': original_template.content_objective,
-                            'style_guidance': original_template.style_guidance,
-                            'structure_description': original_template.structure_description,
-                            'tone': original_template.tone if hasattr(original_template, 'tone') else "",
-                            'format_guide': original_template.format_guide if hasattr(original_template, 'format_guide') else "",
-                            'seo_guidelines': original_template.seo_guidelines if hasattr(original_template, 'seo_guidelines') else "",
-                            'limitations': original_template.limitations if hasattr(original_template, 'limitations') else "",
-                            'additional_instructions': original_template.additional_instructions
-                        }
-                        
-                        # Actualizar con los campos proporcionados
-                        template_args.update(filtered_components)
-                        
-                        # Crear la plantilla temporal
-                        temp_template = type(original_template)(**template_args)
-                        self.update_prompt_template(temp_template)
-                        
-                        # Log para debugging
-                        logger.debug(f"Usando plantilla temporal con campos: {filtered_components.keys()}")
-                    
-                    # Generar contenido
-                    response_text = await self._call_llm(**kwargs)
-                    
-                    # Restaurar plantilla original
-                    self.update_prompt_template(original_template)
-                except Exception as e:
-                    # Asegurar que se restaure la plantilla original incluso si hay error
-                    self.update_prompt_template(original_template)
-                    logger.error(f"Error al usar system_components: {str(e)}")
-                    raise e
-            else:
-                # Generar contenido con la plantilla actual
-                response_text = await self._call_llm(**kwargs)
-            
-            # Formatear para legibilidad
-            response_text = format_content_for_readability(response_text)
-            
-            # Procesar la respuesta
-            parsed_response = self._parse_success_case_response(response_text)
-            
-            # Crear respuesta estructurada
-            return SuccessCaseResponse(
-                content=parsed_response["contenido_completo"],
-                titulo=parsed_response["titulo"],
-                resumen_corto=parsed_response["resumen_corto"],
-                contenido_completo=parsed_response["contenido_completo"],
-                meta_descripcion=parsed_response.get("meta_descripcion"),
-                palabras_clave=parsed_response.get("palabras_clave", []),
-                metadata={
-                    "article_type": "success_case",
-                    "topic": request.tema,
-                    "target_audience": request.publico_objetivo,
-                    "with_pdf": pdf_content is not None
-                }
-            )
         
         except Exception as e:
             logger.error(f"Error al generar artículo de caso de éxito: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+    
+    async def stream_content(
+        self,
+        request: SuccessCaseRequest,
+        pdf_content: Optional[bytes] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Genera un artículo de caso de éxito en streaming.
+        
+        Args:
+            request: Solicitud de generación
+            pdf_content: Contenido del PDF con detalles del caso (opcional)
+            
+        Yields:
+            Dict[str, Any]: Eventos de generación ("token", "partial" y "result")
+        """
+        try:
+            with generation_trace("blog.success_case.stream"):
+                context, kwargs = await self._prepare_generation(request, pdf_content)
+                
+                async for event in self._stream_generation(
+                    context,
+                    kwargs,
+                    parse_line=self._parse_success_case_line,
+                    build_response=lambda text: self._build_response(request, text, with_pdf=pdf_content is not None)
+                ):
+                    yield event
+        
+        except Exception as e:
+            logger.error(f"Error al generar artículo de caso de éxito en streaming: {str(e)}")
+            raise
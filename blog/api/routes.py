@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Body, status, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Body, status, Form, Header
+from fastapi.responses import StreamingResponse
 from typing import Dict, Any, Optional
 from pydantic import ValidationError
 import json
@@ -12,21 +13,34 @@ from blog.models.blog_models import (
     BlogArticleType
 )
 from blog.services.blog_service import BlogService
+from common.services.agent_registry import AgentRegistry
+from common.services.response_cache import CachePolicy
+from common.services.job_queue import JobQueueFullError
+from common.models.job_models import JobInfo
+from api.dependencies import get_agent_registry
+from api.instrumentation import MetricsRoute
+from common.utils.helpers import SSE_HEADERS, iter_sse_events
 from core.logger import get_logger
 
 logger = get_logger("blog_api")
 
-router = APIRouter(prefix="/blog", tags=["Blog"])
+router = APIRouter(prefix="/blog", tags=["Blog"], route_class=MetricsRoute)
 
 
-async def get_blog_service() -> BlogService:
+async def get_blog_service(
+    registry: AgentRegistry = Depends(get_agent_registry)
+) -> BlogService:
     """
     Dependencia para obtener el servicio de blog.
+    Reutiliza la instancia registrada en el registro de agentes de la aplicación.
+    
+    Args:
+        registry: Registro de agentes compartidos
     
     Returns:
         BlogService: Instancia del servicio
     """
-    return BlogService()
+    return registry.get_or_create("blog_service", lambda: BlogService(registry))
 
 
 @router.get("/config", response_model=Dict[str, Any])
@@ -101,13 +115,17 @@ async def customize_success_case_prompt(
 @router.post("/generate/general-interest", response_model=BlogArticleResponse)
 async def generate_general_interest_article(
     request: GeneralInterestRequest,
-    service: BlogService = Depends(get_blog_service)
+    service: BlogService = Depends(get_blog_service),
+    cache_control: Optional[str] = Header(None)
 ):
     """
     Genera un artículo de blog de interés general.
+    
+    Si la caché de respuestas está activa, "Cache-Control: no-cache" fuerza
+    una generación nueva y "no-store" además evita guardarla.
     """
     try:
-        return await service.generate_general_interest_article(request)
+        return await service.generate_general_interest_article(request, CachePolicy.from_header(cache_control))
     except Exception as e:
         logger.error(f"Error al generar artículo: {str(e)}")
         raise HTTPException(
@@ -116,14 +134,36 @@ async def generate_general_interest_article(
         )
 
 
+@router.post("/generate/general-interest/stream")
+async def stream_general_interest_article(
+    request: GeneralInterestRequest,
+    service: BlogService = Depends(get_blog_service)
+):
+    """
+    Genera un artículo de blog de interés general en streaming (Server-Sent Events).
+    
+    Emite eventos "token" con cada fragmento, eventos "partial" con los campos
+    parseados hasta el momento y un evento final "result" con los mismos campos
+    que BlogArticleResponse.
+    """
+    return StreamingResponse(
+        iter_sse_events(service.stream_general_interest_article(request)),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
 @router.post("/generate/success-case", response_model=SuccessCaseResponse)
 async def generate_success_case_article(
     request: str = Form(...),
     pdf_file: Optional[UploadFile] = File(None),
-    service: BlogService = Depends(get_blog_service)
+    service: BlogService = Depends(get_blog_service),
+    cache_control: Optional[str] = Header(None)
 ):
     """
     Genera un artículo de blog de caso de éxito.
+    
+    Admite la cabecera Cache-Control igual que el endpoint de interés general.
     """
     try:
 
@@ -138,7 +178,11 @@ async def generate_success_case_article(
             pdf_content = await pdf_file.read()
             
         # Generar el artículo utilizando el servicio
-        return await service.generate_success_case_article(validated_request, pdf_content)
+        return await service.generate_success_case_article(
+            validated_request,
+            pdf_content,
+            CachePolicy.from_header(cache_control)
+        )
     except json.JSONDecodeError as e:
         logger.error(f"Error al decodificar JSON: {str(e)}")
         raise HTTPException(
@@ -159,27 +203,69 @@ async def generate_success_case_article(
         )
 
 
+@router.post("/generate/success-case/stream")
+async def stream_success_case_article(
+    request: str = Form(...),
+    pdf_file: Optional[UploadFile] = File(None),
+    service: BlogService = Depends(get_blog_service)
+):
+    """
+    Genera un artículo de blog de caso de éxito en streaming (Server-Sent Events).
+    
+    El evento final "result" contiene los mismos campos que SuccessCaseResponse.
+    """
+    try:
+        # Convertir string JSON a diccionario y validar
+        request_data = json.loads(request)
+        validated_request = SuccessCaseRequest(**request_data)
+    except json.JSONDecodeError as e:
+        logger.error(f"Error al decodificar JSON: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"JSON inválido en el campo 'request': {str(e)}"
+        )
+    except ValidationError as e:
+        logger.error(f"Error de validación: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Datos inválidos: {str(e)}"
+        )
+    
+    pdf_content = None
+    if pdf_file:
+        pdf_content = await pdf_file.read()
+    
+    return StreamingResponse(
+        iter_sse_events(service.stream_success_case_article(validated_request, pdf_content)),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
 @router.post("/generate", response_model=Dict[str, Any])
 async def generate_blog_article(
     article_type: BlogArticleType,
     request: Dict[str, Any] = Body(...),
     pdf_file: Optional[UploadFile] = File(None),
-    service: BlogService = Depends(get_blog_service)
+    service: BlogService = Depends(get_blog_service),
+    cache_control: Optional[str] = Header(None)
 ):
     """
     Genera un artículo de blog según el tipo especificado.
     """
     try:
+        cache_policy = CachePolicy.from_header(cache_control)
+        
         # Determinar tipo de artículo y validar solicitud
         if article_type.type == "general_interest":
             validated_request = GeneralInterestRequest(**request)
-            response = await service.generate_general_interest_article(validated_request)
+            response = await service.generate_general_interest_article(validated_request, cache_policy)
         elif article_type.type == "success_case":
             validated_request = SuccessCaseRequest(**request)
             pdf_content = None
             if pdf_file:
                 pdf_content = await pdf_file.read()
-            response = await service.generate_success_case_article(validated_request, pdf_content)
+            response = await service.generate_success_case_article(validated_request, pdf_content, cache_policy)
         else:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -196,4 +282,124 @@ async def generate_blog_article(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al generar artículo: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/jobs", response_model=JobInfo, status_code=status.HTTP_202_ACCEPTED)
+async def submit_blog_job(
+    article_type: str = Form(...),
+    request: str = Form(...),
+    priority: int = Form(0),
+    pdf_file: Optional[UploadFile] = File(None),
+    service: BlogService = Depends(get_blog_service),
+    cache_control: Optional[str] = Header(None)
+):
+    """
+    Encola la generación de un artículo de blog y responde sin esperar al resultado.
+    
+    El estado se consulta en GET /blog/jobs/{job_id} o se sigue en
+    GET /blog/jobs/{job_id}/events (Server-Sent Events).
+    """
+    request_models = {
+        "general_interest": GeneralInterestRequest,
+        "success_case": SuccessCaseRequest
+    }
+    if article_type not in request_models:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tipo de artículo no válido: {article_type}"
+        )
+    
+    try:
+        # Convertir string JSON a diccionario y validar
+        request_data = json.loads(request)
+        validated_request = request_models[article_type](**request_data)
+    except json.JSONDecodeError as e:
+        logger.error(f"Error al decodificar JSON: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"JSON inválido en el campo 'request': {str(e)}"
+        )
+    except ValidationError as e:
+        logger.error(f"Error de validación: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Datos inválidos: {str(e)}"
+        )
+    
+    pdf_content = None
+    if pdf_file and article_type == "success_case":
+        pdf_content = await pdf_file.read()
+    
+    try:
+        return await service.submit_job(
+            article_type,
+            validated_request,
+            pdf_content,
+            priority,
+            CachePolicy.from_header(cache_control)
+        )
+    except JobQueueFullError as e:
+        logger.warning(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+
+
+@router.get("/jobs/{job_id}", response_model=JobInfo)
+async def get_blog_job(
+    job_id: str,
+    service: BlogService = Depends(get_blog_service)
+):
+    """
+    Obtiene el estado de un trabajo de generación (y su resultado si ha terminado).
+    """
+    job = await service.get_job(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Trabajo no encontrado: {job_id}"
+        )
+    return job
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_blog_job_events(
+    job_id: str,
+    service: BlogService = Depends(get_blog_service)
+):
+    """
+    Sigue el estado de un trabajo de generación (Server-Sent Events).
+    
+    Emite un evento "status" al conectarse y en cada cambio hasta que el
+    trabajo termina, y eventos "ping" periódicos mientras no hay cambios.
+    """
+    if await service.get_job(job_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Trabajo no encontrado: {job_id}"
+        )
+    
+    return StreamingResponse(
+        iter_sse_events(service.stream_job_events(job_id)),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
+@router.delete("/jobs/{job_id}", response_model=JobInfo)
+async def cancel_blog_job(
+    job_id: str,
+    service: BlogService = Depends(get_blog_service)
+):
+    """
+    Cancela un trabajo de generación en cola o en ejecución.
+    """
+    job = await service.cancel_job(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Trabajo no encontrado: {job_id}"
+        )
+    return job
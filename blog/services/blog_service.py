@@ -1,4 +1,4 @@
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Union, AsyncIterator
 import json
 
 from blog.agents.blog_agent import GeneralInterestBlogAgent, SuccessCaseBlogAgent
@@ -11,6 +11,11 @@ from blog.models.blog_models import (
     BlogArticleType
 )
 from blog.prompts.blog_prompts import GeneralInterestPromptTemplate, SuccessCasePromptTemplate
+from common.services.agent_registry import AgentRegistry
+from common.services.response_cache import CachePolicy, DEFAULT_CACHE_POLICY
+from common.services.job_queue import JobQueue
+from common.services.job_store import create_job_store
+from common.models.job_models import JobInfo
 from core.logger import get_logger
 from core.config import settings
 
@@ -20,11 +25,23 @@ logger = get_logger("blog_service")
 class BlogService:
     """Servicio para gestionar la generación de artículos de blog."""
     
-    def __init__(self):
-        """Inicializa el servicio de blog con los agentes necesarios."""
-        # Inicializar agentes
-        self.general_interest_agent = GeneralInterestBlogAgent()
-        self.success_case_agent = SuccessCaseBlogAgent()
+    def __init__(self, registry: Optional[AgentRegistry] = None):
+        """
+        Inicializa el servicio de blog con los agentes necesarios.
+        
+        Args:
+            registry: Registro de agentes compartidos (opcional)
+        """
+        # Inicializar agentes (compartidos a través del registro si está disponible)
+        if registry is not None:
+            self.general_interest_agent = registry.get_agent("blog.general_interest", GeneralInterestBlogAgent)
+            self.success_case_agent = registry.get_agent("blog.success_case", SuccessCaseBlogAgent)
+        else:
+            self.general_interest_agent = GeneralInterestBlogAgent()
+            self.success_case_agent = SuccessCaseBlogAgent()
+        
+        # Cola de trabajos para las generaciones largas (los workers se crean con el primer trabajo)
+        self.jobs = JobQueue("blog", create_job_store())
         
         logger.info("Servicio de blog inicializado")
     
@@ -150,27 +167,47 @@ class BlogService:
             }
         }
     
-    async def generate_general_interest_article(self, request: GeneralInterestRequest) -> BlogArticleResponse:
+    async def generate_general_interest_article(
+        self,
+        request: GeneralInterestRequest,
+        cache_policy: CachePolicy = DEFAULT_CACHE_POLICY
+    ) -> BlogArticleResponse:
         """
         Genera un artículo de interés general.
         
         Args:
             request: Solicitud de generación
+            cache_policy: Uso de la caché de respuestas (opcional)
             
         Returns:
             BlogArticleResponse: Artículo generado
         """
         try:
             logger.info(f"Generando artículo de interés general sobre: {request.longitud}")
-            return await self.general_interest_agent.generate_content(request)
+            return await self.general_interest_agent.generate_content(request, cache_policy)
         except Exception as e:
             logger.error(f"Error al generar artículo de interés general: {str(e)}")
             raise
     
+    async def stream_general_interest_article(self, request: GeneralInterestRequest) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Genera un artículo de interés general en streaming.
+        
+        Args:
+            request: Solicitud de generación
+            
+        Yields:
+            Dict[str, Any]: Eventos de generación
+        """
+        logger.info(f"Generando artículo de interés general en streaming sobre: {request.tema}")
+        async for event in self.general_interest_agent.stream_content(request):
+            yield event
+    
     async def generate_success_case_article(
         self, 
         request: SuccessCaseRequest, 
-        pdf_content: Optional[bytes] = None
+        pdf_content: Optional[bytes] = None,
+        cache_policy: CachePolicy = DEFAULT_CACHE_POLICY
     ) -> SuccessCaseResponse:
         """
         Genera un artículo de caso de éxito.
@@ -178,22 +215,43 @@ class BlogService:
         Args:
             request: Solicitud de generación
             pdf_content: Contenido del PDF con detalles del caso (opcional)
+            cache_policy: Uso de la caché de respuestas (opcional)
             
         Returns:
             SuccessCaseResponse: Artículo de caso de éxito generado
         """
         try:
             logger.info(f"Generando artículo de caso de éxito sobre: {request.tema}")
-            return await self.success_case_agent.generate_content(request, pdf_content)
+            return await self.success_case_agent.generate_content(request, pdf_content, cache_policy)
         except Exception as e:
             logger.error(f"Error al generar artículo de caso de éxito: {str(e)}")
             raise
     
+    async def stream_success_case_article(
+        self,
+        request: SuccessCaseRequest,
+        pdf_content: Optional[bytes] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Genera un artículo de caso de éxito en streaming.
+        
+        Args:
+            request: Solicitud de generación
+            pdf_content: Contenido del PDF con detalles del caso (opcional)
+            
+        Yields:
+            Dict[str, Any]: Eventos de generación
+        """
+        logger.info(f"Generando artículo de caso de éxito en streaming sobre: {request.tema}")
+        async for event in self.success_case_agent.stream_content(request, pdf_content):
+            yield event
+    
     async def generate_blog_article(
         self, 
         article_type: str,
         request: Union[GeneralInterestRequest, SuccessCaseRequest],
-        pdf_content: Optional[bytes] = None
+        pdf_content: Optional[bytes] = None,
+        cache_policy: CachePolicy = DEFAULT_CACHE_POLICY
     ) -> Union[BlogArticleResponse, SuccessCaseResponse]:
         """
         Genera un artículo de blog según el tipo especificado.
@@ -202,13 +260,89 @@ class BlogService:
             article_type: Tipo de artículo ("general_interest" o "success_case")
             request: Solicitud de generación
             pdf_content: Contenido del PDF para casos de éxito (opcional)
+            cache_policy: Uso de la caché de respuestas (opcional)
             
         Returns:
             Union[BlogArticleResponse, SuccessCaseResponse]: Artículo generado
         """
         if article_type == "general_interest":
-            return await self.generate_general_interest_article(request)
+            return await self.generate_general_interest_article(request, cache_policy)
         elif article_type == "success_case":
-            return await self.generate_success_case_article(request, pdf_content)
+            return await self.generate_success_case_article(request, pdf_content, cache_policy)
         else:
-            raise ValueError(f"Tipo de artículo no válido: {article_type}")
\ No newline at end of file
+            raise ValueError(f"Tipo de artículo no válido: {article_type}")
+    
+    async def submit_job(
+        self,
+        article_type: str,
+        request: Union[GeneralInterestRequest, SuccessCaseRequest],
+        pdf_content: Optional[bytes] = None,
+        priority: int = 0,
+        cache_policy: CachePolicy = DEFAULT_CACHE_POLICY
+    ) -> JobInfo:
+        """
+        Encola la generación de un artículo y devuelve el trabajo sin esperar al resultado.
+        
+        Args:
+            article_type: Tipo de artículo ("general_interest" o "success_case")
+            request: Solicitud de generación
+            pdf_content: Contenido del PDF para casos de éxito (opcional)
+            priority: Prioridad del trabajo (mayor se ejecuta antes)
+            cache_policy: Uso de la caché de respuestas (opcional)
+            
+        Returns:
+            JobInfo: Estado inicial del trabajo
+            
+        Raises:
+            ValueError: Si el tipo de artículo no es válido
+            JobQueueFullError: Si la cola de trabajos está llena
+        """
+        if article_type not in ("general_interest", "success_case"):
+            raise ValueError(f"Tipo de artículo no válido: {article_type}")
+        
+        async def run_job() -> Dict[str, Any]:
+            response = await self.generate_blog_article(article_type, request, pdf_content, cache_policy)
+            return response.model_dump(mode="json")
+        
+        return await self.jobs.submit(article_type, run_job, priority=priority)
+    
+    async def get_job(self, job_id: str) -> Optional[JobInfo]:
+        """
+        Obtiene el estado de un trabajo de generación.
+        
+        Args:
+            job_id: Identificador del trabajo
+            
+        Returns:
+            Optional[JobInfo]: Estado del trabajo o None si no existe
+        """
+        return await self.jobs.get(job_id)
+    
+    async def cancel_job(self, job_id: str) -> Optional[JobInfo]:
+        """
+        Cancela un trabajo de generación en cola o en ejecución.
+        
+        Args:
+            job_id: Identificador del trabajo
+            
+        Returns:
+            Optional[JobInfo]: Estado del trabajo o None si no existe
+        """
+        return await self.jobs.cancel(job_id)
+    
+    async def stream_job_events(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Emite los cambios de estado de un trabajo hasta que termina.
+        
+        Args:
+            job_id: Identificador del trabajo
+            
+        Yields:
+            Dict[str, Any]: Eventos de estado del trabajo
+        """
+        async for event in self.jobs.subscribe(job_id):
+            yield event
+    
+    async def close(self) -> None:
+        """Detiene la cola de trabajos."""
+        await self.jobs.close()
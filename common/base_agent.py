@@ -1,16 +1,54 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional, Tuple
-import json
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple, Callable, AsyncIterator, Type
+import hashlib
+import logging
+
+import orjson
 
 from langchain.schema import HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI
+from pydantic import BaseModel
 
 from common.prompt_templates.base_templates import BasePromptTemplate
-from core.logger import get_logger
+from common.services.llm_client_cache import llm_client_cache
+from common.services.prompt_cache_stats import prompt_cache_stats
+from common.services.rate_limiter import llm_rate_limiter
+from common.services.response_cache import response_cache, CachePolicy, DEFAULT_CACHE_POLICY
+from common.services.single_flight import llm_single_flight
+from common.utils.helpers import IncrementalResponseParser
+from common.utils.token_budget import TokenBudgetPlanner, ContextItem, BudgetPlan
+from core.logger import get_logger, LazyJSON
+from core.request_context import current_trace, trace_stage
+from core.metrics import (
+    errors_total,
+    exception_name,
+    llm_coalesced_requests_total,
+    llm_request_duration_seconds,
+    llm_requests_in_flight,
+    llm_tokens_total
+)
 from core.config import settings
 
 logger = get_logger("base_agent")
 
+# Función que devuelve un cliente LLM para (modelo, temperatura, max_tokens)
+LLMProvider = Callable[[str, float, int], ChatOpenAI]
+
+
+@dataclass(frozen=True)
+class GenerationContext:
+    """
+    Configuración inmutable de una única llamada de generación.
+    
+    Permite que una misma instancia de agente atienda peticiones concurrentes
+    con plantillas y modelos distintos sin modificar su estado compartido.
+    """
+    prompt_template: BasePromptTemplate
+    model: str
+    temperature: float
+    max_tokens: int
+
 
 class BaseAgent(ABC):
     """Clase base para todos los agentes de generación de contenido."""
@@ -20,7 +58,8 @@ class BaseAgent(ABC):
         prompt_template: BasePromptTemplate,
         model: str = settings.OPENAI_MODEL,
         temperature: float = settings.DEFAULT_TEMPERATURE,
-        max_tokens: int = settings.DEFAULT_MAX_TOKENS
+        max_tokens: int = settings.DEFAULT_MAX_TOKENS,
+        llm_provider: Optional[LLMProvider] = None
     ):
         """
         Inicializa el agente con una plantilla de prompts y configuración del modelo.
@@ -30,11 +69,13 @@ class BaseAgent(ABC):
             model: Modelo de lenguaje a utilizar
             temperature: Temperatura para la generación (creatividad)
             max_tokens: Número máximo de tokens en la respuesta
+            llm_provider: Proveedor de clientes LLM (opcional, por defecto la caché compartida)
         """
         self.prompt_template = prompt_template
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self.llm_provider = llm_provider or llm_client_cache.get_client
         self.llm = self._initialize_llm()
         
     def _initialize_llm(self) -> ChatOpenAI:
@@ -44,13 +85,7 @@ class BaseAgent(ABC):
         Returns:
             ChatOpenAI: Instancia del modelo configurado
         """
-        logger.info(f"Inicializando LLM con modelo: {self.model}, temperatura: {self.temperature}, max_tokens: {self.max_tokens}")
-        return ChatOpenAI(
-            model=self.model,
-            temperature=self.temperature,
-            max_tokens=self.max_tokens,
-            api_key=settings.OPENAI_API_KEY
-        )
+        return self.llm_provider(self.model, self.temperature, self.max_tokens)
     
     def update_prompt_template(self, new_template: BasePromptTemplate) -> None:
         """
@@ -87,23 +122,65 @@ class BaseAgent(ABC):
             
         self.llm = self._initialize_llm()
         logger.info(f"Configuración del modelo actualizada - Modelo: {self.model}, Temperatura: {self.temperature}, Max Tokens: {self.max_tokens}")
+    
+    def create_context(
+        self,
+        prompt_template: Optional[BasePromptTemplate] = None,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> GenerationContext:
+        """
+        Crea el contexto de generación de una petición a partir de la configuración del agente.
         
-    def _get_messages(self, **kwargs) -> List[Dict[str, Any]]:
+        Args:
+            prompt_template: Plantilla a utilizar (opcional, por defecto la del agente)
+            model: Modelo a utilizar (opcional)
+            temperature: Temperatura a utilizar (opcional)
+            max_tokens: Límite de tokens (opcional)
+            
+        Returns:
+            GenerationContext: Contexto inmutable para la llamada
+        """
+        return GenerationContext(
+            prompt_template=prompt_template or self.prompt_template,
+            model=model or self.model,
+            temperature=temperature if temperature is not None else self.temperature,
+            max_tokens=max_tokens if max_tokens is not None else self.max_tokens
+        )
+    
+    def _get_llm(self, context: GenerationContext) -> ChatOpenAI:
+        """
+        Obtiene el cliente LLM adecuado para el contexto de generación.
+        
+        Args:
+            context: Contexto de generación
+            
+        Returns:
+            ChatOpenAI: Cliente configurado para el contexto
+        """
+        if (context.model, context.temperature, context.max_tokens) == (self.model, self.temperature, self.max_tokens):
+            return self.llm
+        
+        return self.llm_provider(context.model, context.temperature, context.max_tokens)
+        
+    def _get_messages(self, context: GenerationContext, **kwargs) -> List[Dict[str, Any]]:
         """
         Construye los mensajes para la llamada al modelo.
         
         Args:
+            context: Contexto de generación con la plantilla a utilizar
             **kwargs: Variables para rellenar las plantillas
             
         Returns:
             List[Dict[str, Any]]: Lista de mensajes formateados
         """
-        prompt_data = self.prompt_template.get_prompt_data()
-
+        # El mensaje del sistema, fijo para cada plantilla, forma el prefijo que el
+        # proveedor puede reutilizar de su caché entre peticiones
+        prompt_data = context.prompt_template.get_prompt_data()
         
         # Crear mensaje de sistema
         system_message = SystemMessage(content=prompt_data["system_message"])
-
         
         # Formatear plantilla de usuario con los kwargs
         human_content = prompt_data["human_template"].format(**kwargs)
@@ -111,6 +188,70 @@ class BaseAgent(ABC):
         
         return [system_message, human_message]
     
+    def _fit_context(
+        self,
+        context: GenerationContext,
+        prompt_kwargs: Dict[str, Any],
+        items: List[ContextItem]
+    ) -> BudgetPlan:
+        """
+        Recorta el contexto adicional para que el prompt quepa en la ventana del modelo.
+        
+        Args:
+            context: Contexto de generación (modelo, salida máxima y plantilla)
+            prompt_kwargs: Variables del prompt sin el contexto adicional
+            items: Fragmentos de contexto a repartir por prioridad
+            
+        Returns:
+            BudgetPlan: Textos recortados por clave
+        """
+        compiled = context.prompt_template.compile()
+        planner = TokenBudgetPlanner(context.model, context.max_tokens)
+        plan = planner.plan(
+            [compiled.human_template.format(**prompt_kwargs)],
+            items,
+            static_texts=[compiled.system_message]
+        )
+        
+        if plan.trimmed:
+            logger.info(
+                f"Contexto recortado para {context.model}: {len(plan.trimmed)} de {len(items)} fragmentos "
+                f"({plan.used_tokens}/{plan.available_tokens} tokens disponibles, {plan.fixed_tokens} fijos)"
+            )
+        return plan
+    
+    @staticmethod
+    def _record_usage(context: GenerationContext, usage_metadata: Optional[Dict[str, Any]]) -> None:
+        """
+        Registra los tokens de entrada y los cacheados por el proveedor.
+        
+        Args:
+            context: Contexto de generación
+            usage_metadata: Metadatos de uso de la respuesta (opcional)
+        """
+        prompt_cache_stats.record(type(context.prompt_template).__name__, usage_metadata)
+        
+        if usage_metadata:
+            cached_tokens = (usage_metadata.get("input_token_details") or {}).get("cache_read", 0) or 0
+            llm_tokens_total.inc(usage_metadata.get("input_tokens", 0) or 0, model=context.model, type="input")
+            llm_tokens_total.inc(usage_metadata.get("output_tokens", 0) or 0, model=context.model, type="output")
+            llm_tokens_total.inc(cached_tokens, model=context.model, type="cached")
+        
+        trace = current_trace()
+        if trace is not None:
+            trace.add_tokens(usage_metadata)
+    
+    @staticmethod
+    def _trace_context(context: GenerationContext) -> None:
+        """Anota el modelo y la plantilla en la traza de la generación en curso."""
+        trace = current_trace()
+        if trace is not None:
+            trace.set(
+                model=context.model,
+                template=type(context.prompt_template).__name__,
+                max_tokens=context.max_tokens
+            )
+    
     @abstractmethod
     async def generate_content(self, **kwargs) -> Any:
         """
@@ -124,38 +265,298 @@ class BaseAgent(ABC):
         """
         pass
     
-    async def _call_llm(self, **kwargs) -> str:
+    @staticmethod
+    def _format_prompt_for_log(text: str) -> str:
+        """
+        Prepara un mensaje del prompt para el log según PROMPT_LOG_MODE.
+        
+        Args:
+            text: Contenido del mensaje
+            
+        Returns:
+            str: Texto completo, recortado o solo su huella (hash y longitud)
+        """
+        mode = settings.PROMPT_LOG_MODE
+        if mode == "full":
+            return text
+        if mode == "truncated" and len(text) > settings.PROMPT_LOG_MAX_CHARS:
+            return f"{text[:settings.PROMPT_LOG_MAX_CHARS]}... [{len(text) - settings.PROMPT_LOG_MAX_CHARS} caracteres omitidos]"
+        if mode == "truncated":
+            return text
+        return f"sha256={hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]} ({len(text)} caracteres)"
+    
+    def _log_prompt(self, messages: List[Any], variables: Dict[str, Any]) -> None:
+        """
+        Registra el prompt enviado al modelo según PROMPT_LOG_MODE (off, hashed, truncated o full).
+        
+        Args:
+            messages: Mensajes enviados al modelo
+            variables: Variables utilizadas para rellenar las plantillas
+        """
+        if settings.PROMPT_LOG_MODE == "off":
+            return
+        
+        if logger.isEnabledFor(logging.INFO):
+            system_content = messages[0].content if messages else "No system message"
+            human_content = messages[1].content if len(messages) > 1 else "No human message"
+            
+            logger.info("===== PROMPT ENVIADO AL MODELO =====")
+            logger.info("SYSTEM PROMPT:\n%s\n", self._format_prompt_for_log(system_content))
+            logger.info("HUMAN PROMPT:\n%s\n", self._format_prompt_for_log(human_content))
+            logger.info("===== FIN DEL PROMPT =====")
+        
+        # La serialización a JSON solo se hace si el nivel DEBUG está activo
+        logger.debug("Variables utilizadas: %s", LazyJSON(variables, indent=2))
+        logger.debug("Enviando mensajes al LLM: %s", LazyJSON(lambda: [m.dict() for m in messages], indent=2))
+    
+    def _prepare_messages(self, context: GenerationContext, prompt_kwargs: Dict[str, Any]) -> List[Any]:
+        """
+        Construye y registra en el log los mensajes de una generación.
+        
+        Args:
+            context: Contexto de generación
+            prompt_kwargs: Variables para rellenar las plantillas
+            
+        Returns:
+            List[Any]: Mensajes de sistema y de usuario
+        """
+        self._trace_context(context)
+        with trace_stage("prompt"):
+            messages = self._get_messages(context, **prompt_kwargs)
+            self._log_prompt(messages, prompt_kwargs)
+        return messages
+    
+    @staticmethod
+    def _prompt_key(
+        context: GenerationContext,
+        messages: List[Any],
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Calcula el hash canónico de una generación.
+        
+        Incluye el mensaje del sistema compilado, el mensaje del usuario
+        renderizado, el modelo, la temperatura y el máximo de tokens: dos
+        generaciones con la misma clave envían exactamente la misma petición.
+        
+        Args:
+            context: Contexto de generación
+            messages: Mensajes de sistema y de usuario
+            metadata: Datos de la respuesta que no forman parte del prompt (opcional)
+            
+        Returns:
+            str: Clave hexadecimal (SHA-256)
+        """
+        payload = orjson.dumps(
+            {
+                "system": messages[0].content,
+                "human": messages[1].content,
+                "model": context.model,
+                "temperature": context.temperature,
+                "max_tokens": context.max_tokens,
+                "metadata": metadata or {}
+            },
+            option=orjson.OPT_SORT_KEYS
+        )
+        return hashlib.sha256(payload).hexdigest()
+    
+    async def _wait_rate_limit(self, context: GenerationContext) -> None:
+        """
+        Espera a que el límite de peticiones del modelo permita una llamada.
+        
+        Args:
+            context: Contexto de generación
+        """
+        if llm_rate_limiter.enabled:
+            with trace_stage("rate_limit"):
+                await llm_rate_limiter.acquire(context.model)
+    
+    async def _request_llm(self, context: GenerationContext, messages: List[Any]) -> str:
+        """
+        Envía los mensajes al modelo y registra la latencia y el uso de tokens.
+        
+        Args:
+            context: Contexto de generación
+            messages: Mensajes ya construidos
+            
+        Returns:
+            str: Respuesta del modelo
+        """
+        await self._wait_rate_limit(context)
+        with trace_stage("llm"), llm_requests_in_flight.track_inprogress(model=context.model):
+            with llm_request_duration_seconds.time(model=context.model, mode="invoke"):
+                response = await self._get_llm(context).ainvoke(messages)
+        self._record_usage(context, getattr(response, "usage_metadata", None))
+        return response.content
+    
+    async def _invoke_llm(
+        self,
+        context: GenerationContext,
+        messages: List[Any],
+        prompt_key: Optional[str] = None
+    ) -> str:
+        """
+        Llama al modelo, compartiendo la llamada con las peticiones idénticas en curso.
+        
+        Si ya hay una llamada en curso con el mismo prompt y los mismos
+        parámetros (doble clic, reintentos del frontend), se espera su
+        resultado en lugar de pagar otra llamada.
+        
+        Args:
+            context: Contexto de generación
+            messages: Mensajes ya construidos
+            prompt_key: Hash canónico de la generación (opcional, se calcula si no se indica)
+            
+        Returns:
+            str: Respuesta del modelo
+        """
+        prompt_key = prompt_key or self._prompt_key(context, messages)
+        if llm_single_flight.is_in_flight(prompt_key):
+            llm_coalesced_requests_total.inc(model=context.model)
+            trace = current_trace()
+            if trace is not None:
+                trace.set(coalesced=True)
+        return await llm_single_flight.do(prompt_key, lambda: self._request_llm(context, messages))
+    
+    async def _call_llm(self, context: Optional[GenerationContext] = None, **kwargs) -> str:
         """
         Realiza la llamada al modelo de lenguaje.
         
         Args:
+            context: Contexto de generación (opcional, por defecto la configuración del agente)
             **kwargs: Variables para rellenar las plantillas
             
         Returns:
             str: Respuesta del modelo
         """
         try:
-
-            messages = self._get_messages(**kwargs)
+            context = context or self.create_context()
+            messages = self._prepare_messages(context, kwargs)
+            return await self._invoke_llm(context, messages)
             
-
-
-            # Agregar logging detallado aquí
-            system_content = messages[0].content if messages else "No system message"
-            human_content = messages[1].content if len(messages) > 1 else "No human message"
+        except Exception as e:
+            errors_total.inc(component="llm", exception=exception_name(e))
+            logger.error(f"Error al llamar al LLM: {str(e)}")
+            raise
+    
+    async def _generate_response(
+        self,
+        context: GenerationContext,
+        prompt_kwargs: Dict[str, Any],
+        build_response: Callable[[str], BaseModel],
+        response_model: Type[BaseModel],
+        cache_policy: CachePolicy = DEFAULT_CACHE_POLICY,
+        cache_metadata: Optional[Dict[str, Any]] = None
+    ) -> BaseModel:
+        """
+        Genera y parsea una respuesta, reutilizando la caché de respuestas si está activa.
+        
+        Con la caché activa, una petición con exactamente el mismo prompt y los
+        mismos parámetros devuelve la respuesta ya parseada sin llamar al modelo.
+        
+        Args:
+            context: Contexto de generación
+            prompt_kwargs: Variables para rellenar las plantillas
+            build_response: Función que construye la respuesta a partir del texto generado
+            response_model: Modelo de la respuesta (para reconstruirla desde la caché)
+            cache_policy: Uso de la caché en esta petición (Cache-Control)
+            cache_metadata: Datos con los que build_response rellena la respuesta y que
+                no forman parte del prompt; se añaden a la clave de la caché
             
-            logger.info("===== PROMPT ENVIADO AL MODELO =====")
-            logger.info(f"SYSTEM PROMPT:\n{system_content}\n")
-            logger.info(f"HUMAN PROMPT:\n{human_content}\n")
-            logger.info("===== FIN DEL PROMPT =====")
+        Returns:
+            BaseModel: Respuesta estructurada
+        """
+        cache_key = None
+        try:
+            messages = self._prepare_messages(context, prompt_kwargs)
             
-            # También puedes loggear los kwargs para ver qué variables se usaron
-            logger.debug(f"Variables utilizadas: {json.dumps(kwargs, indent=2, ensure_ascii=False)}")
-            logger.debug(f"Enviando mensajes al LLM: {json.dumps([m.dict() for m in messages], indent=2)}")
+            if response_cache is not None:
+                cache_key = self._prompt_key(context, messages, cache_metadata)
+                cached = await response_cache.get(cache_key, cache_policy)
+                trace = current_trace()
+                if trace is not None:
+                    trace.set(response_cache_hit=cached is not None)
+                if cached is not None:
+                    return response_model.model_validate(cached)
             
-            response = await self.llm.ainvoke(messages)
-            return response.content
+            response_text = await self._invoke_llm(context, messages, cache_key)
             
         except Exception as e:
+            errors_total.inc(component="llm", exception=exception_name(e))
             logger.error(f"Error al llamar al LLM: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+        
+        with trace_stage("parse"):
+            response = build_response(response_text)
+        
+        if cache_key is not None:
+            await response_cache.set(cache_key, response.model_dump(mode="json"), cache_policy)
+        return response
+    
+    async def _stream_llm(self, context: Optional[GenerationContext] = None, **kwargs) -> AsyncIterator[str]:
+        """
+        Realiza la llamada al modelo de lenguaje devolviendo la respuesta por fragmentos.
+        
+        Args:
+            context: Contexto de generación (opcional, por defecto la configuración del agente)
+            **kwargs: Variables para rellenar las plantillas
+            
+        Yields:
+            str: Fragmentos de texto a medida que el modelo los genera
+        """
+        try:
+            context = context or self.create_context()
+            messages = self._prepare_messages(context, kwargs)
+            
+            await self._wait_rate_limit(context)
+            
+            # Incluye el tiempo que el cliente tarda en consumir los fragmentos
+            with trace_stage("llm"), llm_requests_in_flight.track_inprogress(model=context.model):
+                with llm_request_duration_seconds.time(model=context.model, mode="stream"):
+                    async for chunk in self._get_llm(context).astream(messages):
+                        if chunk.content:
+                            yield chunk.content
+                        if getattr(chunk, "usage_metadata", None):
+                            # El último fragmento incluye el uso de tokens de la llamada
+                            self._record_usage(context, chunk.usage_metadata)
+                    
+        except Exception as e:
+            errors_total.inc(component="llm", exception=exception_name(e))
+            logger.error(f"Error al llamar al LLM en streaming: {str(e)}")
+            raise
+    
+    async def _stream_generation(
+        self,
+        context: GenerationContext,
+        prompt_kwargs: Dict[str, Any],
+        parse_line: Callable[[str, int, Dict[str, Any]], None],
+        build_response: Callable[[str], BaseModel]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Genera contenido en streaming con parseo incremental de la respuesta.
+        
+        Emite eventos "token" con cada fragmento, eventos "partial" cuando cambian
+        los campos parseados de las líneas ya completas, y un evento final "result"
+        con la respuesta estructurada.
+        
+        Args:
+            context: Contexto de generación
+            prompt_kwargs: Variables para rellenar las plantillas
+            parse_line: Función de parseo incremental de cada línea de la respuesta
+            build_response: Función que construye la respuesta final a partir del texto completo
+            
+        Yields:
+            Dict[str, Any]: Eventos con las claves "event" y "data"
+        """
+        parser = IncrementalResponseParser(parse_line)
+        
+        async for chunk in self._stream_llm(context, **prompt_kwargs):
+            yield {"event": "token", "data": {"text": chunk}}
+            
+            partial = parser.feed(chunk)
+            if partial:
+                yield {"event": "partial", "data": partial}
+        
+        with trace_stage("parse"):
+            response = build_response(parser.text)
+        yield {"event": "result", "data": response.model_dump()}
@@ -0,0 +1,51 @@
+from typing import Dict, Any, Optional
+from enum import Enum
+from pydantic import BaseModel, Field
+
+
+class JobStatus(str, Enum):
+    """Estados de un trabajo en segundo plano."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    @property
+    def is_terminal(self) -> bool:
+        """Indica si el trabajo ya no va a cambiar de estado."""
+        return self in (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+class JobInfo(BaseModel):
+    """Estado de un trabajo de generación en segundo plano."""
+    job_id: str = Field(description="Identificador del trabajo")
+    kind: str = Field(description="Tipo de trabajo (por ejemplo, success_case)")
+    status: JobStatus = Field(default=JobStatus.QUEUED, description="Estado del trabajo")
+    priority: int = Field(default=0, description="Prioridad (mayor se ejecuta antes)")
+    request_id: Optional[str] = Field(default=None, description="Petición HTTP que creó el trabajo")
+    created_at: float = Field(description="Marca de tiempo de creación (epoch)")
+    started_at: Optional[float] = Field(default=None, description="Marca de tiempo de inicio (epoch)")
+    finished_at: Optional[float] = Field(default=None, description="Marca de tiempo de fin (epoch)")
+    stages_ms: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Duración de cada etapa en milisegundos (cola, descarga, PDF, prompt, LLM, parseo...)"
+    )
+    result: Optional[Dict[str, Any]] = Field(default=None, description="Respuesta generada")
+    error: Optional[str] = Field(default=None, description="Error si el trabajo falló")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "job_id": "4f9c1b2e8d7a4c3f9e1b2a3c4d5e6f70",
+                "kind": "success_case",
+                "status": "succeeded",
+                "priority": 0,
+                "created_at": 1744799400.0,
+                "started_at": 1744799401.2,
+                "finished_at": 1744799465.8,
+                "stages_ms": {"queued": 1200.0, "pdf": 3400.0, "prompt": 12.0, "llm": 61000.0, "parse": 2.0},
+                "result": {"titulo": "..."},
+                "error": None
+            }
+        }
@@ -1,9 +1,49 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from typing import Dict, Any, List, Optional
 
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class CompiledPrompt:
+    """Resultado inmutable de compilar una plantilla de prompts."""
+    system_message: str
+    human_template: str
+
 
 class BasePromptTemplate(ABC):
-    """Clase base para todas las plantillas de prompts."""
+    """
+    Clase base para todas las plantillas de prompts.
+    
+    Los mensajes se compilan una sola vez y se reutilizan hasta que cambia
+    alguno de los campos públicos de la plantilla.
+    """
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Asigna un atributo invalidando el prompt compilado si cambia un campo."""
+        if not name.startswith("_"):
+            if self.__dict__.get("_frozen"):
+                raise AttributeError(f"La plantilla {type(self).__name__} es inmutable; crea una copia para modificarla")
+            if self.__dict__.get(name, _MISSING) != value:
+                self.__dict__["_compiled"] = None
+        super().__setattr__(name, value)
+    
+    @property
+    def is_frozen(self) -> bool:
+        """Indica si la plantilla es inmutable."""
+        return bool(self.__dict__.get("_frozen"))
+    
+    def freeze(self) -> 'BasePromptTemplate':
+        """
+        Compila la plantilla y la marca como inmutable para poder compartirla.
+        
+        Returns:
+            BasePromptTemplate: La propia plantilla
+        """
+        self.compile()
+        self.__dict__["_frozen"] = True
+        return self
     
     @abstractmethod
     def get_system_message(self) -> str:
@@ -15,11 +55,57 @@ class BasePromptTemplate(ABC):
         """Obtiene la plantilla para el mensaje del usuario."""
         pass
     
+    def copy_with(self, **overrides: Any) -> 'BasePromptTemplate':
+        """
+        Crea una copia modificable de la plantilla con los campos indicados sustituidos.
+        
+        La copia no vuelve a ejecutar el constructor: se copian los campos y, si
+        no hay cambios, también el prompt ya compilado.
+        
+        Args:
+            **overrides: Nuevos valores de los campos de la plantilla
+            
+        Returns:
+            BasePromptTemplate: Nueva plantilla del mismo tipo
+            
+        Raises:
+            ValueError: Si algún campo no existe en la plantilla
+        """
+        fields = {name: value for name, value in self.__dict__.items() if not name.startswith("_")}
+        unknown_fields = set(overrides) - set(fields)
+        if unknown_fields:
+            raise ValueError(f"Campos no válidos para {type(self).__name__}: {', '.join(sorted(unknown_fields))}")
+        
+        changed = {name: value for name, value in overrides.items() if fields[name] != value}
+        fields.update(changed)
+        
+        copy = object.__new__(type(self))
+        copy.__dict__.update(fields)
+        copy.__dict__["_compiled"] = None if changed else self.__dict__.get("_compiled")
+        return copy
+    
+    def compile(self) -> CompiledPrompt:
+        """
+        Obtiene los mensajes compilados, construyéndolos solo si algún campo ha cambiado.
+        
+        Returns:
+            CompiledPrompt: Mensaje del sistema y plantilla del usuario
+        """
+        compiled = self.__dict__.get("_compiled")
+        if compiled is None:
+            compiled = CompiledPrompt(
+                system_message=self.get_system_message(),
+                human_template=self.get_human_template()
+            )
+            self.__dict__["_compiled"] = compiled
+        return compiled
+    
     def get_prompt_data(self) -> Dict[str, str]:
         """Obtiene los datos completos del prompt."""
+        compiled = self.compile()
         return {
-            "system_message": self.get_system_message(),
-            "human_template": self.get_human_template()
+            "system_message": compiled.system_message,
+            "human_template": compiled.human_template
         }
 
 
@@ -66,57 +152,56 @@ class ContentPromptTemplate(BasePromptTemplate):
     
     def get_system_message(self) -> str:
         """Construye un mensaje del sistema estructurado."""
-        
-        system_message = f"""Eres un {self.role_description}.
+        sections = [f"""Eres un {self.role_description}.
 Tu objetivo es {self.content_objective}.
 
-"""
+"""]
         
         if self.tone:
-            system_message += f"""TONO:
+            sections.append(f"""TONO:
 {self.tone}
 
-"""
+""")
         
-        system_message += f"""ESTRUCTURA:
+        sections.append(f"""ESTRUCTURA:
 {self.structure_description}
 
-"""
+""")
         
         if self.format_guide:
-            system_message += f"""FORMATO:
+            sections.append(f"""FORMATO:
 {self.format_guide}
 
-"""
+""")
         
         if self.limitations:
-            system_message += f"""LIMITACIONES:
+            sections.append(f"""LIMITACIONES:
 {self.limitations}
 
-"""
+""")
             
         if self.seo_guidelines:
-            system_message += f"""OPTIMIZACIÓN SEO:
+            sections.append(f"""OPTIMIZACIÓN SEO:
 {self.seo_guidelines}
 
-"""
+""")
          
         if self.style_guidance:
-            system_message += f"""ESTILO:
+            sections.append(f"""ESTILO:
 {self.style_guidance}
-"""
+""")
             
-        system_message += f"""REQUISITO DE LONGITUD:
+        sections.append(f"""REQUISITO DE LONGITUD:
 IMPORTANTE: El contenido generado DEBE tener {self.required_length}. 
 Este es un requisito obligatorio. 
 Asegúrate de desarrollar el contenido con suficiente detalle para alcanzar exactamente esta longitud.
 
-"""
+""")
             
         if self.additional_instructions:
-            system_message += f"\n\n{self.additional_instructions}"
+            sections.append(f"\n\n{self.additional_instructions}")
             
-        return system_message
+        return "".join(sections)
     
     def get_human_template(self) -> str:
         """Proporciona una plantilla genérica para el mensaje del usuario."""
@@ -0,0 +1,127 @@
+from typing import Dict, Any, Callable, Type, TypeVar
+import inspect
+import threading
+
+from langchain_openai import ChatOpenAI
+
+from common.services.llm_client_cache import llm_client_cache
+from core.logger import get_logger
+from core.config import settings
+
+logger = get_logger("agent_registry")
+
+T = TypeVar("T")
+
+
+class AgentRegistry:
+    """
+    Registro de procesos para agentes, servicios y clientes LLM compartidos.
+
+    Se crea una única vez en el ciclo de vida de la aplicación (lifespan) y
+    evita reconstruir agentes y clientes de OpenAI en cada petición.
+    """
+
+    def __init__(self):
+        """Inicializa el registro vacío y sus contadores."""
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "instance_hits": 0,
+            "instance_misses": 0
+        }
+        logger.info("Registro de agentes inicializado")
+
+    def get_or_create(self, name: str, factory: Callable[[], T]) -> T:
+        """
+        Obtiene una instancia registrada o la crea con la factoría indicada.
+
+        Args:
+            name: Nombre único de la instancia
+            factory: Función que construye la instancia si no existe
+
+        Returns:
+            T: Instancia registrada
+        """
+        instance = self._instances.get(name)
+        if instance is not None:
+            self._stats["instance_hits"] += 1
+            return instance
+
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is not None:
+                self._stats["instance_hits"] += 1
+                return instance
+
+            self._stats["instance_misses"] += 1
+            instance = factory()
+            self._instances[name] = instance
+            logger.info(f"Instancia registrada: {name}")
+            return instance
+
+    def get_agent(self, name: str, agent_class: Type[T], **kwargs) -> T:
+        """
+        Obtiene un agente registrado, creándolo con los clientes LLM compartidos.
+
+        Args:
+            name: Nombre único del agente
+            agent_class: Clase del agente a construir
+            **kwargs: Parámetros adicionales para el constructor del agente
+
+        Returns:
+            T: Agente registrado
+        """
+        return self.get_or_create(
+            name,
+            lambda: agent_class(llm_provider=self.get_llm_client, **kwargs)
+        )
+
+    def get_llm_client(
+        self,
+        model: str = settings.OPENAI_MODEL,
+        temperature: float = settings.DEFAULT_TEMPERATURE,
+        max_tokens: int = settings.DEFAULT_MAX_TOKENS
+    ) -> ChatOpenAI:
+        """
+        Obtiene un cliente LLM compartido de la caché LRU de clientes.
+
+        Args:
+            model: Modelo de lenguaje
+            temperature: Temperatura para la generación
+            max_tokens: Número máximo de tokens en la respuesta
+
+        Returns:
+            ChatOpenAI: Cliente compartido
+        """
+        return llm_client_cache.get_client(model, temperature, max_tokens)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene los contadores del registro.
+
+        Returns:
+            Dict[str, Any]: Aciertos, fallos y tamaño del registro
+        """
+        return {
+            **self._stats,
+            "instances": len(self._instances),
+            "llm_clients": llm_client_cache.get_stats()
+        }
+
+    async def close(self) -> None:
+        """Cierra las instancias que lo necesitan, libera los clientes LLM y vacía el registro."""
+        for name, instance in list(self._instances.items()):
+            close = getattr(instance, "close", None)
+            if close is not None and inspect.iscoroutinefunction(close):
+                try:
+                    await close()
+                except Exception as e:
+                    logger.warning(f"Error al cerrar {name}: {str(e)}")
+        
+        try:
+            await llm_client_cache.close()
+        except Exception as e:
+            logger.warning(f"Error al cerrar clientes LLM: {str(e)}")
+
+        self._instances.clear()
+        logger.info("Registro de agentes cerrado")
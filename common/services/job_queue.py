@@ -0,0 +1,323 @@
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, List, Optional, Set
+from uuid import uuid4
+import asyncio
+import itertools
+import time
+
+from common.models.job_models import JobInfo, JobStatus
+from common.services.job_store import JobStore
+from core.logger import get_logger
+from core.config import settings
+from core.request_context import collect_traces, get_request_id, request_id_var
+
+logger = get_logger("job_queue")
+
+# Función que ejecuta un trabajo y devuelve su resultado serializable
+JobHandler = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+class JobQueueFullError(Exception):
+    """La cola de trabajos ha alcanzado su tamaño máximo."""
+    pass
+
+
+class JobQueue:
+    """
+    Pool acotado de workers asyncio que ejecuta trabajos por prioridad.
+
+    Los trabajos se encolan con una prioridad (mayor se ejecuta antes; a igual
+    prioridad, por orden de llegada) y los ejecutan workers tareas del event
+    loop. El estado de cada trabajo se guarda en un JobStore y se publica a
+    los suscriptores en cada cambio. Cada trabajo registra cuánto esperó en
+    la cola y la duración de las etapas de la generación (trazas de
+    core.request_context).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        store: JobStore,
+        workers: int = settings.BLOG_JOB_WORKERS,
+        max_queued: int = settings.BLOG_JOB_QUEUE_SIZE,
+        heartbeat: float = settings.JOB_EVENTS_HEARTBEAT
+    ):
+        """
+        Inicializa la cola (los workers se crean al encolar el primer trabajo).
+
+        Args:
+            name: Nombre de la cola (para logs)
+            store: Almacenamiento del estado de los trabajos
+            workers: Número de trabajos que se ejecutan a la vez
+            max_queued: Número máximo de trabajos esperando en la cola
+            heartbeat: Segundos sin cambios tras los que se envía un evento "ping" a los suscriptores
+        """
+        self.name = name
+        self.store = store
+        self.workers = workers
+        self.max_queued = max_queued
+        self.heartbeat = heartbeat
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._sequence = itertools.count()
+        # Trabajos de este proceso que aún no han terminado
+        self._jobs: Dict[str, JobInfo] = {}
+        self._handlers: Dict[str, JobHandler] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._worker_tasks: List[asyncio.Task] = []
+        self._start_lock = asyncio.Lock()
+        self._stats = {
+            "submitted": 0,
+            "rejected": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "cancelled": 0
+        }
+
+    async def start(self) -> None:
+        """Crea los workers y marca como fallidos los trabajos interrumpidos por un reinicio."""
+        async with self._start_lock:
+            if self._worker_tasks:
+                return
+
+            self._queue = asyncio.PriorityQueue()
+            for job in await self.store.list_unfinished():
+                if job.job_id not in self._jobs:
+                    job.status = JobStatus.FAILED
+                    job.error = "Trabajo interrumpido por un reinicio del servicio"
+                    job.finished_at = time.time()
+                    await self.store.save(job)
+                    logger.warning(f"Trabajo {job.job_id} marcado como fallido tras un reinicio")
+
+            self._worker_tasks = [
+                asyncio.create_task(self._worker(), name=f"{self.name}-worker-{index}")
+                for index in range(self.workers)
+            ]
+            logger.info(f"Cola de trabajos {self.name} iniciada con {self.workers} workers")
+
+    async def submit(self, kind: str, handler: JobHandler, priority: int = 0) -> JobInfo:
+        """
+        Encola un trabajo.
+
+        Args:
+            kind: Tipo de trabajo
+            handler: Función que ejecuta el trabajo
+            priority: Prioridad (mayor se ejecuta antes)
+
+        Returns:
+            JobInfo: Estado inicial del trabajo
+
+        Raises:
+            JobQueueFullError: Si la cola está llena
+        """
+        await self.start()
+
+        if len(self._handlers) >= self.max_queued:
+            self._stats["rejected"] += 1
+            raise JobQueueFullError(f"Cola de trabajos llena ({self.max_queued} en espera)")
+
+        job = JobInfo(
+            job_id=uuid4().hex,
+            kind=kind,
+            priority=priority,
+            request_id=get_request_id(),
+            created_at=time.time()
+        )
+        self._jobs[job.job_id] = job
+        self._handlers[job.job_id] = handler
+        await self.store.save(job.model_copy())
+        self._queue.put_nowait((-priority, next(self._sequence), job.job_id))
+        self._stats["submitted"] += 1
+
+        logger.info(f"Trabajo {job.job_id} ({kind}) encolado con prioridad {priority}")
+        return job.model_copy()
+
+    async def get(self, job_id: str) -> Optional[JobInfo]:
+        """
+        Obtiene el estado de un trabajo.
+
+        Args:
+            job_id: Identificador del trabajo
+
+        Returns:
+            Optional[JobInfo]: Estado del trabajo o None si no existe
+        """
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.model_copy()
+        return await self.store.get(job_id)
+
+    async def cancel(self, job_id: str) -> Optional[JobInfo]:
+        """
+        Cancela un trabajo en cola o en ejecución.
+
+        Args:
+            job_id: Identificador del trabajo
+
+        Returns:
+            Optional[JobInfo]: Estado del trabajo (los terminados se devuelven sin cambios) o None si no existe
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            return await self.store.get(job_id)
+
+        if job.status == JobStatus.QUEUED:
+            # El worker descarta la entrada de la cola al no encontrar su handler
+            self._handlers.pop(job_id, None)
+            await self._finish(job, JobStatus.CANCELLED)
+        else:
+            task = self._running.get(job_id)
+            if task is not None:
+                task.cancel()
+        return job.model_copy()
+
+    async def subscribe(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Emite el estado del trabajo al suscribirse y en cada cambio, hasta que termina.
+
+        Args:
+            job_id: Identificador de un trabajo existente
+
+        Yields:
+            Dict[str, Any]: Eventos "status" con el estado del trabajo y "ping" periódicos
+        """
+        updates: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, set()).add(updates)
+        try:
+            job = await self.get(job_id)
+            if job is None:
+                return
+            yield {"event": "status", "data": job.model_dump(mode="json")}
+
+            # Un trabajo sin terminar que no es de este proceso no va a recibir cambios. Los de
+            # este proceso se retiran de _jobs después de publicar su estado final, así que
+            # se siguen leyendo las actualizaciones pendientes hasta emitirlo
+            status = job.status
+            while not status.is_terminal and (job_id in self._jobs or not updates.empty()):
+                try:
+                    snapshot = await asyncio.wait_for(updates.get(), timeout=self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield {"event": "ping", "data": {"job_id": job_id}}
+                    continue
+                yield {"event": "status", "data": snapshot}
+                status = JobStatus(snapshot["status"])
+        finally:
+            subscribers = self._subscribers.get(job_id)
+            if subscribers is not None:
+                subscribers.discard(updates)
+                if not subscribers:
+                    del self._subscribers[job_id]
+
+    async def _update(self, job: JobInfo, **changes: Any) -> None:
+        """Aplica cambios al trabajo, los guarda y los publica a los suscriptores."""
+        for field, value in changes.items():
+            setattr(job, field, value)
+        await self.store.save(job.model_copy())
+
+        snapshot = job.model_dump(mode="json")
+        for updates in self._subscribers.get(job.job_id, ()):
+            updates.put_nowait(snapshot)
+
+    async def _finish(
+        self,
+        job: JobInfo,
+        status: JobStatus,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None
+    ) -> None:
+        """Marca un trabajo como terminado, publica su estado final y deja de seguirlo en memoria."""
+        self._stats[status.value] += 1
+        await self._update(job, status=status, result=result, error=error, finished_at=time.time())
+        self._jobs.pop(job.job_id, None)
+        logger.info(f"Trabajo {job.job_id} terminado: {status.value}")
+
+    async def _run(self, job: JobInfo, handler: JobHandler) -> None:
+        """
+        Ejecuta un trabajo en una tarea propia para poder cancelarlo.
+
+        Args:
+            job: Trabajo a ejecutar
+            handler: Función que ejecuta el trabajo
+        """
+        started_at = time.time()
+        stages_ms = {"queued": round((started_at - job.created_at) * 1000, 1)}
+        await self._update(job, status=JobStatus.RUNNING, started_at=started_at, stages_ms=stages_ms)
+
+        # La tarea hereda el identificador de la petición original y el colector de trazas
+        request_token = request_id_var.set(job.request_id or job.job_id)
+        try:
+            with collect_traces() as traces:
+                task = asyncio.create_task(handler())
+        finally:
+            request_id_var.reset(request_token)
+        self._running[job.job_id] = task
+
+        try:
+            await asyncio.wait({task})
+        except asyncio.CancelledError:
+            # Se detiene el worker (cierre del servicio): se cancela también el trabajo
+            task.cancel()
+            await asyncio.wait({task})
+            raise
+        finally:
+            self._running.pop(job.job_id, None)
+            for trace in traces:
+                for stage, value in trace["stages_ms"].items():
+                    stages_ms[stage] = round(stages_ms.get(stage, 0.0) + value, 1)
+            stages_ms["total"] = round((time.time() - started_at) * 1000, 1)
+
+            if task.cancelled():
+                await self._finish(job, JobStatus.CANCELLED)
+            elif task.exception() is not None:
+                error = task.exception()
+                logger.error(f"Error en el trabajo {job.job_id}: {str(error)}")
+                await self._finish(job, JobStatus.FAILED, error=str(error) or type(error).__name__)
+            else:
+                await self._finish(job, JobStatus.SUCCEEDED, result=task.result())
+
+    async def _worker(self) -> None:
+        """Toma trabajos de la cola por prioridad y los ejecuta de uno en uno."""
+        while True:
+            _, _, job_id = await self._queue.get()
+            try:
+                handler = self._handlers.pop(job_id, None)
+                job = self._jobs.get(job_id)
+                if handler is None or job is None:
+                    # Trabajo cancelado mientras esperaba
+                    continue
+                await self._run(job, handler)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error en el worker de {self.name}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene las métricas de la cola.
+
+        Returns:
+            Dict[str, Any]: Trabajos encolados, en ejecución y terminados por estado
+        """
+        return {
+            **self._stats,
+            "queued": len(self._handlers),
+            "running": len(self._running),
+            "workers": self.workers,
+            "store": type(self.store).__name__
+        }
+
+    async def close(self) -> None:
+        """Detiene los workers (cancelando los trabajos en curso) y cierra el almacenamiento."""
+        for task in self._worker_tasks:
+            task.cancel()
+        if self._worker_tasks:
+            await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+        for job in list(self._jobs.values()):
+            self._handlers.pop(job.job_id, None)
+            await self._finish(job, JobStatus.CANCELLED)
+
+        await self.store.close()
+        logger.info(f"Cola de trabajos {self.name} detenida")
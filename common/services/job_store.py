@@ -0,0 +1,184 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional
+import asyncio
+import sqlite3
+import threading
+import time
+
+import orjson
+
+from common.models.job_models import JobInfo, JobStatus
+from core.logger import get_logger
+from core.config import settings
+
+logger = get_logger("job_store")
+
+
+class JobStore(ABC):
+    """Almacenamiento del estado de los trabajos en segundo plano."""
+
+    @abstractmethod
+    async def save(self, job: JobInfo) -> None:
+        """
+        Guarda (o reemplaza) el estado de un trabajo.
+
+        Args:
+            job: Estado del trabajo
+        """
+        pass
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[JobInfo]:
+        """
+        Obtiene el estado de un trabajo.
+
+        Args:
+            job_id: Identificador del trabajo
+
+        Returns:
+            Optional[JobInfo]: Estado del trabajo o None si no existe
+        """
+        pass
+
+    @abstractmethod
+    async def list_unfinished(self) -> List[JobInfo]:
+        """
+        Obtiene los trabajos que no han terminado (en cola o en ejecución).
+
+        Returns:
+            List[JobInfo]: Trabajos sin terminar
+        """
+        pass
+
+    async def close(self) -> None:
+        """Libera los recursos del almacenamiento."""
+        pass
+
+
+class InMemoryJobStore(JobStore):
+    """
+    Almacenamiento en memoria del proceso.
+
+    Conserva como máximo max_jobs trabajos; al superarlo descarta los
+    terminados más antiguos.
+    """
+
+    def __init__(self, max_jobs: int = settings.JOB_STORE_MAX_JOBS):
+        """
+        Inicializa el almacenamiento.
+
+        Args:
+            max_jobs: Número máximo de trabajos conservados
+        """
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, JobInfo]" = OrderedDict()
+
+    async def save(self, job: JobInfo) -> None:
+        self._jobs[job.job_id] = job
+        if len(self._jobs) > self.max_jobs:
+            for job_id in [job_id for job_id, stored in self._jobs.items() if stored.status.is_terminal]:
+                del self._jobs[job_id]
+                if len(self._jobs) <= self.max_jobs:
+                    break
+
+    async def get(self, job_id: str) -> Optional[JobInfo]:
+        return self._jobs.get(job_id)
+
+    async def list_unfinished(self) -> List[JobInfo]:
+        return [job for job in self._jobs.values() if not job.status.is_terminal]
+
+
+class SQLiteJobStore(JobStore):
+    """
+    Almacenamiento duradero en un fichero SQLite local.
+
+    Las operaciones se ejecutan en un hilo para no bloquear el event loop.
+    Los trabajos terminados se eliminan tras retention segundos.
+    """
+
+    def __init__(self, path: str = settings.JOB_STORE_PATH, retention: float = settings.JOB_STORE_RETENTION):
+        """
+        Inicializa el almacenamiento y crea la tabla si no existe.
+
+        Args:
+            path: Ruta del fichero SQLite
+            retention: Segundos que se conservan los trabajos terminados
+        """
+        self.path = path
+        self.retention = retention
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "job_id TEXT PRIMARY KEY, status TEXT NOT NULL, data BLOB NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+
+    def _save(self, job: JobInfo) -> None:
+        """Guarda un trabajo y purga los terminados que han superado la retención."""
+        now = time.time()
+        data = orjson.dumps(job.model_dump(mode="json"))
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, status, data, updated_at) VALUES (?, ?, ?, ?)",
+                (job.job_id, job.status.value, data, now)
+            )
+            if job.status.is_terminal:
+                self._connection.execute(
+                    "DELETE FROM jobs WHERE status IN (?, ?, ?) AND updated_at < ?",
+                    (JobStatus.SUCCEEDED.value, JobStatus.FAILED.value, JobStatus.CANCELLED.value, now - self.retention)
+                )
+
+    def _get(self, job_id: str) -> Optional[JobInfo]:
+        """Lee un trabajo."""
+        with self._lock:
+            row = self._connection.execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return JobInfo.model_validate(orjson.loads(row[0])) if row else None
+
+    def _list_unfinished(self) -> List[JobInfo]:
+        """Lee los trabajos sin terminar."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT data FROM jobs WHERE status IN (?, ?)",
+                (JobStatus.QUEUED.value, JobStatus.RUNNING.value)
+            ).fetchall()
+        return [JobInfo.model_validate(orjson.loads(row[0])) for row in rows]
+
+    async def save(self, job: JobInfo) -> None:
+        await asyncio.to_thread(self._save, job)
+
+    async def get(self, job_id: str) -> Optional[JobInfo]:
+        return await asyncio.to_thread(self._get, job_id)
+
+    async def list_unfinished(self) -> List[JobInfo]:
+        return await asyncio.to_thread(self._list_unfinished)
+
+    async def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+def create_job_store(backend: str = settings.JOB_STORE_BACKEND) -> JobStore:
+    """
+    Crea el almacenamiento de trabajos configurado.
+
+    Args:
+        backend: "memory" (por defecto) o "sqlite"
+
+    Returns:
+        JobStore: Almacenamiento de trabajos
+
+    Raises:
+        ValueError: Si el backend no existe
+    """
+    if backend == "memory":
+        return InMemoryJobStore()
+    if backend == "sqlite":
+        logger.info(f"Trabajos guardados en SQLite: {settings.JOB_STORE_PATH}")
+        return SQLiteJobStore()
+    raise ValueError(f"Backend de trabajos no válido: {backend}")
@@ -0,0 +1,146 @@
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+import threading
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+from core.logger import get_logger
+from core.config import settings
+from core.metrics import llm_client_cache_evictions_total, llm_client_cache_size
+
+logger = get_logger("llm_client_cache")
+
+# Clave de caché: (modelo, temperatura, max_tokens, api_key)
+ClientKey = Tuple[str, float, int, Optional[str]]
+
+
+class LLMClientCache:
+    """
+    Caché LRU acotada de clientes ChatOpenAI compartida por todos los agentes.
+
+    Todos los clientes reutilizan el mismo pool de conexiones HTTP, por lo que
+    cambiar de modelo (por ejemplo, entre los fine-tunes de cada autor) no crea
+    conexiones nuevas y expulsar un cliente no cierra conexiones en uso.
+    """
+
+    def __init__(self, max_size: int = settings.LLM_CLIENT_CACHE_SIZE):
+        """
+        Inicializa la caché.
+
+        Args:
+            max_size: Número máximo de clientes a mantener
+        """
+        self.max_size = max(1, max_size)
+        self._clients: "OrderedDict[ClientKey, ChatOpenAI]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._http_client: Optional[httpx.Client] = None
+        self._http_async_client: Optional[httpx.AsyncClient] = None
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0
+        }
+
+    def _get_http_clients(self) -> Tuple[httpx.Client, httpx.AsyncClient]:
+        """
+        Obtiene los clientes HTTP compartidos, creándolos si es necesario.
+
+        Returns:
+            Tuple[httpx.Client, httpx.AsyncClient]: Clientes síncrono y asíncrono
+        """
+        if self._http_async_client is None or self._http_async_client.is_closed:
+            limits = httpx.Limits(
+                max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE
+            )
+            self._http_client = httpx.Client(limits=limits)
+            self._http_async_client = httpx.AsyncClient(limits=limits)
+        return self._http_client, self._http_async_client
+
+    def get_client(
+        self,
+        model: str = settings.OPENAI_MODEL,
+        temperature: float = settings.DEFAULT_TEMPERATURE,
+        max_tokens: int = settings.DEFAULT_MAX_TOKENS,
+        api_key: Optional[str] = None
+    ) -> ChatOpenAI:
+        """
+        Obtiene un cliente para la configuración indicada, creándolo si no está en caché.
+
+        Args:
+            model: Modelo de lenguaje
+            temperature: Temperatura para la generación
+            max_tokens: Número máximo de tokens en la respuesta
+            api_key: API key de OpenAI (opcional, por defecto la de settings)
+
+        Returns:
+            ChatOpenAI: Cliente configurado
+        """
+        api_key = api_key or settings.OPENAI_API_KEY
+        key = (model, temperature, max_tokens, api_key)
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._clients.move_to_end(key)
+                self._stats["hits"] += 1
+                return client
+
+            self._stats["misses"] += 1
+            http_client, http_async_client = self._get_http_clients()
+            logger.info(f"Inicializando LLM con modelo: {model}, temperatura: {temperature}, max_tokens: {max_tokens}")
+            client = ChatOpenAI(
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                api_key=api_key,
+                stream_usage=True,
+                http_client=http_client,
+                http_async_client=http_async_client
+            )
+            self._clients[key] = client
+
+            # Expulsar el cliente menos usado recientemente si se supera el límite
+            if len(self._clients) > self.max_size:
+                (evicted_model, evicted_temperature, evicted_max_tokens, _), _ = self._clients.popitem(last=False)
+                self._stats["evictions"] += 1
+                llm_client_cache_evictions_total.inc()
+                logger.debug(
+                    f"Cliente LLM expulsado de la caché - Modelo: {evicted_model}, "
+                    f"Temperatura: {evicted_temperature}, Max Tokens: {evicted_max_tokens}"
+                )
+
+            llm_client_cache_size.set(len(self._clients))
+            return client
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene las métricas de la caché.
+
+        Returns:
+            Dict[str, Any]: Aciertos, fallos, expulsiones y tamaño
+        """
+        return {
+            **self._stats,
+            "size": len(self._clients),
+            "max_size": self.max_size
+        }
+
+    async def close(self) -> None:
+        """Vacía la caché y cierra el pool de conexiones HTTP compartido."""
+        with self._lock:
+            self._clients.clear()
+            llm_client_cache_size.set(0)
+            http_client, self._http_client = self._http_client, None
+            http_async_client, self._http_async_client = self._http_async_client, None
+
+        if http_async_client is not None:
+            await http_async_client.aclose()
+        if http_client is not None:
+            http_client.close()
+        logger.info("Caché de clientes LLM cerrada")
+
+
+# Caché compartida por todos los agentes del proceso
+llm_client_cache = LLMClientCache()
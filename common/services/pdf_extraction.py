@@ -0,0 +1,303 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, List, Optional, AsyncIterator
+import asyncio
+import hashlib
+import math
+import time
+
+from common.services.tiered_cache import TieredCache
+from common.utils.helpers import count_pdf_pages, iter_pdf_pages
+from core.logger import get_logger
+from core.config import settings
+from core.metrics import cache_requests_total, errors_total, exception_name, pdf_parse_duration_seconds
+
+logger = get_logger("pdf_extraction")
+
+
+def extract_page_range(pdf_bytes: bytes, start: int, end: int, max_chars: Optional[int] = None) -> List[str]:
+    """
+    Extrae el texto de un rango de páginas (se ejecuta en un proceso del pool).
+
+    Args:
+        pdf_bytes: Bytes del archivo PDF
+        start: Índice de la primera página
+        end: Índice de la página en la que parar, sin incluirla
+        max_chars: Número de caracteres a partir del cual se deja de parsear (opcional)
+
+    Returns:
+        List[str]: Texto de cada página procesada
+    """
+    pages = []
+    total_chars = 0
+    for page_text in iter_pdf_pages(pdf_bytes, start, end):
+        pages.append(page_text)
+        total_chars += len(page_text)
+        if max_chars is not None and total_chars >= max_chars:
+            break
+    return pages
+
+
+class PDFExtractionPool:
+    """
+    Pool de procesos para extraer texto de PDFs fuera del event loop.
+
+    El parseo con PyPDF2 es intensivo en CPU; ejecutarlo en procesos separados
+    evita que un PDF grande bloquee al resto de peticiones del worker.
+
+    Si se proporciona una caché, guarda las páginas extraídas indexadas por el
+    SHA-256 del documento: volver a subir el mismo PDF no lo parsea de nuevo.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = settings.PDF_POOL_WORKERS,
+        timeout: float = settings.PDF_EXTRACTION_TIMEOUT,
+        max_pages: int = settings.PDF_MAX_PAGES,
+        max_chars: int = settings.PDF_MAX_CHARS,
+        pages_per_task: int = settings.PDF_PAGES_PER_TASK,
+        cache: Optional[TieredCache] = None
+    ):
+        """
+        Inicializa el pool (los procesos se crean al arrancar).
+
+        Args:
+            max_workers: Número de procesos
+            timeout: Tiempo máximo por documento en segundos
+            max_pages: Número máximo de páginas a procesar por documento
+            max_chars: Caracteres a partir de los cuales se deja de parsear cada documento
+            pages_per_task: Páginas mínimas que procesa cada proceso por tarea
+            cache: Caché de las páginas extraídas (opcional)
+        """
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.pages_per_task = max(1, pages_per_task)
+        self.cache = cache
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._stats = {
+            "documents": 0,
+            "cache_hits": 0,
+            "pages": 0,
+            "early_stops": 0,
+            "timeouts": 0,
+            "errors": 0
+        }
+
+    def start(self) -> None:
+        """Crea los procesos del pool si no existen."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            logger.info(f"Pool de extracción de PDF iniciado con {self.max_workers} procesos")
+
+    def shutdown(self) -> None:
+        """Detiene el pool cancelando los trabajos pendientes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            logger.info("Pool de extracción de PDF detenido")
+
+    @staticmethod
+    def _cache_key(pdf_bytes: bytes, max_pages: int, max_chars: int) -> str:
+        """
+        Calcula la clave de caché de un documento.
+
+        Los límites forman parte de la clave porque determinan qué páginas se extraen.
+
+        Args:
+            pdf_bytes: Bytes del archivo PDF
+            max_pages: Número máximo de páginas
+            max_chars: Presupuesto de caracteres
+
+        Returns:
+            str: Clave de la caché
+        """
+        return f"{hashlib.sha256(pdf_bytes).hexdigest()}:{max_pages}:{max_chars}"
+
+    async def _run(self, deadline: float, func, *args) -> Any:
+        """
+        Ejecuta una función en el pool respetando el plazo del documento.
+
+        Args:
+            deadline: Instante límite según el reloj del event loop
+            func: Función a ejecutar
+            *args: Argumentos de la función
+
+        Returns:
+            Any: Resultado de la función
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, func, *args)
+        try:
+            return await asyncio.wait_for(future, timeout=max(0.0, deadline - loop.time()))
+        except BrokenProcessPool:
+            # Un proceso murió (por ejemplo, por falta de memoria): se recrea el pool
+            self._stats["errors"] += 1
+            logger.error("Pool de extracción de PDF roto, se reinicia")
+            self._executor = None
+            self.start()
+            raise
+
+    async def _finish_document(self, cache_key: Optional[str], pages: List[str]) -> None:
+        """
+        Registra un documento extraído y guarda sus páginas en la caché.
+
+        Args:
+            cache_key: Clave de la caché (None si no hay caché)
+            pages: Texto de las páginas extraídas
+        """
+        self._stats["documents"] += 1
+        if cache_key is not None:
+            await self.cache.aset(cache_key, {"pages": pages})
+
+    async def iter_pages(
+        self,
+        pdf_bytes: bytes,
+        max_pages: Optional[int] = None,
+        max_chars: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """
+        Extrae el texto de un PDF repartiendo rangos de páginas entre los procesos.
+
+        La entrega es por rangos, no por páginas: las páginas de cada rango se
+        devuelven en orden cuando su proceso termina el rango completo. La
+        extracción se detiene, cancelando los rangos pendientes, en cuanto se
+        alcanza el presupuesto de caracteres. El texto se guarda en la caché
+        antes de entregar el último rango, de modo que queda guardado aunque
+        el consumidor deje de iterar al recibirlo.
+
+        Args:
+            pdf_bytes: Bytes del archivo PDF
+            max_pages: Número máximo de páginas (opcional, por defecto el configurado)
+            max_chars: Presupuesto de caracteres (opcional, por defecto el configurado)
+            timeout: Tiempo máximo en segundos (opcional, por defecto el configurado)
+
+        Yields:
+            str: Texto de cada página
+        """
+        max_pages = max_pages if max_pages is not None else self.max_pages
+        max_chars = max_chars if max_chars is not None else self.max_chars
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(pdf_bytes, max_pages, max_chars)
+            cached = await self.cache.aget(cache_key)
+            cache_requests_total.inc(cache=self.cache.name, result="hit" if cached is not None else "miss")
+            if cached is not None:
+                self._stats["cache_hits"] += 1
+                logger.info(f"Texto de PDF obtenido de caché ({len(cached.value['pages'])} páginas)")
+                for page_text in cached.value["pages"]:
+                    yield page_text
+                return
+
+        self.start()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (timeout if timeout is not None else self.timeout)
+
+        futures = []
+        started_at = time.perf_counter()
+        # Si el consumidor deja de iterar antes de terminar, la extracción cuenta como cancelada
+        outcome = "cancelled"
+        try:
+            total_pages = min(await self._run(deadline, count_pdf_pages, pdf_bytes), max_pages)
+
+            # Cada tarea recibe una copia del PDF serializada hacia su proceso: como
+            # mucho un rango por proceso, para no copiar el documento por cada rango
+            pages_per_task = max(self.pages_per_task, math.ceil(total_pages / self.max_workers))
+
+            # Cada rango se limita al presupuesto completo, ya que no se sabe cuánto aportarán los anteriores
+            futures = [
+                asyncio.ensure_future(self._run(
+                    deadline,
+                    extract_page_range,
+                    pdf_bytes,
+                    start,
+                    min(start + pages_per_task, total_pages),
+                    max_chars
+                ))
+                for start in range(0, total_pages, pages_per_task)
+            ]
+
+            pages = []
+            total_chars = 0
+            if not futures:
+                await self._finish_document(cache_key, pages)
+                outcome = "ok"
+
+            for index, future in enumerate(futures):
+                range_pages = []
+                for page_text in await future:
+                    range_pages.append(page_text)
+                    total_chars += len(page_text)
+                    if total_chars >= max_chars:
+                        break
+                pages.extend(range_pages)
+                self._stats["pages"] += len(range_pages)
+
+                budget_reached = total_chars >= max_chars
+                if budget_reached:
+                    self._stats["early_stops"] += 1
+                    logger.info(f"Presupuesto de {max_chars} caracteres alcanzado, se detiene la extracción del PDF")
+                if budget_reached or index == len(futures) - 1:
+                    # Documento completo: se guarda antes de entregar el último rango
+                    await self._finish_document(cache_key, pages)
+                    outcome = "ok"
+
+                for page_text in range_pages:
+                    yield page_text
+                if budget_reached:
+                    break
+        except asyncio.TimeoutError as e:
+            # Los rangos en curso terminan en segundo plano, acotados por el límite de páginas
+            self._stats["timeouts"] += 1
+            outcome = "timeout"
+            errors_total.inc(component="pdf", exception=exception_name(e))
+            logger.error(f"Tiempo agotado al extraer texto del PDF ({len(pdf_bytes)} bytes)")
+            raise
+        except BrokenProcessPool as e:
+            outcome = "error"
+            errors_total.inc(component="pdf", exception=exception_name(e))
+            raise
+        except Exception as e:
+            self._stats["errors"] += 1
+            outcome = "error"
+            errors_total.inc(component="pdf", exception=exception_name(e))
+            raise
+        finally:
+            pdf_parse_duration_seconds.observe(time.perf_counter() - started_at, outcome=outcome)
+            for future in futures:
+                if not future.done():
+                    future.cancel()
+                elif not future.cancelled():
+                    # Evitar avisos de excepciones no recuperadas en rangos descartados
+                    future.exception()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene las métricas del pool.
+
+        Returns:
+            Dict[str, Any]: Documentos procesados, tiempos agotados, errores y métricas de la caché
+        """
+        return {
+            **self._stats,
+            "workers": self.max_workers,
+            "running": self._executor is not None,
+            "cache": self.cache.get_stats() if self.cache is not None else None
+        }
+
+
+# Caché del texto extraído de los PDFs, indexada por su contenido
+pdf_text_cache = TieredCache(
+    name="pdf_text",
+    max_bytes=settings.PDF_CACHE_MAX_BYTES,
+    ttl=settings.PDF_CACHE_TTL,
+    disk_dir=settings.PDF_CACHE_DIR,
+    compression_level=settings.CACHE_COMPRESSION_LEVEL,
+    max_disk_bytes=settings.PDF_CACHE_DISK_MAX_BYTES
+) if settings.PDF_CACHE_ENABLED else None
+
+# Pool compartido por todos los agentes del proceso
+pdf_extraction_pool = PDFExtractionPool(cache=pdf_text_cache)
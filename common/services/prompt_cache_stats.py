@@ -0,0 +1,70 @@
+from typing import Dict, Any, Optional
+import threading
+
+from core.logger import get_logger
+
+logger = get_logger("prompt_cache_stats")
+
+
+class PromptCacheStats:
+    """
+    Métricas de la caché de prefijos del proveedor por plantilla de prompts.
+
+    Acumula los tokens de entrada y los tokens servidos desde la caché del
+    proveedor (usage_metadata.input_token_details.cache_read) para calcular
+    la proporción del prompt que se reutiliza en cada plantilla.
+    """
+
+    def __init__(self):
+        """Inicializa las métricas vacías."""
+        self._templates: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, template_name: str, usage_metadata: Optional[Dict[str, Any]]) -> None:
+        """
+        Registra el uso de tokens de una llamada al modelo.
+
+        Args:
+            template_name: Nombre de la plantilla utilizada
+            usage_metadata: Metadatos de uso devueltos por el modelo (opcional)
+        """
+        if not usage_metadata:
+            return
+
+        input_tokens = usage_metadata.get("input_tokens", 0) or 0
+        cached_tokens = (usage_metadata.get("input_token_details") or {}).get("cache_read", 0) or 0
+
+        with self._lock:
+            stats = self._templates.setdefault(template_name, {
+                "requests": 0,
+                "requests_with_cache_hit": 0,
+                "input_tokens": 0,
+                "cached_tokens": 0
+            })
+            stats["requests"] += 1
+            stats["input_tokens"] += input_tokens
+            stats["cached_tokens"] += cached_tokens
+            if cached_tokens:
+                stats["requests_with_cache_hit"] += 1
+
+        logger.debug(f"Tokens de entrada: {input_tokens}, cacheados: {cached_tokens} ({template_name})")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene las métricas por plantilla.
+
+        Returns:
+            Dict[str, Any]: Tokens de entrada, tokens cacheados y proporción de acierto por plantilla
+        """
+        with self._lock:
+            return {
+                template_name: {
+                    **stats,
+                    "hit_ratio": stats["cached_tokens"] / stats["input_tokens"] if stats["input_tokens"] else 0.0
+                }
+                for template_name, stats in self._templates.items()
+            }
+
+
+# Métricas compartidas por todos los agentes del proceso
+prompt_cache_stats = PromptCacheStats()
@@ -0,0 +1,120 @@
+from typing import Any, Dict
+import asyncio
+import time
+
+from core.logger import get_logger
+from core.config import settings
+
+logger = get_logger("rate_limiter")
+
+
+class _Bucket:
+    """Estado del token bucket de una clave."""
+
+    __slots__ = ("tokens", "updated_at")
+
+    def __init__(self, tokens: float, updated_at: float):
+        self.tokens = tokens
+        self.updated_at = updated_at
+
+
+class RateLimiter:
+    """
+    Limitador de peticiones por clave (token bucket).
+
+    Cada clave (por ejemplo, el modelo) tiene su propio bucket que se rellena
+    a requests_per_minute / 60 tokens por segundo, hasta burst tokens. Cada
+    llamada reserva un token; si no hay, espera el tiempo que falta para que
+    se genere. Las reservas pueden dejar el bucket en negativo, de modo que
+    las llamadas que esperan se atienden por orden de llegada.
+    """
+
+    def __init__(self, requests_per_minute: float, burst: int = 1):
+        """
+        Inicializa el limitador.
+
+        Args:
+            requests_per_minute: Peticiones por minuto permitidas por clave (0 = sin límite)
+            burst: Peticiones que se pueden hacer seguidas sin esperar
+        """
+        self.requests_per_minute = requests_per_minute
+        self.burst = max(1, burst)
+        self._buckets: Dict[str, _Bucket] = {}
+        self._stats = {
+            "acquired": 0,
+            "delayed": 0,
+            "wait_seconds": 0.0
+        }
+
+    @property
+    def enabled(self) -> bool:
+        """Indica si el limitador restringe las peticiones."""
+        return self.requests_per_minute > 0
+
+    def _reserve(self, key: str) -> float:
+        """
+        Reserva un token de la clave.
+
+        Args:
+            key: Clave del bucket
+
+        Returns:
+            float: Segundos que hay que esperar antes de hacer la petición
+        """
+        rate = self.requests_per_minute / 60
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = _Bucket(float(self.burst), now)
+            self._buckets[key] = bucket
+
+        bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated_at) * rate)
+        bucket.updated_at = now
+        bucket.tokens -= 1
+        return -bucket.tokens / rate if bucket.tokens < 0 else 0.0
+
+    async def acquire(self, key: str) -> float:
+        """
+        Espera hasta que la clave tenga un token disponible.
+
+        Args:
+            key: Clave del bucket (por ejemplo, el modelo)
+
+        Returns:
+            float: Segundos esperados
+        """
+        if not self.enabled:
+            return 0.0
+
+        wait = self._reserve(key)
+        self._stats["acquired"] += 1
+        if wait > 0:
+            self._stats["delayed"] += 1
+            self._stats["wait_seconds"] += wait
+            logger.debug(f"Límite de peticiones de {key}: esperando {wait:.2f} s")
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # Devolver la reserva para no retrasar a las peticiones siguientes
+                self._buckets[key].tokens += 1
+                raise
+        return wait
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene las métricas del limitador.
+
+        Returns:
+            Dict[str, Any]: Configuración, peticiones atendidas y retrasadas y tiempo total de espera
+        """
+        return {
+            **self._stats,
+            "wait_seconds": round(self._stats["wait_seconds"], 3),
+            "requests_per_minute": self.requests_per_minute,
+            "burst": self.burst,
+            "keys": len(self._buckets)
+        }
+
+
+# Límite de llamadas al modelo por modelo, compartido por todos los agentes
+llm_rate_limiter = RateLimiter(settings.LLM_RATE_LIMIT_RPM, settings.LLM_RATE_LIMIT_BURST)
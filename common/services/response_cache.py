@@ -0,0 +1,150 @@
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+import time
+
+from common.services.tiered_cache import TieredCache
+from core.logger import get_logger
+from core.config import settings
+
+logger = get_logger("response_cache")
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+    Uso de la caché de respuestas en una petición, al estilo de Cache-Control.
+
+    - "no-cache": no se lee la caché, pero la respuesta nueva se guarda
+    - "no-store": ni se lee ni se guarda
+    - "max-age=N": solo se aceptan respuestas guardadas hace N segundos o menos
+    """
+    read: bool = True
+    write: bool = True
+    max_age: Optional[float] = None
+
+    @classmethod
+    def from_header(cls, cache_control: Optional[str]) -> "CachePolicy":
+        """
+        Interpreta una cabecera Cache-Control.
+
+        Args:
+            cache_control: Valor de la cabecera (opcional)
+
+        Returns:
+            CachePolicy: Política para la petición
+        """
+        if not cache_control:
+            return cls()
+
+        directives = {}
+        for directive in cache_control.lower().split(","):
+            name, _, value = directive.strip().partition("=")
+            directives[name.strip()] = value.strip().strip('"')
+
+        if "no-store" in directives:
+            return cls(read=False, write=False)
+
+        max_age = None
+        if "max-age" in directives:
+            try:
+                max_age = max(0.0, float(directives["max-age"]))
+            except ValueError:
+                max_age = None
+
+        return cls(read="no-cache" not in directives and max_age != 0, max_age=max_age)
+
+
+# Política por defecto: leer y guardar
+DEFAULT_CACHE_POLICY = CachePolicy()
+
+
+class ResponseCache:
+    """
+    Caché de respuestas ya parseadas, indexada por el prompt exacto.
+
+    La clave (BaseAgent._prompt_key) es el SHA-256 de una serialización
+    canónica del mensaje del sistema compilado, el mensaje del usuario
+    renderizado, el modelo, la temperatura, el máximo de tokens y los datos
+    de la respuesta que no forman parte del prompt (por ejemplo, si se adjuntó
+    un PDF): cualquier cambio en la plantilla, en el contexto (URLs, PDF), en
+    los parámetros o en esos datos produce una clave distinta.
+    """
+
+    def __init__(self, cache: TieredCache):
+        """
+        Inicializa la caché.
+
+        Args:
+            cache: Almacenamiento en memoria y, opcionalmente, en disco
+        """
+        self.cache = cache
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "stored": 0
+        }
+
+    async def get(self, key: str, policy: CachePolicy = DEFAULT_CACHE_POLICY) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene una respuesta guardada si la política lo permite.
+
+        Args:
+            key: Clave de la generación
+            policy: Política de caché de la petición
+
+        Returns:
+            Optional[Dict[str, Any]]: Respuesta serializada o None
+        """
+        if not policy.read:
+            self._stats["bypassed"] += 1
+            return None
+
+        entry = await self.cache.aget(key)
+        if entry is not None and policy.max_age is not None and time.time() - entry.created_at > policy.max_age:
+            entry = None
+
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+
+        self._stats["hits"] += 1
+        logger.info(f"Respuesta obtenida de caché ({key[:12]})")
+        return entry.value
+
+    async def set(self, key: str, response: Dict[str, Any], policy: CachePolicy = DEFAULT_CACHE_POLICY) -> None:
+        """
+        Guarda una respuesta si la política lo permite.
+
+        Args:
+            key: Clave de la generación
+            response: Respuesta serializada
+            policy: Política de caché de la petición
+        """
+        if not policy.write:
+            return
+        await self.cache.aset(key, response)
+        self._stats["stored"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene las métricas de la caché de respuestas.
+
+        Returns:
+            Dict[str, Any]: Aciertos, fallos, omisiones y métricas del almacenamiento
+        """
+        return {
+            **self._stats,
+            "storage": self.cache.get_stats()
+        }
+
+
+# Caché compartida por todos los agentes (desactivada salvo RESPONSE_CACHE_ENABLED)
+response_cache = ResponseCache(TieredCache(
+    name="responses",
+    max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+    ttl=settings.RESPONSE_CACHE_TTL,
+    disk_dir=settings.RESPONSE_CACHE_DIR,
+    compression_level=settings.CACHE_COMPRESSION_LEVEL,
+    max_disk_bytes=settings.RESPONSE_CACHE_DISK_MAX_BYTES
+)) if settings.RESPONSE_CACHE_ENABLED else None
@@ -0,0 +1,178 @@
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
+import threading
+
+import numpy as np
+
+from common.utils.embeddings import Embedder, HashingEmbedder
+from core.logger import get_logger
+from core.config import settings
+
+logger = get_logger("semantic_cache")
+
+
+@dataclass
+class SemanticMatch:
+    """Entrada de la caché semántica parecida a la consulta."""
+    score: float
+    text: str
+    value: Dict[str, Any]
+
+
+class SemanticCache:
+    """
+    Caché de vecinos más cercanos sobre una matriz NumPy de tamaño fijo.
+
+    Cada entrada guarda el vector del texto que la describe (por ejemplo, el
+    tema y la información adicional de un post) y un valor serializable. Las
+    entradas se agrupan por partición (estilo y autor) y solo se comparan
+    dentro de la misma. La matriz se reserva al crear la caché: al llenarse,
+    las entradas nuevas sobrescriben las más antiguas.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        capacity: int = settings.SEMANTIC_CACHE_CAPACITY,
+        threshold: float = settings.SEMANTIC_CACHE_THRESHOLD,
+        duplicate_threshold: float = 0.98
+    ):
+        """
+        Inicializa la caché.
+
+        Args:
+            embedder: Embedder que convierte los textos en vectores normalizados
+            capacity: Número máximo de entradas
+            threshold: Similitud coseno mínima para devolver una entrada
+            duplicate_threshold: Similitud a partir de la cual una entrada nueva reemplaza a la existente
+        """
+        self.embedder = embedder
+        self.capacity = capacity
+        self.threshold = threshold
+        self.duplicate_threshold = duplicate_threshold
+        self._vectors = np.zeros((capacity, embedder.dimension), dtype=np.float32)
+        # -1 marca las posiciones libres
+        self._partitions = np.full(capacity, -1, dtype=np.int32)
+        self._texts: List[Optional[str]] = [None] * capacity
+        self._values: List[Optional[Dict[str, Any]]] = [None] * capacity
+        self._partition_ids: Dict[str, int] = {}
+        self._next_slot = 0
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "lookups": 0,
+            "matches": 0,
+            "added": 0,
+            "replaced": 0
+        }
+
+    def _partition_id(self, partition: str) -> int:
+        """Obtiene el identificador numérico de una partición, creándolo si no existe."""
+        partition_id = self._partition_ids.get(partition)
+        if partition_id is None:
+            partition_id = len(self._partition_ids)
+            self._partition_ids[partition] = partition_id
+        return partition_id
+
+    def _scores(self, vector: np.ndarray, partition_id: int) -> np.ndarray:
+        """
+        Calcula la similitud del vector con todas las entradas ocupadas.
+
+        Args:
+            vector: Vector normalizado de la consulta
+            partition_id: Partición de la consulta
+
+        Returns:
+            np.ndarray: Similitud por posición (-inf fuera de la partición)
+        """
+        scores = self._vectors[:self._size] @ vector
+        scores[self._partitions[:self._size] != partition_id] = -np.inf
+        return scores
+
+    def search(self, text: str, partition: str, top_k: int = 3, threshold: Optional[float] = None) -> List[SemanticMatch]:
+        """
+        Busca las entradas más parecidas a un texto dentro de una partición.
+
+        Args:
+            text: Texto de la consulta
+            partition: Partición en la que buscar
+            top_k: Número máximo de resultados
+            threshold: Similitud mínima (opcional, por defecto la de la caché)
+
+        Returns:
+            List[SemanticMatch]: Entradas por similitud descendente
+        """
+        threshold = threshold if threshold is not None else self.threshold
+        vector = self.embedder.embed_one(text)
+
+        with self._lock:
+            self._stats["lookups"] += 1
+            partition_id = self._partition_ids.get(partition)
+            if partition_id is None or not self._size:
+                return []
+
+            scores = self._scores(vector, partition_id)
+            k = min(top_k, self._size)
+            candidates = np.argpartition(-scores, k - 1)[:k]
+            candidates = candidates[np.argsort(-scores[candidates])]
+            matches = [
+                SemanticMatch(score=float(scores[slot]), text=self._texts[slot], value=self._values[slot])
+                for slot in candidates
+                if scores[slot] >= threshold
+            ]
+            if matches:
+                self._stats["matches"] += 1
+        return matches
+
+    def add(self, text: str, partition: str, value: Dict[str, Any]) -> None:
+        """
+        Añade una entrada; si ya existe una casi idéntica en la partición, la reemplaza.
+
+        Args:
+            text: Texto que describe la entrada
+            partition: Partición de la entrada
+            value: Valor a guardar
+        """
+        vector = self.embedder.embed_one(text)
+
+        with self._lock:
+            partition_id = self._partition_id(partition)
+            slot = None
+            if self._size:
+                scores = self._scores(vector, partition_id)
+                best = int(np.argmax(scores))
+                if scores[best] >= self.duplicate_threshold:
+                    slot = best
+                    self._stats["replaced"] += 1
+
+            if slot is None:
+                slot = self._next_slot
+                self._next_slot = (self._next_slot + 1) % self.capacity
+                self._size = min(self._size + 1, self.capacity)
+                self._stats["added"] += 1
+
+            self._vectors[slot] = vector
+            self._partitions[slot] = partition_id
+            self._texts[slot] = text
+            self._values[slot] = value
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene las métricas de la caché.
+
+        Returns:
+            Dict[str, Any]: Consultas, coincidencias, entradas y ocupación
+        """
+        with self._lock:
+            return {
+                **self._stats,
+                "entries": self._size,
+                "capacity": self.capacity,
+                "threshold": self.threshold
+            }
+
+
+# Borradores de LinkedIn ya generados, para sugerirlos ante temas parecidos
+linkedin_draft_cache = SemanticCache(
+    HashingEmbedder(dimension=settings.SEMANTIC_EMBEDDING_DIM)
+) if settings.SEMANTIC_CACHE_ENABLED else None
@@ -0,0 +1,104 @@
+from typing import Any, Awaitable, Callable, Dict
+import asyncio
+
+from core.logger import get_logger
+
+logger = get_logger("single_flight")
+
+
+class SingleFlight:
+    """
+    Agrupa las llamadas concurrentes con la misma clave en una sola ejecución.
+
+    La primera llamada con una clave lanza la operación en una tarea propia;
+    las que llegan mientras sigue en curso esperan esa misma tarea y reciben
+    su resultado (o su excepción). Si una de las peticiones se cancela, la
+    operación sigue para las demás; solo se cancela cuando ya no la espera
+    nadie.
+    """
+
+    def __init__(self, name: str):
+        """
+        Inicializa el coordinador.
+
+        Args:
+            name: Nombre del coordinador (para logs y métricas)
+        """
+        self.name = name
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self._stats = {
+            "calls": 0,
+            "executions": 0,
+            "coalesced": 0
+        }
+
+    def is_in_flight(self, key: str) -> bool:
+        """
+        Indica si hay una operación en curso con esa clave.
+
+        Args:
+            key: Clave de la operación
+
+        Returns:
+            bool: True si una llamada con esa clave se uniría a una operación existente
+        """
+        return key in self._in_flight
+
+    def _release(self, key: str, task: asyncio.Task) -> None:
+        """Elimina la operación terminada si sigue siendo la registrada para la clave."""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+            self._waiters.pop(key, None)
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Ejecuta la operación o se une a la que ya está en curso con la misma clave.
+
+        Args:
+            key: Clave que identifica operaciones equivalentes
+            func: Función que crea la operación (solo se llama si no hay una en curso)
+
+        Returns:
+            Any: Resultado de la operación compartida
+        """
+        self._stats["calls"] += 1
+        task = self._in_flight.get(key)
+        if task is None:
+            self._stats["executions"] += 1
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda done, key=key: self._release(key, done))
+        else:
+            self._stats["coalesced"] += 1
+            logger.info(f"Llamada agrupada con una idéntica en curso ({self.name}, {key[:12]})")
+
+        self._waiters[key] += 1
+        try:
+            # shield: cancelar a quien espera no cancela la operación compartida
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._in_flight.get(key) is task:
+                self._waiters[key] -= 1
+                if self._waiters[key] <= 0:
+                    # Nadie espera ya el resultado: las llamadas nuevas empiezan de cero
+                    self._release(key, task)
+                    task.cancel()
+            raise
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene las métricas del coordinador.
+
+        Returns:
+            Dict[str, Any]: Llamadas, ejecuciones reales, llamadas agrupadas y operaciones en curso
+        """
+        return {
+            **self._stats,
+            "in_flight": len(self._in_flight)
+        }
+
+
+# Coordinador de las llamadas al modelo de todos los agentes del proceso
+llm_single_flight = SingleFlight("llm")
@@ -0,0 +1,441 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+import asyncio
+import hashlib
+import os
+import tempfile
+import threading
+import time
+
+import orjson
+import zstandard
+
+from core.logger import get_logger
+
+logger = get_logger("tiered_cache")
+
+# Intervalo mínimo entre dos barridos de entradas caducadas en disco (segundos)
+DISK_SWEEP_INTERVAL = 300
+
+
+@dataclass
+class CacheEntry:
+    """Entrada almacenada en la caché."""
+    value: Dict[str, Any]
+    created_at: float
+    expires_at: Optional[float]
+    size: int
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        """
+        Indica si la entrada sigue vigente.
+
+        Args:
+            now: Marca de tiempo de referencia (opcional)
+
+        Returns:
+            bool: True si la entrada no ha caducado
+        """
+        if self.expires_at is None:
+            return True
+        return (now or time.time()) < self.expires_at
+
+
+class TieredCache:
+    """
+    Caché de dos niveles: memoria LRU acotada por tamaño y disco opcional.
+
+    Los valores son diccionarios serializables a JSON. En disco se guardan
+    comprimidos con zstandard en ficheros nombrados por el SHA-256 de la clave.
+    El nivel en disco también está acotado: al superar max_disk_bytes se
+    eliminan primero los ficheros escritos hace más tiempo, y las entradas
+    caducadas (pasado el margen stale_ttl que se conservan para revalidarlas)
+    se borran al leerlas o en un barrido periódico que se hace al escribir.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_bytes: int,
+        ttl: Optional[float] = None,
+        disk_dir: Optional[str] = None,
+        compression_level: int = 3,
+        max_disk_bytes: Optional[int] = None,
+        stale_ttl: float = 0
+    ):
+        """
+        Inicializa la caché.
+
+        Args:
+            name: Nombre de la caché (para logs y métricas)
+            max_bytes: Tamaño máximo en memoria en bytes
+            ttl: Tiempo de vida por defecto en segundos (None = sin caducidad)
+            disk_dir: Directorio del nivel en disco (opcional)
+            compression_level: Nivel de compresión zstandard del nivel en disco
+            max_disk_bytes: Tamaño máximo en disco en bytes (None = sin límite)
+            stale_ttl: Segundos que se conserva en disco una entrada caducada (para revalidación)
+        """
+        self.name = name
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.compression_level = compression_level
+        self.max_disk_bytes = max_disk_bytes
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._current_bytes = 0
+        # Ficheros en disco en orden de escritura: nombre -> (tamaño, caducidad)
+        self._disk_files: "OrderedDict[str, Tuple[int, Optional[float]]]" = OrderedDict()
+        self._disk_bytes = 0
+        self._last_sweep = time.time()
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "disk_hits": 0,
+            "evictions": 0,
+            "disk_evictions": 0,
+            "disk_expired": 0
+        }
+
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._scan_disk()
+
+    @staticmethod
+    def hash_key(key: str) -> str:
+        """
+        Calcula el identificador de contenido de una clave.
+
+        Args:
+            key: Clave de la caché
+
+        Returns:
+            str: SHA-256 hexadecimal de la clave
+        """
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key: str) -> Path:
+        """Ruta del fichero en disco para una clave."""
+        return self.disk_dir / f"{self.hash_key(key)}.zst"
+
+    def _scan_disk(self) -> None:
+        """
+        Indexa los ficheros que ya hay en disco, del más antiguo al más reciente.
+
+        La caducidad de los ficheros de ejecuciones anteriores se estima con su
+        fecha de modificación y el TTL por defecto. Los temporales de escrituras
+        interrumpidas se eliminan.
+        """
+        files = []
+        for path in self.disk_dir.iterdir():
+            try:
+                if path.suffix == ".tmp":
+                    path.unlink(missing_ok=True)
+                elif path.suffix == ".zst":
+                    stat = path.stat()
+                    files.append((stat.st_mtime, path.name, stat.st_size))
+            except OSError as e:
+                logger.warning(f"Error al indexar la caché {self.name} en disco: {str(e)}")
+
+        for mtime, name, size in sorted(files):
+            self._disk_files[name] = (size, mtime + self.ttl if self.ttl is not None else None)
+            self._disk_bytes += size
+
+        self._evict_disk()
+        self._sweep_disk()
+
+    def _is_disk_expired(self, expires_at: Optional[float], now: float) -> bool:
+        """Indica si una entrada en disco ha caducado y ya no se conserva para revalidarla."""
+        return expires_at is not None and now >= expires_at + self.stale_ttl
+
+    def _remove_disk_file(self, name: str) -> None:
+        """Elimina un fichero del disco y del índice (se llama con el lock adquirido)."""
+        size, _ = self._disk_files.pop(name, (0, None))
+        self._disk_bytes -= size
+        try:
+            (self.disk_dir / name).unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Error al eliminar la caché {self.name} en disco: {str(e)}")
+
+    def _evict_disk(self) -> None:
+        """Elimina los ficheros más antiguos hasta respetar el tamaño máximo en disco."""
+        if self.max_disk_bytes is None:
+            return
+
+        with self._lock:
+            while self._disk_bytes > self.max_disk_bytes and self._disk_files:
+                name = next(iter(self._disk_files))
+                self._remove_disk_file(name)
+                self._stats["disk_evictions"] += 1
+
+    def _sweep_disk(self) -> None:
+        """Elimina del disco las entradas caducadas."""
+        now = time.time()
+        with self._lock:
+            self._last_sweep = now
+            expired = [
+                name for name, (_, expires_at) in self._disk_files.items()
+                if self._is_disk_expired(expires_at, now)
+            ]
+            for name in expired:
+                self._remove_disk_file(name)
+            self._stats["disk_expired"] += len(expired)
+
+        if expired:
+            logger.info(f"Eliminadas {len(expired)} entradas caducadas de la caché {self.name} en disco")
+
+    def _store_in_memory(self, key: str, entry: CacheEntry) -> None:
+        """
+        Guarda una entrada en memoria expulsando las menos usadas si es necesario.
+
+        Args:
+            key: Clave de la entrada
+            entry: Entrada a guardar
+        """
+        if entry.size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._current_bytes -= previous.size
+
+            self._entries[key] = entry
+            self._current_bytes += entry.size
+
+            while self._current_bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._current_bytes -= evicted.size
+                self._stats["evictions"] += 1
+
+    def _get_from_memory(self, key: str) -> Optional[CacheEntry]:
+        """Obtiene una entrada de memoria marcándola como usada recientemente."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _read_disk(self, key: str) -> Optional[CacheEntry]:
+        """
+        Lee una entrada del nivel en disco.
+
+        Args:
+            key: Clave de la entrada
+
+        Returns:
+            Optional[CacheEntry]: Entrada leída o None si no existe o no es válida
+        """
+        if self.disk_dir is None:
+            return None
+
+        path = self._disk_path(key)
+        try:
+            compressed = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Error al leer la caché {self.name} en disco: {str(e)}")
+            return None
+
+        try:
+            data = orjson.loads(zstandard.ZstdDecompressor().decompress(compressed))
+        except Exception as e:
+            logger.warning(f"Entrada corrupta en la caché {self.name}, se descarta: {str(e)}")
+            path.unlink(missing_ok=True)
+            return None
+
+        entry = CacheEntry(
+            value=data["value"],
+            created_at=data["created_at"],
+            expires_at=data["expires_at"],
+            size=data["size"]
+        )
+        if self._is_disk_expired(entry.expires_at, time.time()):
+            with self._lock:
+                self._remove_disk_file(path.name)
+                self._stats["disk_expired"] += 1
+            return None
+        return entry
+
+    def _write_disk(self, key: str, entry: CacheEntry) -> None:
+        """
+        Escribe una entrada en el nivel en disco de forma atómica.
+
+        Args:
+            key: Clave de la entrada
+            entry: Entrada a escribir
+        """
+        if self.disk_dir is None:
+            return
+
+        payload = orjson.dumps({
+            "value": entry.value,
+            "created_at": entry.created_at,
+            "expires_at": entry.expires_at,
+            "size": entry.size
+        })
+        compressed = zstandard.ZstdCompressor(level=self.compression_level).compress(payload)
+
+        if self.max_disk_bytes is not None and len(compressed) > self.max_disk_bytes:
+            return
+
+        path = self._disk_path(key)
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Error al escribir la caché {self.name} en disco: {str(e)}")
+            return
+
+        with self._lock:
+            previous_size, _ = self._disk_files.pop(path.name, (0, None))
+            self._disk_files[path.name] = (len(compressed), entry.expires_at)
+            self._disk_bytes += len(compressed) - previous_size
+
+        self._evict_disk()
+        if time.time() - self._last_sweep >= DISK_SWEEP_INTERVAL:
+            self._sweep_disk()
+
+    def _delete_disk(self, key: str) -> None:
+        """Elimina una entrada del nivel en disco."""
+        if self.disk_dir is not None:
+            with self._lock:
+                self._remove_disk_file(self._disk_path(key).name)
+
+    def _lookup(self, entry: Optional[CacheEntry], allow_stale: bool) -> Optional[CacheEntry]:
+        """Actualiza las métricas y descarta entradas caducadas si no se admiten."""
+        if entry is None or (not allow_stale and not entry.is_fresh()):
+            self._stats["misses"] += 1
+            return None
+
+        self._stats["hits"] += 1
+        return entry
+
+    def _make_entry(self, value: Dict[str, Any], ttl: Optional[float]) -> CacheEntry:
+        """Crea una entrada con el tiempo de vida indicado."""
+        now = time.time()
+        ttl = ttl if ttl is not None else self.ttl
+        return CacheEntry(
+            value=value,
+            created_at=now,
+            expires_at=now + ttl if ttl is not None else None,
+            size=len(orjson.dumps(value))
+        )
+
+    def get(self, key: str, allow_stale: bool = False) -> Optional[CacheEntry]:
+        """
+        Obtiene una entrada de memoria o, si no está, de disco.
+
+        Args:
+            key: Clave de la entrada
+            allow_stale: Devuelve también entradas caducadas (para revalidación)
+
+        Returns:
+            Optional[CacheEntry]: Entrada encontrada o None
+        """
+        entry = self._get_from_memory(key)
+        if entry is None:
+            entry = self._read_disk(key)
+            if entry is not None:
+                self._stats["disk_hits"] += 1
+                self._store_in_memory(key, entry)
+        return self._lookup(entry, allow_stale)
+
+    async def aget(self, key: str, allow_stale: bool = False) -> Optional[CacheEntry]:
+        """
+        Versión asíncrona de get: la lectura de disco se hace fuera del event loop.
+
+        Args:
+            key: Clave de la entrada
+            allow_stale: Devuelve también entradas caducadas (para revalidación)
+
+        Returns:
+            Optional[CacheEntry]: Entrada encontrada o None
+        """
+        entry = self._get_from_memory(key)
+        if entry is None and self.disk_dir is not None:
+            entry = await asyncio.to_thread(self._read_disk, key)
+            if entry is not None:
+                self._stats["disk_hits"] += 1
+                self._store_in_memory(key, entry)
+        return self._lookup(entry, allow_stale)
+
+    def set(self, key: str, value: Dict[str, Any], ttl: Optional[float] = None) -> CacheEntry:
+        """
+        Guarda un valor en memoria y en disco.
+
+        Args:
+            key: Clave de la entrada
+            value: Valor serializable a JSON
+            ttl: Tiempo de vida en segundos (opcional, por defecto el de la caché)
+
+        Returns:
+            CacheEntry: Entrada guardada
+        """
+        entry = self._make_entry(value, ttl)
+        self._store_in_memory(key, entry)
+        self._write_disk(key, entry)
+        return entry
+
+    async def aset(self, key: str, value: Dict[str, Any], ttl: Optional[float] = None) -> CacheEntry:
+        """
+        Versión asíncrona de set: la escritura en disco se hace fuera del event loop.
+
+        Args:
+            key: Clave de la entrada
+            value: Valor serializable a JSON
+            ttl: Tiempo de vida en segundos (opcional, por defecto el de la caché)
+
+        Returns:
+            CacheEntry: Entrada guardada
+        """
+        entry = self._make_entry(value, ttl)
+        self._store_in_memory(key, entry)
+        if self.disk_dir is not None:
+            await asyncio.to_thread(self._write_disk, key, entry)
+        return entry
+
+    def delete(self, key: str) -> None:
+        """
+        Elimina una entrada de ambos niveles.
+
+        Args:
+            key: Clave de la entrada
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._current_bytes -= entry.size
+        self._delete_disk(key)
+
+    def clear(self) -> None:
+        """Vacía el nivel en memoria."""
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene las métricas de la caché.
+
+        Returns:
+            Dict[str, Any]: Aciertos, fallos, expulsiones y ocupación en memoria y en disco
+        """
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._current_bytes,
+            "max_bytes": self.max_bytes,
+            "disk_enabled": self.disk_dir is not None,
+            "disk_entries": len(self._disk_files),
+            "disk_bytes": self._disk_bytes,
+            "max_disk_bytes": self.max_disk_bytes
+        }
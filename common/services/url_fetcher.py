@@ -0,0 +1,261 @@
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Dict, Any, AsyncIterator, List, Optional
+from urllib.parse import urlsplit
+import asyncio
+import time
+
+import httpx
+
+from common.services.tiered_cache import TieredCache
+from common.utils.html_extractor import StreamingHTMLTextExtractor
+from core.logger import get_logger
+from core.config import settings
+from core.metrics import errors_total, exception_name, url_fetch_duration_seconds
+
+logger = get_logger("url_fetcher")
+
+
+@dataclass
+class URLFetchResult:
+    """Resultado de la descarga de una URL."""
+    url: str
+    content: Optional[str] = None
+    error: Optional[str] = None
+
+
+class AsyncURLFetcher:
+    """
+    Descargador asíncrono de URLs con un cliente httpx compartido.
+
+    Limita la concurrencia global y por host, y aplica un plazo total a cada
+    lote: las URLs que no terminan a tiempo se cancelan y se devuelven como
+    error, conservando los resultados ya obtenidos.
+
+    Si se proporciona una caché, guarda el texto ya limpio de cada URL: un
+    acierto evita tanto la descarga como la limpieza del HTML, y las entradas
+    caducadas se revalidan con ETag/Last-Modified.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = settings.URL_FETCH_MAX_CONCURRENCY,
+        per_host_limit: int = settings.URL_FETCH_PER_HOST_LIMIT,
+        timeout: float = settings.URL_FETCH_TIMEOUT,
+        total_deadline: float = settings.URL_FETCH_DEADLINE,
+        max_chars: int = settings.URL_CONTENT_MAX_CHARS,
+        cache: Optional[TieredCache] = None
+    ):
+        """
+        Inicializa el descargador.
+
+        Args:
+            max_concurrency: Número máximo de descargas simultáneas
+            per_host_limit: Número máximo de descargas simultáneas por host
+            timeout: Tiempo máximo por petición en segundos
+            total_deadline: Tiempo máximo por lote de URLs en segundos
+            max_chars: Caracteres útiles a partir de los cuales se deja de leer cada página
+                (límite de lectura; el recorte al prompt lo hace el presupuesto de tokens)
+            cache: Caché del contenido limpio de las URLs (opcional)
+        """
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.total_deadline = total_deadline
+        self.max_chars = max_chars
+        self.cache = cache
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # Semáforos de los hosts con descargas en curso o en espera, y cuántas hay por host
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._host_users: Dict[str, int] = {}
+        self._stats = {
+            "cache_hits": 0,
+            "revalidated": 0,
+            "downloads": 0
+        }
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        Obtiene el cliente HTTP compartido, creándolo si es necesario.
+
+        Returns:
+            httpx.AsyncClient: Cliente compartido
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=self.max_concurrency)
+            )
+        return self._client
+
+    @asynccontextmanager
+    async def _host_slot(self, url: str) -> AsyncIterator[None]:
+        """
+        Ocupa una de las descargas simultáneas permitidas para el host de una URL.
+
+        El semáforo de un host se elimina cuando deja de tener descargas en curso
+        o en espera, para que no se acumule uno por cada host visto.
+
+        Args:
+            url: URL a descargar
+        """
+        host = urlsplit(url).netloc.lower()
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_host_limit)
+            self._host_semaphores[host] = semaphore
+        self._host_users[host] = self._host_users.get(host, 0) + 1
+        try:
+            async with semaphore:
+                yield
+        finally:
+            self._host_users[host] -= 1
+            if not self._host_users[host]:
+                del self._host_users[host]
+                del self._host_semaphores[host]
+
+    async def fetch(self, url: str) -> str:
+        """
+        Descarga una URL y devuelve su contenido como texto plano.
+
+        Args:
+            url: URL a descargar
+
+        Returns:
+            str: Contenido extraído
+        """
+        cached = None
+        headers = {}
+        if self.cache is not None:
+            cached = await self.cache.aget(url, allow_stale=True)
+            if cached is not None:
+                if cached.is_fresh():
+                    self._stats["cache_hits"] += 1
+                    return cached.value["text"]
+
+                # Entrada caducada: pedir solo si ha cambiado
+                if cached.value.get("etag"):
+                    headers["If-None-Match"] = cached.value["etag"]
+                if cached.value.get("last_modified"):
+                    headers["If-Modified-Since"] = cached.value["last_modified"]
+
+        async with self._semaphore, self._host_slot(url):
+            async with self._get_client().stream("GET", url, headers=headers) as response:
+                if response.status_code == 304 and cached is not None:
+                    # El contenido no ha cambiado: se renueva la caducidad sin volver a limpiar el HTML
+                    self._stats["revalidated"] += 1
+                    await self.cache.aset(url, cached.value)
+                    return cached.value["text"]
+
+                response.raise_for_status()
+                self._stats["downloads"] += 1
+
+                # Extraer el texto a medida que llegan los bytes y dejar de leer al tener suficiente
+                extractor = StreamingHTMLTextExtractor(
+                    max_chars=self.max_chars,
+                    encoding=response.charset_encoding or "utf-8"
+                )
+                async for chunk in response.aiter_bytes():
+                    extractor.feed_bytes(chunk)
+                    if extractor.has_enough:
+                        break
+                content = extractor.get_text()
+
+        logger.info(f"Contenido extraído de URL: {url}")
+
+        if self.cache is not None:
+            await self.cache.aset(url, {
+                "url": url,
+                "text": content,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified")
+            })
+        return content
+
+    async def _fetch_result(self, url: str) -> URLFetchResult:
+        """
+        Descarga una URL capturando los errores en el resultado.
+
+        Args:
+            url: URL a descargar
+
+        Returns:
+            URLFetchResult: Resultado de la descarga
+        """
+        started_at = time.perf_counter()
+        try:
+            result = URLFetchResult(url=url, content=await self.fetch(url))
+            url_fetch_duration_seconds.observe(time.perf_counter() - started_at, outcome="ok")
+            return result
+        except Exception as e:
+            url_fetch_duration_seconds.observe(time.perf_counter() - started_at, outcome="error")
+            errors_total.inc(component="url_fetch", exception=exception_name(e))
+            logger.error(f"Error al extraer contenido de URL {url}: {str(e)}")
+            return URLFetchResult(url=url, error=str(e) or type(e).__name__)
+
+    async def fetch_many(self, urls: List[str], deadline: Optional[float] = None) -> List[URLFetchResult]:
+        """
+        Descarga varias URLs en paralelo dentro de un plazo total.
+
+        Args:
+            urls: Lista de URLs
+            deadline: Plazo total en segundos (opcional, por defecto el configurado)
+
+        Returns:
+            List[URLFetchResult]: Resultados en el mismo orden que las URLs
+        """
+        if not urls:
+            return []
+
+        deadline = deadline if deadline is not None else self.total_deadline
+        tasks = [asyncio.create_task(self._fetch_result(url)) for url in urls]
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning(f"Plazo de {deadline}s agotado: {len(pending)} de {len(urls)} URLs sin descargar")
+
+        results = []
+        for url, task in zip(urls, tasks):
+            if task in done:
+                results.append(task.result())
+            else:
+                results.append(URLFetchResult(url=url, error="Tiempo de descarga agotado"))
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene las métricas del descargador y de su caché.
+
+        Returns:
+            Dict[str, Any]: Aciertos, revalidaciones, descargas y métricas de la caché
+        """
+        return {
+            **self._stats,
+            "cache": self.cache.get_stats() if self.cache is not None else None
+        }
+
+    async def close(self) -> None:
+        """Cierra el cliente HTTP compartido."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        logger.info("Descargador de URLs cerrado")
+
+
+# Caché del texto limpio de las URLs de referencia
+url_content_cache = TieredCache(
+    name="url_content",
+    max_bytes=settings.URL_CACHE_MAX_BYTES,
+    ttl=settings.URL_CACHE_TTL,
+    disk_dir=settings.URL_CACHE_DIR,
+    compression_level=settings.CACHE_COMPRESSION_LEVEL,
+    max_disk_bytes=settings.URL_CACHE_DISK_MAX_BYTES,
+    stale_ttl=settings.URL_CACHE_STALE_TTL
+) if settings.URL_CACHE_ENABLED else None
+
+# Descargador compartido por todos los agentes del proceso
+url_fetcher = AsyncURLFetcher(cache=url_content_cache)
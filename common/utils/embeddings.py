@@ -0,0 +1,128 @@
+from abc import ABC, abstractmethod
+from typing import List, Sequence
+import hashlib
+import re
+import unicodedata
+
+import numpy as np
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+class Embedder(ABC):
+    """
+    Convierte textos en vectores normalizados (norma L2 = 1).
+
+    Con vectores normalizados, el producto escalar es la similitud coseno, que
+    es lo que usa la caché semántica para buscar vecinos.
+    """
+
+    dimension: int
+
+    @abstractmethod
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Calcula los vectores de una lista de textos.
+
+        Args:
+            texts: Textos a convertir
+
+        Returns:
+            np.ndarray: Matriz float32 de forma (len(texts), dimension)
+        """
+        pass
+
+    def embed_one(self, text: str) -> np.ndarray:
+        """
+        Calcula el vector de un único texto.
+
+        Args:
+            text: Texto a convertir
+
+        Returns:
+            np.ndarray: Vector float32 de tamaño dimension
+        """
+        return self.embed([text])[0]
+
+
+class HashingEmbedder(Embedder):
+    """
+    Embedder local sin modelo: hashing de palabras y n-gramas de caracteres.
+
+    Cada rasgo (palabra o n-grama) se asigna a una posición del vector con un
+    hash estable y un signo, y se pondera con tf logarítmico. Los n-gramas de
+    caracteres hacen que cambios pequeños de redacción (plurales, tildes,
+    conjugaciones) sigan dando vectores muy parecidos.
+    """
+
+    def __init__(self, dimension: int = 512, ngram_range: tuple = (3, 5)):
+        """
+        Inicializa el embedder.
+
+        Args:
+            dimension: Tamaño de los vectores
+            ngram_range: Longitud mínima y máxima de los n-gramas de caracteres
+        """
+        self.dimension = dimension
+        self.ngram_range = ngram_range
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Normaliza un texto: minúsculas, sin tildes y con espacios simples.
+
+        Args:
+            text: Texto original
+
+        Returns:
+            str: Texto normalizado
+        """
+        text = unicodedata.normalize("NFKD", text.lower())
+        text = "".join(char for char in text if not unicodedata.combining(char))
+        return " ".join(text.split())
+
+    def _features(self, text: str) -> List[str]:
+        """
+        Obtiene los rasgos de un texto normalizado.
+
+        Args:
+            text: Texto normalizado
+
+        Returns:
+            List[str]: Palabras y n-gramas de caracteres de cada palabra
+        """
+        features = []
+        min_n, max_n = self.ngram_range
+        for word in _WORD_PATTERN.findall(text):
+            features.append(f"w:{word}")
+            padded = f" {word} "
+            for n in range(min_n, max_n + 1):
+                features.extend(f"c:{padded[i:i + n]}" for i in range(len(padded) - n + 1))
+        return features
+
+    def _hash(self, feature: str) -> tuple:
+        """
+        Calcula la posición y el signo de un rasgo con un hash estable entre procesos.
+
+        Args:
+            feature: Rasgo a asignar
+
+        Returns:
+            tuple: Índice en el vector y signo (+1 o -1)
+        """
+        digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        return digest % self.dimension, 1.0 if (digest >> 63) & 1 else -1.0
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts = {}
+            for feature in self._features(self.normalize(text)):
+                counts[feature] = counts.get(feature, 0) + 1
+            for feature, count in counts.items():
+                index, sign = self._hash(feature)
+                vectors[row, index] += sign * (1.0 + np.log(count))
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
@@ -1,42 +1,54 @@
-import requests
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, AsyncIterator, Iterator
 import json
 from io import BytesIO
 import re
 from pathlib import Path
 import tempfile
+import threading
+import time
 import os
+from collections import OrderedDict
 
+import tiktoken
 from PyPDF2 import PdfReader
 from core.logger import get_logger
+from core.config import settings
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
 logger = get_logger("helpers")
 
 
-def extract_text_from_pdf(pdf_bytes: bytes) -> str:
+def count_pdf_pages(pdf_bytes: bytes) -> int:
     """
-    Extrae texto de un archivo PDF.
+    Cuenta las páginas de un archivo PDF sin extraer su texto.
     
     Args:
         pdf_bytes: Bytes del archivo PDF
         
     Returns:
-        str: Texto extraído del PDF
+        int: Número de páginas
     """
-    try:
-        pdf_file = BytesIO(pdf_bytes)
-        pdf_reader = PdfReader(pdf_file)
-        
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
+    return len(PdfReader(BytesIO(pdf_bytes)).pages)
+
+
+def iter_pdf_pages(pdf_bytes: bytes, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+    """
+    Extrae el texto de un PDF página a página, a medida que se parsea cada una.
+    
+    Args:
+        pdf_bytes: Bytes del archivo PDF
+        start: Índice de la primera página
+        end: Índice de la página en la que parar, sin incluirla (opcional)
         
-        logger.info(f"Texto extraído de PDF con {len(pdf_reader.pages)} páginas")
-        return text
-    except Exception as e:
-        logger.error(f"Error al guardar archivo temporal: {str(e)}")
-        raise
+    Yields:
+        str: Texto de cada página
+    """
+    pdf_reader = PdfReader(BytesIO(pdf_bytes))
+    total_pages = len(pdf_reader.pages)
+    end = total_pages if end is None else min(end, total_pages)
+    
+    for index in range(start, end):
+        yield pdf_reader.pages[index].extract_text() or ""
 
 
 def clean_temp_file(file_path: str) -> None:
@@ -124,45 +136,312 @@ def chunk_text(text: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> L
     return [chunk.page_content for chunk in chunks]
 
 
-def extract_content_from_url(url: str) -> str:
+def extract_hashtags(text: str) -> List[str]:
     """
-    Extrae el contenido de una URL.
+    Extrae hashtags de un texto.
     
     Args:
-        url: URL de la que extraer el contenido
+        text: Texto del que extraer hashtags
         
     Returns:
-        str: Contenido extraído
+        List[str]: Lista de hashtags extraídos
     """
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        
-        # Aquí se podría implementar un parser HTML más sofisticado
-        # Por ahora simplificamos a texto plano
-        content = response.text
+    hashtags = re.findall(r'#(\w+)', text)
+    return hashtags
+
+
+# Cabeceras para respuestas Server-Sent Events (evitan el buffering en proxies)
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no"
+}
+
+
+def format_sse_event(event: str, data: Any) -> str:
+    """
+    Formatea un evento Server-Sent Events.
+    
+    Args:
+        event: Nombre del evento
+        data: Datos del evento (se serializan a JSON)
         
-        # Eliminar tags HTML básicos
-        content = re.sub(r'<[^>]+>', ' ', content)
-        # Eliminar espacios múltiples
-        content = re.sub(r'\s+', ' ', content).strip()
+    Returns:
+        str: Evento formateado según el protocolo SSE
+    """
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+async def iter_sse_events(events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    """
+    Convierte un flujo de eventos en texto SSE, emitiendo un evento "error" si falla.
+    
+    Args:
+        events: Flujo de eventos con las claves "event" y "data"
         
-        logger.info(f"Contenido extraído de URL: {url}")
-        return content
+    Yields:
+        str: Eventos formateados según el protocolo SSE
+    """
+    try:
+        async for event in events:
+            yield format_sse_event(event["event"], event["data"])
     except Exception as e:
-        logger.error(f"Error al extraer contenido de URL: {str(e)}")
-        raise
+        logger.error(f"Error durante la generación en streaming: {str(e)}")
+        yield format_sse_event("error", {"detail": str(e)})
 
 
-def extract_hashtags(text: str) -> List[str]:
+# Tipo de contenido de las respuestas NDJSON (un objeto JSON por línea)
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+async def iter_ndjson_lines(items: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
     """
-    Extrae hashtags de un texto.
+    Convierte un flujo de objetos en líneas NDJSON, emitiendo una línea "error" si falla.
     
     Args:
-        text: Texto del que extraer hashtags
+        items: Flujo de objetos serializables a JSON
         
-    Returns:
-        List[str]: Lista de hashtags extraídos
+    Yields:
+        str: Un objeto JSON por línea
     """
-    hashtags = re.findall(r'#(\w+)', text)
-    return hashtags
\ No newline at end of file
+    try:
+        async for item in items:
+            yield json.dumps(item, ensure_ascii=False, default=str) + "\n"
+    except Exception as e:
+        logger.error(f"Error durante la generación por lotes: {str(e)}")
+        yield json.dumps({"error": str(e)}, ensure_ascii=False) + "\n"
+
+
+class IncrementalResponseParser:
+    """
+    Parser incremental para respuestas del LLM recibidas por fragmentos.
+    
+    Mantiene el estado del parseo (sección actual, número de línea y campos
+    encontrados) y procesa solo las líneas que se completan en cada fragmento,
+    de modo que el coste total es lineal en la longitud de la respuesta.
+    Devuelve los campos que han cambiado desde la última llamada.
+    """
+    
+    def __init__(self, parse_line: Callable[[str, int, Dict[str, Any]], None]):
+        """
+        Inicializa el parser.
+        
+        Args:
+            parse_line: Función que procesa una línea completa (texto, número de línea
+                y estado) y actualiza el estado. Las claves que empiezan por "_" son
+                estado interno y no se devuelven en los resultados parciales
+        """
+        self._parse_line = parse_line
+        self._chunks: List[str] = []
+        self._pending = ""
+        self._line_number = 0
+        self._state: Dict[str, Any] = {}
+        self._emitted: Dict[str, Any] = {}
+    
+    @property
+    def text(self) -> str:
+        """Texto acumulado hasta el momento."""
+        return "".join(self._chunks)
+    
+    def feed(self, chunk: str) -> Optional[Dict[str, Any]]:
+        """
+        Añade un fragmento y parsea las líneas que se completan con él.
+        
+        Args:
+            chunk: Fragmento de texto recibido
+            
+        Returns:
+            Optional[Dict[str, Any]]: Campos que han cambiado, o None si no hay cambios
+        """
+        self._chunks.append(chunk)
+        if "\n" not in chunk:
+            self._pending += chunk
+            return None
+        
+        lines = (self._pending + chunk).split("\n")
+        self._pending = lines.pop()
+        for line in lines:
+            self._parse_line(line, self._line_number, self._state)
+            self._line_number += 1
+        
+        changed = {
+            key: value for key, value in self._state.items()
+            if not key.startswith("_") and self._emitted.get(key) != value
+        }
+        self._emitted.update(changed)
+        
+        return changed or None
+
+
+class TokenCounter:
+    """
+    Contador de tokens con caché de codificadores por familia de modelos.
+    
+    Cargar los ficheros BPE de tiktoken cuesta cientos de milisegundos, así que
+    cada codificación se carga una sola vez (y puede precargarse al arrancar).
+    Los conteos de textos estáticos, como los mensajes del sistema compilados,
+    se memorizan en una caché LRU acotada.
+    
+    Si un codificador no se puede cargar (sin red ni ficheros en caché), los
+    conteos y recortes se estiman por caracteres en lugar de hacer fallar la
+    generación; la carga se reintenta pasado ENCODING_RETRY_INTERVAL.
+    """
+    
+    DEFAULT_ENCODING = "cl100k_base"
+    # Estimación conservadora (por exceso) para cuando no hay codificador
+    CHARS_PER_TOKEN_ESTIMATE = 3
+    ENCODING_RETRY_INTERVAL = 300
+    
+    def __init__(self, max_cached_counts: int = settings.TOKEN_COUNT_CACHE_SIZE):
+        """
+        Inicializa el contador.
+        
+        Args:
+            max_cached_counts: Número máximo de conteos memorizados
+        """
+        self.max_cached_counts = max_cached_counts
+        self._encodings: Dict[str, tiktoken.Encoding] = {}
+        self._model_encodings: Dict[str, str] = {}
+        self._counts: "OrderedDict[tuple, int]" = OrderedDict()
+        self._failed_encodings: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    def _encoding_name(self, model: str) -> str:
+        """Obtiene el nombre de la codificación de un modelo (fine-tuned incluidos)."""
+        encoding_name = self._model_encodings.get(model)
+        if encoding_name is None:
+            try:
+                encoding_name = tiktoken.encoding_name_for_model(model)
+            except KeyError:
+                encoding_name = self.DEFAULT_ENCODING
+            self._model_encodings[model] = encoding_name
+        return encoding_name
+    
+    def get_encoding(self, model: str) -> tiktoken.Encoding:
+        """
+        Obtiene el codificador de un modelo, cargándolo solo la primera vez por familia.
+        
+        Args:
+            model: Nombre del modelo
+            
+        Returns:
+            tiktoken.Encoding: Codificador del modelo
+        """
+        encoding_name = self._encoding_name(model)
+        encoding = self._encodings.get(encoding_name)
+        if encoding is None:
+            with self._lock:
+                encoding = self._encodings.get(encoding_name)
+                if encoding is None:
+                    encoding = tiktoken.get_encoding(encoding_name)
+                    self._encodings[encoding_name] = encoding
+                    logger.info(f"Codificador {encoding_name} cargado para el modelo {model}")
+        return encoding
+    
+    def _try_encoding(self, model: str) -> Optional[tiktoken.Encoding]:
+        """
+        Obtiene el codificador de un modelo sin propagar los errores de carga.
+        
+        Args:
+            model: Nombre del modelo
+            
+        Returns:
+            Optional[tiktoken.Encoding]: Codificador, o None si no se pudo cargar
+        """
+        encoding_name = self._encoding_name(model)
+        failed_at = self._failed_encodings.get(encoding_name)
+        if failed_at is not None and time.monotonic() - failed_at < self.ENCODING_RETRY_INTERVAL:
+            return None
+        
+        try:
+            encoding = self.get_encoding(model)
+        except Exception as e:
+            self._failed_encodings[encoding_name] = time.monotonic()
+            logger.warning(
+                f"No se pudo cargar el codificador {encoding_name}, los tokens se estimarán por caracteres: {str(e)}"
+            )
+            return None
+        
+        self._failed_encodings.pop(encoding_name, None)
+        return encoding
+    
+    def warm_up(self, models: List[str]) -> None:
+        """
+        Precarga los codificadores de los modelos indicados.
+        
+        Args:
+            models: Modelos cuyos codificadores se cargan
+        """
+        for model in models:
+            self.get_encoding(model)
+    
+    def encode(self, text: str, model: str) -> List[int]:
+        """
+        Codifica un texto en tokens.
+        
+        Args:
+            text: Texto a codificar
+            model: Modelo cuyo codificador se utiliza
+            
+        Returns:
+            List[int]: Tokens del texto
+        """
+        return self.get_encoding(model).encode(text, disallowed_special=())
+    
+    def count(self, text: str, model: str, memoize: bool = False) -> int:
+        """
+        Cuenta los tokens de un texto.
+        
+        Args:
+            text: Texto a contar
+            model: Modelo cuyo codificador se utiliza
+            memoize: Memoriza el resultado (para textos estáticos que se repiten)
+            
+        Returns:
+            int: Número de tokens
+        """
+        encoding = self._try_encoding(model)
+        if encoding is None:
+            return -(-len(text) // self.CHARS_PER_TOKEN_ESTIMATE)
+        if not memoize:
+            return len(encoding.encode(text, disallowed_special=()))
+        
+        key = (self._encoding_name(model), text)
+        with self._lock:
+            count = self._counts.get(key)
+            if count is not None:
+                self._counts.move_to_end(key)
+                return count
+        
+        count = len(encoding.encode(text, disallowed_special=()))
+        with self._lock:
+            self._counts[key] = count
+            if len(self._counts) > self.max_cached_counts:
+                self._counts.popitem(last=False)
+        return count
+    
+    def truncate(self, text: str, model: str, max_tokens: int) -> str:
+        """
+        Recorta un texto a un número máximo de tokens.
+        
+        Args:
+            text: Texto a recortar
+            model: Modelo cuyo codificador se utiliza
+            max_tokens: Número máximo de tokens
+            
+        Returns:
+            str: Texto recortado
+        """
+        if max_tokens <= 0:
+            return ""
+        encoding = self._try_encoding(model)
+        if encoding is None:
+            return text[:max_tokens * self.CHARS_PER_TOKEN_ESTIMATE]
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return encoding.decode(tokens[:max_tokens])
+
+
+# Contador compartido por todo el proceso
+token_counter = TokenCounter()
@@ -0,0 +1,172 @@
+from html.parser import HTMLParser
+from typing import List, Optional
+import codecs
+import re
+
+# Etiquetas cuyo contenido nunca es texto útil
+SKIPPED_TAGS = {
+    "title", "script", "style", "noscript", "template", "svg", "canvas", "iframe",
+    "nav", "header", "footer", "aside", "form", "button", "select"
+}
+
+# Etiquetas que delimitan bloques de texto
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "br", "hr", "li", "ul", "ol",
+    "table", "tr", "blockquote", "pre", "figure", "figcaption", "dd", "dt",
+    "h1", "h2", "h3", "h4", "h5", "h6"
+}
+
+# Etiquetas que suelen contener el contenido principal de la página
+MAIN_CONTENT_TAGS = {"main", "article"}
+
+# Etiquetas sin cierre
+VOID_TAGS = {"br", "hr", "img", "input", "meta", "link", "source", "wbr", "area", "base", "col", "embed"}
+
+HEADING_LEVELS = {f"h{level}": level for level in range(1, 7)}
+
+_WHITESPACE_RE = re.compile(r"[ \t\r\f\v]+")
+
+
+class StreamingHTMLTextExtractor(HTMLParser):
+    """
+    Extractor incremental de texto a partir de HTML.
+
+    Procesa el documento por fragmentos de bytes a medida que llegan, descarta
+    scripts, estilos y navegación, conserva los encabezados con formato Markdown
+    y prioriza el texto dentro de <main>/<article>. Indica cuándo ya tiene
+    suficiente texto útil para poder dejar de leer la respuesta.
+    """
+
+    def __init__(self, max_chars: Optional[int] = None, encoding: str = "utf-8"):
+        """
+        Inicializa el extractor.
+
+        Args:
+            max_chars: Número de caracteres útiles a partir del cual se deja de leer (opcional)
+            encoding: Codificación de los bytes recibidos
+        """
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        try:
+            self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        except LookupError:
+            self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._skip_depth = 0
+        self._main_depth = 0
+        self._all_blocks: List[str] = []
+        self._main_blocks: List[str] = []
+        self._current: List[str] = []
+        self._current_in_main = False
+        self._all_chars = 0
+        self._main_chars = 0
+
+    @property
+    def has_enough(self) -> bool:
+        """Indica si ya se ha extraído suficiente texto útil."""
+        if self.max_chars is None:
+            return False
+        if self._main_chars >= self.max_chars:
+            return True
+        # Sin contenido principal identificado, se lee algo más antes de parar
+        return not self._main_depth and self._all_chars >= self.max_chars * 2
+
+    def _flush_block(self) -> None:
+        """Cierra el bloque de texto actual."""
+        if not self._current:
+            return
+
+        text = _WHITESPACE_RE.sub(" ", "".join(self._current)).strip()
+        self._current = []
+        if not text:
+            return
+
+        self._all_blocks.append(text)
+        self._all_chars += len(text)
+        if self._current_in_main:
+            self._main_blocks.append(text)
+            self._main_chars += len(text)
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        """Procesa una etiqueta de apertura."""
+        if tag in SKIPPED_TAGS:
+            if tag not in VOID_TAGS:
+                self._skip_depth += 1
+            return
+        if self._skip_depth:
+            return
+
+        if tag in BLOCK_TAGS:
+            self._flush_block()
+        if tag in MAIN_CONTENT_TAGS:
+            self._main_depth += 1
+        self._current_in_main = self._main_depth > 0
+
+        if tag in HEADING_LEVELS:
+            self._current.append("#" * HEADING_LEVELS[tag] + " ")
+        elif tag == "li":
+            self._current.append("- ")
+
+    def handle_startendtag(self, tag: str, attrs) -> None:
+        """Procesa una etiqueta autocerrada."""
+        if not self._skip_depth and tag in BLOCK_TAGS:
+            self._flush_block()
+
+    def handle_endtag(self, tag: str) -> None:
+        """Procesa una etiqueta de cierre."""
+        if tag in SKIPPED_TAGS:
+            if self._skip_depth:
+                self._skip_depth -= 1
+            return
+        if self._skip_depth:
+            return
+
+        if tag in BLOCK_TAGS:
+            self._flush_block()
+        if tag in MAIN_CONTENT_TAGS and self._main_depth:
+            self._main_depth -= 1
+        self._current_in_main = self._main_depth > 0
+
+    def handle_data(self, data: str) -> None:
+        """Acumula el texto visible."""
+        if not self._skip_depth:
+            self._current.append(data)
+
+    def feed_bytes(self, chunk: bytes) -> None:
+        """
+        Procesa un fragmento de bytes del documento.
+
+        Args:
+            chunk: Fragmento recibido
+        """
+        self.feed(self._decoder.decode(chunk))
+
+    def get_text(self) -> str:
+        """
+        Obtiene el texto extraído hasta el momento.
+
+        Returns:
+            str: Texto con un bloque por línea, truncado a max_chars si se indicó
+        """
+        self._flush_block()
+        blocks = self._main_blocks if self._main_blocks else self._all_blocks
+        text = "\n".join(blocks)
+        if self.max_chars is not None:
+            text = text[:self.max_chars]
+        return text
+
+
+def html_to_text(html: str, max_chars: Optional[int] = None) -> str:
+    """
+    Convierte un documento HTML completo en texto plano estructurado.
+
+    Args:
+        html: Contenido HTML
+        max_chars: Número máximo de caracteres a devolver (opcional)
+
+    Returns:
+        str: Texto extraído
+    """
+    extractor = StreamingHTMLTextExtractor(max_chars=max_chars)
+    extractor.feed(html)
+    extractor.close()
+    return extractor.get_text()
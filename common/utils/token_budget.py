@@ -0,0 +1,190 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from common.utils.helpers import token_counter
+from core.logger import get_logger
+from core.config import settings
+
+logger = get_logger("token_budget")
+
+# Ventana de contexto (tokens) por prefijo de modelo; se usa el prefijo más largo que coincida
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-4.1": 1047576,
+    "gpt-4o": 128000,
+    "gpt-4-turbo": 128000,
+    "gpt-4-32k": 32768,
+    "gpt-4": 8192,
+    "gpt-3.5-turbo": 16385,
+    "o1": 200000,
+    "o3": 200000,
+    "o4-mini": 200000
+}
+
+# Tokens que añade el formato de chat por cada mensaje y por la respuesta
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 3
+
+
+def get_context_window(model: str) -> int:
+    """
+    Obtiene la ventana de contexto de un modelo, incluidos los fine-tuned ("ft:<base>:...").
+
+    Args:
+        model: Nombre del modelo
+
+    Returns:
+        int: Número máximo de tokens entre entrada y salida
+    """
+    base_model = model[3:] if model.startswith("ft:") else model
+    for prefix in sorted(MODEL_CONTEXT_WINDOWS, key=len, reverse=True):
+        if base_model.startswith(prefix):
+            return MODEL_CONTEXT_WINDOWS[prefix]
+    return settings.DEFAULT_CONTEXT_WINDOW
+
+
+@dataclass
+class ContextItem:
+    """Fragmento de contexto opcional que se recorta si no cabe en el prompt."""
+    key: str
+    text: str
+    # Los elementos de mayor prioridad se asignan primero
+    priority: int = 0
+
+
+@dataclass
+class BudgetPlan:
+    """Resultado del reparto del presupuesto de tokens."""
+    texts: Dict[str, str]
+    fixed_tokens: int
+    available_tokens: int
+    used_tokens: int
+    trimmed: List[str] = field(default_factory=list)
+
+
+class TokenBudgetPlanner:
+    """
+    Reparte la ventana de contexto de un modelo entre el prompt y el contexto adicional.
+
+    Cuenta los tokens del mensaje del sistema y del usuario, reserva la salida
+    máxima y reparte el resto entre los fragmentos de contexto (contenido de
+    URLs, páginas de PDFs...) por orden de prioridad. Dentro de una misma
+    prioridad el reparto es equitativo: los fragmentos cortos entran completos
+    y lo que sobra se reparte entre los largos.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        max_output_tokens: int,
+        context_window: Optional[int] = None,
+        safety_margin: int = settings.TOKEN_BUDGET_SAFETY_MARGIN
+    ):
+        """
+        Inicializa el planificador.
+
+        Args:
+            model: Modelo que recibirá el prompt
+            max_output_tokens: Tokens reservados para la respuesta
+            context_window: Ventana de contexto (opcional, por defecto la del modelo)
+            safety_margin: Tokens de margen para diferencias de conteo
+        """
+        self.model = model
+        self.max_output_tokens = max_output_tokens
+        self.context_window = context_window or get_context_window(model)
+        self.safety_margin = safety_margin
+
+    def count_tokens(self, text: str, memoize: bool = False) -> int:
+        """
+        Cuenta los tokens de un texto con el codificador del modelo.
+
+        Args:
+            text: Texto a contar
+            memoize: Memoriza el resultado (para textos estáticos)
+
+        Returns:
+            int: Número de tokens
+        """
+        return token_counter.count(text, self.model, memoize=memoize)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """
+        Recorta un texto a un número máximo de tokens.
+
+        Args:
+            text: Texto a recortar
+            max_tokens: Número máximo de tokens
+
+        Returns:
+            str: Texto recortado
+        """
+        return token_counter.truncate(text, self.model, max_tokens)
+
+    def plan(
+        self,
+        fixed_texts: List[str],
+        items: List[ContextItem],
+        static_texts: Sequence[str] = ()
+    ) -> BudgetPlan:
+        """
+        Calcula qué parte de cada fragmento de contexto cabe en el prompt.
+
+        Args:
+            fixed_texts: Mensajes que se envían siempre (usuario sin el contexto)
+            items: Fragmentos de contexto a repartir
+            static_texts: Mensajes que no cambian entre peticiones (sistema); su conteo se memoriza
+
+        Returns:
+            BudgetPlan: Textos recortados por clave y resumen del reparto
+        """
+        fixed_tokens = (
+            sum(self.count_tokens(text, memoize=True) + TOKENS_PER_MESSAGE for text in static_texts)
+            + sum(self.count_tokens(text) + TOKENS_PER_MESSAGE for text in fixed_texts)
+            + TOKENS_PER_REPLY
+        )
+        available = max(0, self.context_window - self.max_output_tokens - self.safety_margin - fixed_tokens)
+        if not available:
+            logger.warning(
+                f"El prompt fijo ({fixed_tokens} tokens) no deja espacio para contexto en {self.model} "
+                f"(ventana: {self.context_window}, salida: {self.max_output_tokens})"
+            )
+
+        token_counts = {item.key: self.count_tokens(item.text) for item in items}
+        allocations: Dict[str, int] = {}
+        remaining = available
+
+        for priority in sorted({item.priority for item in items}, reverse=True):
+            pending = sorted(
+                (item for item in items if item.priority == priority),
+                key=lambda item: token_counts[item.key]
+            )
+            while pending:
+                share = remaining // len(pending)
+                smallest = pending[0]
+                if token_counts[smallest.key] <= share:
+                    # Cabe completo: lo que no usa queda para el resto del grupo
+                    allocations[smallest.key] = token_counts[smallest.key]
+                    remaining -= token_counts[smallest.key]
+                    pending.pop(0)
+                else:
+                    for item in pending:
+                        allocations[item.key] = share
+                        remaining -= share
+                    pending = []
+
+        texts = {}
+        trimmed = []
+        for item in items:
+            allocation = allocations.get(item.key, 0)
+            if allocation < token_counts[item.key]:
+                trimmed.append(item.key)
+                texts[item.key] = self.truncate(item.text, allocation)
+            else:
+                texts[item.key] = item.text
+
+        return BudgetPlan(
+            texts=texts,
+            fixed_tokens=fixed_tokens,
+            available_tokens=available,
+            used_tokens=available - remaining,
+            trimmed=trimmed
+        )
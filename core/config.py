@@ -29,6 +29,85 @@ class Settings(BaseSettings):
     DEFAULT_TEMPERATURE: float = float(os.getenv("DEFAULT_TEMPERATURE", "0.7"))
     DEFAULT_MAX_TOKENS: int = int(os.getenv("DEFAULT_MAX_TOKENS", "2000"))  
     
+    # Presupuesto de tokens del prompt (ventana por defecto para modelos desconocidos)
+    DEFAULT_CONTEXT_WINDOW: int = int(os.getenv("DEFAULT_CONTEXT_WINDOW", "8192"))
+    TOKEN_BUDGET_SAFETY_MARGIN: int = int(os.getenv("TOKEN_BUDGET_SAFETY_MARGIN", "256"))
+    TOKEN_COUNT_CACHE_SIZE: int = int(os.getenv("TOKEN_COUNT_CACHE_SIZE", "256"))
+    # Modelos cuyos codificadores se precargan al arrancar (además de OPENAI_MODEL)
+    # (lista separada por comas; se declara como texto porque pydantic-settings leería una lista como JSON)
+    TOKENIZER_WARMUP_MODELS: str = os.getenv("TOKENIZER_WARMUP_MODELS", "gpt-4o")
+    
+    # Caché de clientes LLM compartidos
+    LLM_CLIENT_CACHE_SIZE: int = int(os.getenv("LLM_CLIENT_CACHE_SIZE", "16"))
+    LLM_HTTP_MAX_CONNECTIONS: int = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100"))
+    LLM_HTTP_MAX_KEEPALIVE: int = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "20"))
+    
+    # Límite de llamadas por modelo (peticiones por minuto; 0 = sin límite)
+    LLM_RATE_LIMIT_RPM: float = float(os.getenv("LLM_RATE_LIMIT_RPM", "0"))
+    LLM_RATE_LIMIT_BURST: int = int(os.getenv("LLM_RATE_LIMIT_BURST", "5"))
+    
+    # Descarga de URLs de referencia
+    URL_FETCH_MAX_CONCURRENCY: int = int(os.getenv("URL_FETCH_MAX_CONCURRENCY", "10"))
+    URL_FETCH_PER_HOST_LIMIT: int = int(os.getenv("URL_FETCH_PER_HOST_LIMIT", "2"))
+    URL_FETCH_TIMEOUT: float = float(os.getenv("URL_FETCH_TIMEOUT", "10"))
+    URL_FETCH_DEADLINE: float = float(os.getenv("URL_FETCH_DEADLINE", "15"))
+    # Límite de lectura por página; el recorte al espacio del prompt lo hace el presupuesto de tokens
+    URL_CONTENT_MAX_CHARS: int = int(os.getenv("URL_CONTENT_MAX_CHARS", "200000"))
+    
+    # Caché de contenido de URLs (texto limpio)
+    URL_CACHE_ENABLED: bool = os.getenv("URL_CACHE_ENABLED", "True").lower() in ("true", "1", "t")
+    URL_CACHE_TTL: int = int(os.getenv("URL_CACHE_TTL", "3600"))
+    URL_CACHE_MAX_BYTES: int = int(os.getenv("URL_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    URL_CACHE_DIR: Optional[str] = os.getenv("URL_CACHE_DIR")
+    URL_CACHE_DISK_MAX_BYTES: int = int(os.getenv("URL_CACHE_DISK_MAX_BYTES", str(256 * 1024 * 1024)))
+    # Tiempo que se conserva en disco el texto caducado para revalidarlo con ETag/Last-Modified
+    URL_CACHE_STALE_TTL: int = int(os.getenv("URL_CACHE_STALE_TTL", str(24 * 3600)))
+    CACHE_COMPRESSION_LEVEL: int = int(os.getenv("CACHE_COMPRESSION_LEVEL", "3"))
+    
+    # Extracción de texto de PDFs en procesos separados
+    PDF_POOL_WORKERS: int = int(os.getenv("PDF_POOL_WORKERS", "2"))
+    PDF_EXTRACTION_TIMEOUT: float = float(os.getenv("PDF_EXTRACTION_TIMEOUT", "30"))
+    PDF_MAX_PAGES: int = int(os.getenv("PDF_MAX_PAGES", "50"))
+    # Páginas mínimas por tarea (como mucho se crea un rango por proceso)
+    PDF_PAGES_PER_TASK: int = int(os.getenv("PDF_PAGES_PER_TASK", "10"))
+    PDF_MAX_CHARS: int = int(os.getenv("PDF_MAX_CHARS", "20000"))
+    
+    # Caché del texto extraído de PDFs (por hash del contenido)
+    PDF_CACHE_ENABLED: bool = os.getenv("PDF_CACHE_ENABLED", "True").lower() in ("true", "1", "t")
+    PDF_CACHE_TTL: int = int(os.getenv("PDF_CACHE_TTL", str(7 * 24 * 3600)))
+    PDF_CACHE_MAX_BYTES: int = int(os.getenv("PDF_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+    PDF_CACHE_DIR: Optional[str] = os.getenv("PDF_CACHE_DIR")
+    PDF_CACHE_DISK_MAX_BYTES: int = int(os.getenv("PDF_CACHE_DISK_MAX_BYTES", str(256 * 1024 * 1024)))
+    
+    # Caché de respuestas generadas (opcional): misma petición y prompt, misma respuesta
+    RESPONSE_CACHE_ENABLED: bool = os.getenv("RESPONSE_CACHE_ENABLED", "False").lower() in ("true", "1", "t")
+    RESPONSE_CACHE_TTL: int = int(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+    RESPONSE_CACHE_MAX_BYTES: int = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+    RESPONSE_CACHE_DIR: Optional[str] = os.getenv("RESPONSE_CACHE_DIR")
+    RESPONSE_CACHE_DISK_MAX_BYTES: int = int(os.getenv("RESPONSE_CACHE_DISK_MAX_BYTES", str(256 * 1024 * 1024)))
+    
+    # Trabajos de generación de blog en segundo plano
+    BLOG_JOB_WORKERS: int = int(os.getenv("BLOG_JOB_WORKERS", "2"))
+    BLOG_JOB_QUEUE_SIZE: int = int(os.getenv("BLOG_JOB_QUEUE_SIZE", "100"))
+    JOB_EVENTS_HEARTBEAT: float = float(os.getenv("JOB_EVENTS_HEARTBEAT", "15"))
+    # Almacenamiento del estado de los trabajos: "memory" o "sqlite"
+    JOB_STORE_BACKEND: str = os.getenv("JOB_STORE_BACKEND", "memory").lower()
+    JOB_STORE_PATH: str = os.getenv("JOB_STORE_PATH", "data/jobs.sqlite3")
+    JOB_STORE_MAX_JOBS: int = int(os.getenv("JOB_STORE_MAX_JOBS", "1000"))
+    JOB_STORE_RETENTION: int = int(os.getenv("JOB_STORE_RETENTION", str(24 * 3600)))
+    
+    # Generación de posts de LinkedIn por lotes
+    LINKEDIN_BATCH_MAX_POSTS: int = int(os.getenv("LINKEDIN_BATCH_MAX_POSTS", "50"))
+    LINKEDIN_BATCH_CONCURRENCY: int = int(os.getenv("LINKEDIN_BATCH_CONCURRENCY", "4"))
+    LINKEDIN_BATCH_MAX_CONCURRENCY: int = int(os.getenv("LINKEDIN_BATCH_MAX_CONCURRENCY", "10"))
+    
+    # Caché semántica de borradores de LinkedIn (sugerencias para temas parecidos)
+    SEMANTIC_CACHE_ENABLED: bool = os.getenv("SEMANTIC_CACHE_ENABLED", "True").lower() in ("true", "1", "t")
+    SEMANTIC_CACHE_CAPACITY: int = int(os.getenv("SEMANTIC_CACHE_CAPACITY", "2048"))
+    SEMANTIC_CACHE_THRESHOLD: float = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.8"))
+    SEMANTIC_CACHE_MAX_SUGGESTIONS: int = int(os.getenv("SEMANTIC_CACHE_MAX_SUGGESTIONS", "3"))
+    SEMANTIC_EMBEDDING_DIM: int = int(os.getenv("SEMANTIC_EMBEDDING_DIM", "512"))
+    
     # Configuraciones de Base de Datos
     # PostgreSQL para datos relacionales
     POSTGRES_USER: Optional[str] = os.getenv("POSTGRES_USER")
@@ -48,6 +127,18 @@ class Settings(BaseSettings):
     
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    # Formato de los logs: "text" o "json" (un objeto JSON por línea)
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "text").lower()
+    LOG_FILE: str = os.getenv("LOG_FILE", "logs/content_generator.log")
+    LOG_FILE_MAX_BYTES: int = int(os.getenv("LOG_FILE_MAX_BYTES", str(10 * 1024 * 1024)))
+    LOG_FILE_BACKUP_COUNT: int = int(os.getenv("LOG_FILE_BACKUP_COUNT", "5"))
+    # Cola de escritura asíncrona: por encima del umbral se muestrean los registros DEBUG/INFO
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    LOG_QUEUE_HIGH_WATER: float = float(os.getenv("LOG_QUEUE_HIGH_WATER", "0.8"))
+    LOG_SAMPLE_RATE: int = int(os.getenv("LOG_SAMPLE_RATE", "10"))
+    # Registro de los prompts enviados al modelo: off, hashed, truncated o full
+    PROMPT_LOG_MODE: str = os.getenv("PROMPT_LOG_MODE", "hashed").lower()
+    PROMPT_LOG_MAX_CHARS: int = int(os.getenv("PROMPT_LOG_MAX_CHARS", "2000"))
     
     # Configuraciones por defecto para los agentes
     DEFAULT_BLOG_AGENT_CONFIG: Dict[str, Any] = {
@@ -68,6 +159,11 @@ class Settings(BaseSettings):
         "case_sensitive": True,
         "env_file": ".env"
     }
+    
+    @property
+    def tokenizer_warmup_models(self) -> List[str]:
+        """Modelos de TOKENIZER_WARMUP_MODELS como lista."""
+        return [model.strip() for model in self.TOKENIZER_WARMUP_MODELS.split(",") if model.strip()]
 
 # Instancia de configuración
 settings = Settings()
\ No newline at end of file
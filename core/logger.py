@@ -1,19 +1,227 @@
+import atexit
+import copy
+import json
 import logging
 import os
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
-from typing import Optional
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Union
+
+import orjson
 
 from core.config import settings
+from core.request_context import request_id_var
 
 # Crear directorio de logs si no existe
-os.makedirs("logs", exist_ok=True)
+os.makedirs(os.path.dirname(settings.LOG_FILE) or ".", exist_ok=True)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Handler que deja los registros en una cola acotada sin bloquear al llamante.
+
+    Cuando la cola supera el umbral de llenado solo se conserva uno de cada
+    `sample_rate` registros DEBUG/INFO; si la cola está llena, estos se
+    descartan. Los WARNING y superiores esperan brevemente un hueco antes de
+    descartarse.
+    """
+
+    def __init__(self, log_queue: queue.Queue, high_water: int, sample_rate: int, block_timeout: float = 0.05):
+        """
+        Inicializa el handler.
+
+        Args:
+            log_queue: Cola acotada compartida con el listener
+            high_water: Número de registros en cola a partir del cual se muestrea
+            sample_rate: Se conserva uno de cada sample_rate registros al muestrear
+            block_timeout: Espera máxima para los registros WARNING o superiores con la cola llena
+        """
+        super().__init__(log_queue)
+        self.high_water = high_water
+        self.sample_rate = max(1, sample_rate)
+        self.block_timeout = block_timeout
+        self._stats_lock = threading.Lock()
+        self._sample_counter = 0
+        self._stats = {
+            "dropped": 0,
+            "sampled_out": 0
+        }
+
+    def _count(self, stat: str) -> None:
+        """Incrementa un contador de registros perdidos."""
+        with self._stats_lock:
+            self._stats[stat] += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Copia el registro sin formatearlo: el formato lo aplican los handlers del listener.
+
+        QueueHandler.prepare formatea el mensaje en el hilo que escribe el log
+        (el event loop). Aquí solo se copia el registro y sus argumentos, y se
+        conserva exc_info para que el listener formatee también la traza.
+        """
+        record = copy.copy(record)
+        if isinstance(record.args, dict):
+            record.args = dict(record.args)
+        elif record.args:
+            record.args = tuple(record.args)
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Encola un registro aplicando muestreo y descarte bajo presión."""
+        important = record.levelno >= logging.WARNING
+
+        if not important and self.queue.qsize() >= self.high_water:
+            with self._stats_lock:
+                self._sample_counter += 1
+                keep = self._sample_counter % self.sample_rate == 0
+            if not keep:
+                self._count("sampled_out")
+                return
+
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if important:
+                try:
+                    self.queue.put(record, timeout=self.block_timeout)
+                    return
+                except queue.Full:
+                    pass
+            self._count("dropped")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene las métricas de la cola.
+
+        Returns:
+            Dict[str, Any]: Registros en cola, descartados y eliminados por muestreo
+        """
+        with self._stats_lock:
+            return {
+                **self._stats,
+                "queued": self.queue.qsize(),
+                "max_size": self.queue.maxsize
+            }
+
+
+class RequestIDFilter(logging.Filter):
+    """Añade el identificador de la petición en curso a cada registro de log."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Anota el registro con request_id (o "-" fuera de una petición)."""
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get() or "-"
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """Formatea cada registro como un objeto JSON en una sola línea (orjson)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Serializa el registro con sus campos estándar y los datos estructurados adjuntos."""
+        data = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage()
+        }
+
+        generation = getattr(record, "generation", None)
+        if generation is not None:
+            data["generation"] = generation
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+
+        return orjson.dumps(data, default=str).decode("utf-8")
+
+
+class LazyJSON:
+    """
+    Argumento de log que se serializa a JSON solo si el registro llega a emitirse.
+
+    Se pasa como argumento con formato %s (no dentro de un f-string) para que
+    un logger con el nivel desactivado no llegue a serializar el valor:
+
+        logger.debug("Variables: %s", LazyJSON(lambda: kwargs, indent=2))
+    """
+
+    __slots__ = ("_value", "_dumps_kwargs")
+
+    def __init__(self, value: Union[Any, Callable[[], Any]], **dumps_kwargs: Any):
+        """
+        Inicializa el argumento diferido.
+
+        Args:
+            value: Valor a serializar, o función que lo construye al emitir el registro
+            **dumps_kwargs: Argumentos para json.dumps
+        """
+        self._value = value
+        self._dumps_kwargs = {"ensure_ascii": False, "default": str, **dumps_kwargs}
+
+    def __str__(self) -> str:
+        """Serializa el valor en el momento de formatear el registro."""
+        value = self._value() if callable(self._value) else self._value
+        return json.dumps(value, **self._dumps_kwargs)
+
+
+def _create_pipeline() -> tuple:
+    """
+    Crea la cola compartida, sus handlers de salida y el hilo escritor.
+
+    Returns:
+        tuple: Handler de cola y listener
+    """
+    if settings.LOG_FORMAT == "json":
+        log_format = JSONFormatter()
+    else:
+        log_format = logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] - %(message)s"
+        )
+
+    # Handler para consola
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(log_format)
+
+    # Un único archivo rotativo para todos los loggers
+    file_handler = RotatingFileHandler(
+        filename=settings.LOG_FILE,
+        maxBytes=settings.LOG_FILE_MAX_BYTES,
+        backupCount=settings.LOG_FILE_BACKUP_COUNT,
+        encoding="utf-8"
+    )
+    file_handler.setFormatter(log_format)
+
+    log_queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    queue_handler = BoundedQueueHandler(
+        log_queue,
+        high_water=int(settings.LOG_QUEUE_SIZE * settings.LOG_QUEUE_HIGH_WATER),
+        sample_rate=settings.LOG_SAMPLE_RATE
+    )
+    # El identificador de la petición se captura en el hilo que genera el registro
+    queue_handler.addFilter(RequestIDFilter())
+
+    # La escritura y la rotación se hacen en un hilo en segundo plano
+    listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    return queue_handler, listener
+
+
+_queue_handler, _listener = _create_pipeline()
 
 
 def get_logger(name: str, log_level: Optional[str] = None) -> logging.Logger:
     """
     Configura y devuelve un logger con el nombre especificado.
 
+    Todos los loggers comparten la misma cola y los mismos handlers de salida.
+
     Args:
         name (str): El nombre del logger.
         log_level (Optional[str]): El nivel de log a utilizar, por defecto usa el de settings.
@@ -31,31 +239,23 @@ def get_logger(name: str, log_level: Optional[str] = None) -> logging.Logger:
     if logger.handlers:
         return logger
     
-    # Formato de logs
-    log_format = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
-    
-    # Handler para consola
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(log_format)
-    console_handler.setLevel(level)
-    
-    # Handler para archivo rotativo (10 MB máximo por archivo, guarda hasta 5 archivos)
-    file_handler = RotatingFileHandler(
-        filename=f"logs/{name}.log",
-        maxBytes=10 * 1024 * 1024,
-        backupCount=5
-    )
-    file_handler.setFormatter(log_format)
-    file_handler.setLevel(level)
-    
-    # Agregar handlers al logger
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    logger.addHandler(_queue_handler)
     
     return logger
 
 
+def get_logging_stats() -> Dict[str, Any]:
+    """
+    Obtiene las métricas de la cola de logs.
+
+    Returns:
+        Dict[str, Any]: Registros en cola, descartados y eliminados por muestreo
+    """
+    return _queue_handler.get_stats()
+
+
 # Logger principal de la aplicación
-app_logger = get_logger("content_generator")
\ No newline at end of file
+app_logger = get_logger("content_generator")
+
+# Logger de las trazas de generación (core.request_context)
+get_logger("generation")
@@ -0,0 +1,410 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import threading
+import time
+
+# Límites por defecto de los histogramas (segundos), del estilo de los de Prometheus
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Límites para las llamadas al modelo, que tardan de segundos a minutos
+LLM_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+
+# Tipo de contenido del formato de texto de Prometheus
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape_label_value(value: str) -> str:
+    """Escapa un valor de etiqueta según el formato de texto de Prometheus."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """
+    Formatea las etiquetas de una muestra.
+
+    Args:
+        names: Nombres de las etiquetas
+        values: Valores de las etiquetas
+
+    Returns:
+        str: Etiquetas entre llaves, o cadena vacía si no hay
+    """
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    """Formatea un valor numérico sin decimales innecesarios."""
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric:
+    """
+    Métrica con etiquetas, al estilo de prometheus_client pero sin dependencias.
+
+    Cada combinación de valores de etiquetas es una serie independiente. Las
+    operaciones son seguras entre hilos.
+    """
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """
+        Inicializa la métrica.
+
+        Args:
+            name: Nombre de la métrica
+            documentation: Descripción que se publica en la línea HELP
+            labelnames: Nombres de las etiquetas
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: Dict[str, str]) -> LabelValues:
+        """
+        Ordena los valores de las etiquetas según su declaración.
+
+        Args:
+            labels: Valores de las etiquetas por nombre
+
+        Returns:
+            LabelValues: Valores en el orden de labelnames
+
+        Raises:
+            ValueError: Si las etiquetas no coinciden con las declaradas
+        """
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"Etiquetas incorrectas para {self.name}: {sorted(labels)} (se esperaban {list(self.labelnames)})"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def collect(self) -> List[str]:
+        """
+        Genera las líneas de muestras de la métrica.
+
+        Returns:
+            List[str]: Líneas en formato de texto de Prometheus
+        """
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """
+        Genera la métrica completa con sus líneas HELP y TYPE.
+
+        Returns:
+            str: Bloque de texto de la métrica
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+            *self.collect()
+        ]
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Contador que solo puede incrementarse."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """
+        Incrementa el contador.
+
+        Args:
+            amount: Cantidad a sumar (no negativa)
+            **labels: Valores de las etiquetas
+        """
+        if amount < 0:
+            raise ValueError("Los contadores solo pueden incrementarse")
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values
+        ]
+
+
+class Gauge(Metric):
+    """Valor que puede subir y bajar (por ejemplo, peticiones en curso)."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Suma una cantidad al valor."""
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        """Resta una cantidad al valor."""
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        """Fija el valor."""
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = value
+
+    @contextmanager
+    def track_inprogress(self, **labels: str) -> Iterator[None]:
+        """
+        Incrementa el valor mientras dura el bloque.
+
+        Args:
+            **labels: Valores de las etiquetas
+        """
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values
+        ]
+
+
+class Histogram(Metric):
+    """Distribución de observaciones en intervalos acumulados (buckets)."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        """
+        Inicializa el histograma.
+
+        Args:
+            name: Nombre de la métrica
+            documentation: Descripción que se publica en la línea HELP
+            labelnames: Nombres de las etiquetas
+            buckets: Límites superiores de los intervalos, en orden creciente
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Por serie: cuentas por intervalo (el último es +Inf), suma y número de observaciones
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """
+        Registra una observación.
+
+        Args:
+            value: Valor observado
+            **labels: Valores de las etiquetas
+        """
+        key = self._label_values(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = ([0] * (len(self.buckets) + 1), [0.0])
+                self._series[key] = series
+            series[0][index] += 1
+            series[1][0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """
+        Observa la duración del bloque en segundos, termine bien o con error.
+
+        Args:
+            **labels: Valores de las etiquetas
+        """
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started_at, **labels)
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            series = [(key, list(counts), total[0]) for key, (counts, total) in self._series.items()]
+
+        lines = []
+        bucket_labelnames = (*self.labelnames, "le")
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                labels = _format_labels(bucket_labelnames, (*key, _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Conjunto de métricas del proceso que se publican en /metrics."""
+
+    def __init__(self):
+        """Inicializa el registro vacío."""
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        """
+        Registra una métrica.
+
+        Args:
+            metric: Métrica a registrar
+
+        Returns:
+            Metric: La misma métrica, para poder encadenar la creación
+
+        Raises:
+            ValueError: Si ya existe una métrica con ese nombre
+        """
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Métrica ya registrada: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Crea y registra un contador."""
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Crea y registra un gauge."""
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Crea y registra un histograma."""
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """
+        Genera el texto de todas las métricas en el formato de exposición de Prometheus.
+
+        Returns:
+            str: Métricas listas para servir en /metrics
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+def exception_name(error: BaseException) -> str:
+    """
+    Obtiene el tipo de excepción que se usa como etiqueta de los errores.
+
+    Las rutas convierten los errores en HTTPException; en ese caso se usa la
+    excepción original si la hay, para no agrupar todos los fallos bajo el
+    mismo nombre.
+
+    Args:
+        error: Excepción producida
+
+    Returns:
+        str: Nombre del tipo de la excepción
+    """
+    if type(error).__name__ == "HTTPException":
+        original: Optional[BaseException] = error.__cause__ or error.__context__
+        if original is not None:
+            error = original
+    return type(error).__name__
+
+
+# Registro compartido por todo el proceso
+metrics_registry = MetricsRegistry()
+
+http_request_duration_seconds = metrics_registry.histogram(
+    "http_request_duration_seconds",
+    "Duración de las peticiones HTTP por ruta (en streaming, hasta el inicio de la respuesta)",
+    ("method", "route", "status")
+)
+http_requests_in_flight = metrics_registry.gauge(
+    "http_requests_in_flight",
+    "Peticiones HTTP en curso por ruta",
+    ("route",)
+)
+llm_request_duration_seconds = metrics_registry.histogram(
+    "llm_request_duration_seconds",
+    "Duración de las llamadas al modelo de lenguaje",
+    ("model", "mode"),
+    buckets=LLM_BUCKETS
+)
+llm_requests_in_flight = metrics_registry.gauge(
+    "llm_requests_in_flight",
+    "Llamadas al modelo de lenguaje en curso",
+    ("model",)
+)
+llm_coalesced_requests_total = metrics_registry.counter(
+    "llm_coalesced_requests_total",
+    "Llamadas al modelo agrupadas con una idéntica en curso (single-flight)",
+    ("model",)
+)
+llm_tokens_total = metrics_registry.counter(
+    "llm_tokens_total",
+    "Tokens consumidos por modelo y tipo (input, output, cached)",
+    ("model", "type")
+)
+llm_client_cache_evictions_total = metrics_registry.counter(
+    "llm_client_cache_evictions_total",
+    "Clientes LLM expulsados de la caché de clientes compartidos"
+)
+llm_client_cache_size = metrics_registry.gauge(
+    "llm_client_cache_size",
+    "Clientes LLM en la caché de clientes compartidos"
+)
+url_fetch_duration_seconds = metrics_registry.histogram(
+    "url_fetch_duration_seconds",
+    "Duración de la descarga y extracción del texto de las URLs",
+    ("outcome",)
+)
+pdf_parse_duration_seconds = metrics_registry.histogram(
+    "pdf_parse_duration_seconds",
+    "Duración de la extracción del texto de los PDFs",
+    ("outcome",)
+)
+cache_requests_total = metrics_registry.counter(
+    "cache_requests_total",
+    "Consultas a las cachés por caché y resultado (hit, miss)",
+    ("cache", "result")
+)
+errors_total = metrics_registry.counter(
+    "errors_total",
+    "Errores por componente y tipo de excepción",
+    ("component", "exception")
+)
@@ -0,0 +1,192 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+import asyncio
+import logging
+import time
+
+# Identificador de la petición HTTP en curso (lo asigna el middleware)
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Traza de la generación en curso
+_current_trace: ContextVar[Optional["GenerationTrace"]] = ContextVar("generation_trace", default=None)
+
+# Lista que recibe los datos de las trazas terminadas (por ejemplo, los trabajos en segundo plano)
+_trace_sink: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("trace_sink", default=None)
+
+# Los handlers de este logger los configura core.logger
+_trace_logger = logging.getLogger("generation")
+
+
+def get_request_id() -> Optional[str]:
+    """
+    Obtiene el identificador de la petición en curso.
+
+    Returns:
+        Optional[str]: Identificador de la petición o None fuera de una petición
+    """
+    return request_id_var.get()
+
+
+class GenerationTrace:
+    """
+    Traza de una generación: duración de cada etapa, modelo y tokens.
+
+    Al terminar se emite un único registro estructurado con todos los datos,
+    de modo que los casos lentos se pueden localizar directamente en los logs.
+    """
+
+    def __init__(self, operation: str):
+        """
+        Inicializa la traza.
+
+        Args:
+            operation: Nombre de la operación (por ejemplo, "blog.general_interest")
+        """
+        self.operation = operation
+        self.request_id = request_id_var.get()
+        self.stages: Dict[str, float] = {}
+        self.attributes: Dict[str, Any] = {}
+        self.tokens: Dict[str, int] = {}
+        self._started_at = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Mide la duración de una etapa; si se repite, se acumula.
+
+        Args:
+            name: Nombre de la etapa (fetch, pdf, prompt, llm, parse...)
+        """
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - started_at) * 1000
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed_ms
+
+    def set(self, **attributes: Any) -> None:
+        """Añade atributos a la traza (modelo, plantilla...)."""
+        self.attributes.update(attributes)
+
+    def add_tokens(self, usage_metadata: Optional[Dict[str, Any]]) -> None:
+        """
+        Acumula el uso de tokens de una llamada al modelo.
+
+        Args:
+            usage_metadata: Metadatos de uso devueltos por el modelo (opcional)
+        """
+        if not usage_metadata:
+            return
+        for key in ("input_tokens", "output_tokens", "total_tokens"):
+            self.tokens[key] = self.tokens.get(key, 0) + (usage_metadata.get(key, 0) or 0)
+        cached_tokens = (usage_metadata.get("input_token_details") or {}).get("cache_read", 0) or 0
+        self.tokens["cached_tokens"] = self.tokens.get("cached_tokens", 0) + cached_tokens
+
+    def to_dict(self, status: str, error: Optional[BaseException] = None) -> Dict[str, Any]:
+        """
+        Resume la traza.
+
+        Args:
+            status: Resultado de la generación ("ok" o "error")
+            error: Excepción producida (opcional)
+
+        Returns:
+            Dict[str, Any]: Datos de la traza listos para serializar
+        """
+        data = {
+            "operation": self.operation,
+            "request_id": self.request_id,
+            "status": status,
+            "duration_ms": round((time.perf_counter() - self._started_at) * 1000, 1),
+            "stages_ms": {name: round(value, 1) for name, value in self.stages.items()},
+            "tokens": self.tokens,
+            **self.attributes
+        }
+        if error is not None:
+            data["error"] = type(error).__name__
+        return data
+
+
+@contextmanager
+def generation_trace(operation: str) -> Iterator[GenerationTrace]:
+    """
+    Abre una traza de generación y emite su registro estructurado al terminar.
+
+    Args:
+        operation: Nombre de la operación
+
+    Yields:
+        GenerationTrace: Traza activa durante el bloque
+    """
+    trace = GenerationTrace(operation)
+    token = _current_trace.set(trace)
+    status, error = "ok", None
+    try:
+        yield trace
+    except (GeneratorExit, asyncio.CancelledError):
+        # El cliente cerró la conexión antes de terminar (streaming)
+        status = "cancelled"
+        raise
+    except BaseException as e:
+        status, error = "error", e
+        raise
+    finally:
+        try:
+            _current_trace.reset(token)
+        except ValueError:
+            # El generador se cerró desde otro contexto
+            _current_trace.set(None)
+
+        data = trace.to_dict(status, error)
+        sink = _trace_sink.get()
+        if sink is not None:
+            sink.append(data)
+        stages = ", ".join(f"{name}={value:.0f}ms" for name, value in data["stages_ms"].items())
+        _trace_logger.info(
+            "Generación %s %s en %.0f ms (%s)",
+            operation, {"ok": "completada", "cancelled": "cancelada"}.get(status, "fallida"), data["duration_ms"], stages,
+            extra={"generation": data}
+        )
+
+
+def current_trace() -> Optional[GenerationTrace]:
+    """
+    Obtiene la traza de la generación en curso.
+
+    Returns:
+        Optional[GenerationTrace]: Traza activa o None
+    """
+    return _current_trace.get()
+
+
+@contextmanager
+def trace_stage(name: str) -> Iterator[None]:
+    """
+    Mide una etapa en la traza en curso; no hace nada si no hay traza activa.
+
+    Args:
+        name: Nombre de la etapa
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    with trace.stage(name):
+        yield
+
+
+@contextmanager
+def collect_traces() -> Iterator[List[Dict[str, Any]]]:
+    """
+    Recoge los datos de las trazas de generación que terminan dentro del bloque.
+
+    Yields:
+        List[Dict[str, Any]]: Lista a la que se añade cada traza al terminar
+    """
+    traces: List[Dict[str, Any]] = []
+    token = _trace_sink.set(traces)
+    try:
+        yield traces
+    finally:
+        _trace_sink.reset(token)
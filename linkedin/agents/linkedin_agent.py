@@ -1,10 +1,11 @@
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Union, Tuple, AsyncIterator
 import json
 import re
-import inspect
 
-from common.base_agent import BaseAgent
+from common.base_agent import BaseAgent, GenerationContext, LLMProvider
 from common.utils.helpers import extract_hashtags, format_content_for_readability
+from common.services.response_cache import CachePolicy, DEFAULT_CACHE_POLICY
+from common.services.semantic_cache import linkedin_draft_cache
 from linkedin.prompts.linkedin_prompts import (
     LinkedInPromptTemplate,
     get_prompt_template_for_style,
@@ -14,13 +15,22 @@ from linkedin.models.linkedin_models import (
     LinkedInPostRequest,
     LinkedInPostResponse,
     LinkedInPostStyle,
-    LinkedInAuthor
+    LinkedInAuthor,
+    SuggestedDraft
 )
 from core.logger import get_logger
 from core.config import settings
+from core.request_context import generation_trace, trace_stage
 
 logger = get_logger("linkedin_agent")
 
+# Campos de la plantilla que se pueden sobrescribir desde la solicitud
+TEMPLATE_OVERRIDE_FIELDS = (
+    "role_description", "content_objective", "style_guidance",
+    "structure_description", "tone", "format_guide",
+    "engagement_tips", "limitations", "additional_instructions"
+)
+
 
 class LinkedInAgent(BaseAgent):
     """Agente para generación de posts de LinkedIn."""
@@ -29,7 +39,8 @@ class LinkedInAgent(BaseAgent):
         self,
         prompt_template: LinkedInPromptTemplate,
         model: str = settings.OPENAI_MODEL,
-        temperature: float = settings.DEFAULT_TEMPERATURE
+        temperature: float = settings.DEFAULT_TEMPERATURE,
+        llm_provider: Optional[LLMProvider] = None
     ):
         """
         Inicializa el agente para LinkedIn.
@@ -38,8 +49,9 @@ class LinkedInAgent(BaseAgent):
             prompt_template: Plantilla de prompts específica para LinkedIn
             model: Modelo de lenguaje a utilizar
             temperature: Temperatura para la generación
+            llm_provider: Proveedor de clientes LLM compartidos (opcional)
         """
-        super().__init__(prompt_template, model, temperature)
+        super().__init__(prompt_template, model, temperature, llm_provider=llm_provider)
         logger.info(f"Agente de LinkedIn inicializado con modelo {model}")
     
     @staticmethod
@@ -71,6 +83,20 @@ class LinkedInAgent(BaseAgent):
                 "hashtags": []
             }
     
+    @staticmethod
+    def _parse_linkedin_line(line: str, line_number: int, state: Dict[str, Any]) -> None:
+        """
+        Parsea de forma incremental una línea de un post en streaming.
+        
+        Args:
+            line: Línea completa de la respuesta
+            line_number: Posición de la línea en la respuesta
+            state: Estado del parseo incremental
+        """
+        hashtags = extract_hashtags(line)
+        if hashtags or "hashtags" not in state:
+            state["hashtags"] = state.get("hashtags", []) + hashtags
+    
     def _get_model_for_author(self, author: LinkedInAuthor) -> str:
         """
         Determina qué modelo usar según el autor seleccionado.
@@ -94,202 +120,262 @@ class LinkedInAgent(BaseAgent):
         # Si no, usar el modelo predeterminado
         return self.model
     
-    def _create_template_instance(self, template_class, original_template, additional_instructions):
+    async def generate_content(self, **kwargs) -> Any:
         """
-        Crea una nueva instancia de plantilla basada en la clase proporcionada.
-        Solo incluye los parámetros que acepta específicamente cada clase.
+        Implementación del método abstracto de BaseAgent.
+        Este método simplemente llama a generate_post con los kwargs.
         
         Args:
-            template_class: Clase de la plantilla a crear
-            original_template: Plantilla original de la que copiar valores
-            additional_instructions: Instrucciones adicionales
+            **kwargs: Parámetros para la generación
             
         Returns:
-            LinkedInPromptTemplate: Nueva instancia de la plantilla
+            Any: Contenido generado
+        """
+        if isinstance(kwargs.get("request"), LinkedInPostRequest):
+            return await self.generate_post(kwargs["request"])
+        else:
+            logger.error("Se requiere un objeto LinkedInPostRequest para generar contenido")
+            raise ValueError("Se requiere un objeto LinkedInPostRequest para generar contenido")
+    
+    def _resolve_template(self, request: LinkedInPostRequest) -> LinkedInPromptTemplate:
         """
-        # Inspeccionar la firma del constructor de la clase
-        signature = inspect.signature(template_class.__init__)
-        valid_params = list(signature.parameters.keys())
+        Obtiene la plantilla de una petición según el estilo, la personalización y el autor.
         
-        # Quitar 'self' que siempre está en la firma pero no se pasa al constructor
-        if 'self' in valid_params:
-            valid_params.remove('self')
+        No modifica la plantilla del agente: las variantes se crean solo para esta petición.
         
-        # Crear un diccionario con los parámetros válidos para esta clase
-        template_kwargs = {}
+        Args:
+            request: Solicitud de generación de post
+            
+        Returns:
+            LinkedInPromptTemplate: Plantilla a utilizar
+        """
+        # Seleccionar plantilla según el estilo (compartida e inmutable)
+        template = get_prompt_template_for_style(request.estilo)
         
-        # Añadir solo los parámetros que la clase acepta
-        param_mapping = {
-            'role_description': 'role_description',
-            'content_objective': 'content_objective',
-            'style_guidance': 'style_guidance',
-            'structure_description': 'structure_description',
-            'tone': 'tone',
-            'format_guide': 'format_guide',
-            'additional_instructions': 'additional_instructions',
-            'engagement_tips': 'engagement_tips',
-            'limitations': 'limitations'
+        # Campos del system prompt proporcionados en la solicitud
+        overrides = {
+            field: getattr(request, field)
+            for field in TEMPLATE_OVERRIDE_FIELDS
+            if getattr(request, field, None) is not None
         }
         
-        for param_name, attr_name in param_mapping.items():
-            if param_name in valid_params and hasattr(original_template, attr_name):
-                # Valor especial para instrucciones adicionales
-                if param_name == 'additional_instructions':
-                    template_kwargs[param_name] = additional_instructions
-                else:
-                    template_kwargs[param_name] = getattr(original_template, attr_name)
+        # Añadir instrucciones específicas para emular al autor
+        if request.autor != LinkedInAuthor.DEFAULT:
+            author_instructions = get_author_system_prompt(request.autor)
+            if author_instructions:
+                additional_instructions = overrides.get("additional_instructions", template.additional_instructions) or ""
+                overrides["additional_instructions"] = f"{additional_instructions}\n\n{author_instructions}" if additional_instructions else author_instructions
         
-        # Crear y devolver la nueva instancia
-        return template_class(**template_kwargs)
+        if not overrides:
+            return template
+        
+        # Variante de la plantilla solo para esta petición
+        return template.copy_with(**overrides)
     
-    async def generate_content(self, **kwargs) -> Any:
+    def _prepare_generation(self, request: LinkedInPostRequest) -> Tuple[GenerationContext, Dict[str, Any]]:
         """
-        Implementación del método abstracto de BaseAgent.
-        Este método simplemente llama a generate_post con los kwargs.
+        Prepara el contexto y las variables del prompt para un post.
         
         Args:
-            **kwargs: Parámetros para la generación
+            request: Solicitud de generación de post
             
         Returns:
-            Any: Contenido generado
+            Tuple[GenerationContext, Dict[str, Any]]: Contexto de generación y variables del prompt
         """
-        if isinstance(kwargs.get("request"), LinkedInPostRequest):
-            return await self.generate_post(kwargs["request"])
+        # Determinar si usar un modelo fine-tuned o el modelo estándar
+        if request.autor != LinkedInAuthor.DEFAULT:
+            model = self._get_model_for_author(request.autor)
         else:
-            logger.error("Se requiere un objeto LinkedInPostRequest para generar contenido")
-            raise ValueError("Se requiere un objeto LinkedInPostRequest para generar contenido")
+            model = request.model
+        
+        # Contexto de generación propio de esta petición
+        context = self.create_context(
+            prompt_template=self._resolve_template(request),
+            model=model,
+            temperature=request.temperature,
+            max_tokens=request.max_tokens
+        )
+        
+        # Preparar kwargs para el prompt
+        kwargs = {
+            "tema": request.tema,
+            "informacion_adicional": request.informacion_adicional or "No se proporcionó información adicional."
+        }
+        
+        return context, kwargs
     
-    async def generate_post(self, request: LinkedInPostRequest) -> LinkedInPostResponse:
+    def _build_response(
+        self,
+        request: LinkedInPostRequest,
+        context: GenerationContext,
+        response_text: str
+    ) -> LinkedInPostResponse:
+        """
+        Construye la respuesta estructurada a partir del texto generado.
+        
+        Args:
+            request: Solicitud de generación de post
+            context: Contexto de generación utilizado
+            response_text: Texto completo generado por el modelo
+            
+        Returns:
+            LinkedInPostResponse: Post estructurado
+        """
+        # Formatear para legibilidad
+        # response_text = format_content_for_readability(response_text)
+        
+        # Procesar la respuesta
+        parsed_response = self._parse_linkedin_post(response_text)
+        
+        # Crear respuesta estructurada
+        return LinkedInPostResponse(
+            texto=parsed_response["texto"],
+            hashtags=parsed_response["hashtags"],
+            content=parsed_response["texto"],  # Para compatibilidad con ContentResponse
+            autor=request.autor.value,
+            estilo=request.estilo.value,
+            metadata={
+                "post_type": "linkedin",
+                "author": request.autor.value,
+                "style": request.estilo.value,
+                "model_used": context.model,
+                "temperature": context.temperature
+            }
+        )
+    
+    @staticmethod
+    def _draft_key(request: LinkedInPostRequest) -> Tuple[str, str]:
+        """
+        Obtiene el texto y la partición con los que se indexa un borrador.
+        
+        Args:
+            request: Solicitud de generación de post
+            
+        Returns:
+            Tuple[str, str]: Texto a comparar (tema e información adicional) y partición (estilo y autor)
+        """
+        text = f"{request.tema}\n{request.informacion_adicional or ''}".strip()
+        return text, f"{request.estilo.value}|{request.autor.value}"
+    
+    def find_similar_drafts(self, request: LinkedInPostRequest) -> List[SuggestedDraft]:
+        """
+        Busca borradores anteriores del mismo estilo y autor con un tema parecido.
+        
+        Args:
+            request: Solicitud de generación de post
+            
+        Returns:
+            List[SuggestedDraft]: Borradores por similitud descendente
+        """
+        if linkedin_draft_cache is None:
+            return []
+        
+        text, partition = self._draft_key(request)
+        matches = linkedin_draft_cache.search(text, partition, top_k=settings.SEMANTIC_CACHE_MAX_SUGGESTIONS)
+        return [SuggestedDraft(**match.value, similitud=round(match.score, 4)) for match in matches]
+    
+    def _remember_draft(self, request: LinkedInPostRequest, response: LinkedInPostResponse) -> None:
+        """
+        Guarda un post generado para sugerirlo en solicitudes parecidas.
+        
+        Args:
+            request: Solicitud de generación de post
+            response: Post generado
+        """
+        if linkedin_draft_cache is None:
+            return
+        
+        text, partition = self._draft_key(request)
+        linkedin_draft_cache.add(text, partition, {
+            "tema": request.tema,
+            "texto": response.texto,
+            "hashtags": response.hashtags
+        })
+    
+    def _finish_post(
+        self,
+        request: LinkedInPostRequest,
+        response: LinkedInPostResponse,
+        suggestions: List[SuggestedDraft]
+    ) -> LinkedInPostResponse:
+        """
+        Guarda el post generado y le añade los borradores sugeridos.
+        
+        Args:
+            request: Solicitud de generación de post
+            response: Post generado
+            suggestions: Borradores parecidos encontrados antes de generar
+            
+        Returns:
+            LinkedInPostResponse: Post con los borradores sugeridos
+        """
+        self._remember_draft(request, response)
+        return response.model_copy(update={"borradores_sugeridos": suggestions})
+    
+    async def generate_post(
+        self,
+        request: LinkedInPostRequest,
+        cache_policy: CachePolicy = DEFAULT_CACHE_POLICY
+    ) -> LinkedInPostResponse:
         """
         Genera un post de LinkedIn según la solicitud.
         
         Args:
             request: Solicitud de generación de post
+            cache_policy: Uso de la caché de respuestas (opcional)
             
         Returns:
             LinkedInPostResponse: Post de LinkedIn generado
         """
         try:
-            # Seleccionar plantilla según el estilo
-            style_template = get_prompt_template_for_style(request.estilo)
-            original_template = self.prompt_template
-            
-            # Verificar si se proporcionaron parámetros de system prompt en la solicitud
-            # y crear una plantilla personalizada si es necesario
-            if any([
-                request.role_description is not None,
-                request.content_objective is not None,
-                request.style_guidance is not None,
-                request.structure_description is not None,
-                request.tone is not None,
-                request.format_guide is not None,
-                request.engagement_tips is not None,
-                request.limitations is not None,
-                request.additional_instructions is not None
-            ]):
-                # Crear un diccionario con los valores base de la plantilla original
-                template_kwargs = {}
-                
-                # Lista de atributos a verificar y posiblemente sobrescribir
-                template_attrs = [
-                    'role_description', 'content_objective', 'style_guidance',
-                    'structure_description', 'tone', 'format_guide', 
-                    'engagement_tips', 'limitations', 'additional_instructions'
-                ]
+            with generation_trace("linkedin.post"):
+                with trace_stage("prompt"):
+                    context, kwargs = self._prepare_generation(request)
+                    suggestions = self.find_similar_drafts(request)
                 
-                # Para cada atributo, usar el valor de la solicitud si se proporciona,
-                # de lo contrario, usar el valor de la plantilla original si existe
-                for attr in template_attrs:
-                    request_value = getattr(request, attr, None)
-                    if request_value is not None:
-                        # Si el valor se proporciona en la solicitud, usarlo
-                        template_kwargs[attr] = request_value
-                    elif hasattr(style_template, attr):
-                        # Si no se proporciona pero existe en la plantilla original, usarlo
-                        template_kwargs[attr] = getattr(style_template, attr)
-                
-                # Crear una nueva instancia de la plantilla con los valores combinados
-                # Utilizamos la misma clase que la plantilla original
-                template_class = type(style_template)
-                custom_template = self._create_template_instance(
-                    template_class, style_template, template_kwargs.get('additional_instructions', '')
+                # Generar el post (los borradores sugeridos no se guardan en la caché de respuestas)
+                response = await self._generate_response(
+                    context,
+                    kwargs,
+                    build_response=lambda text: self._build_response(request, context, text),
+                    response_model=LinkedInPostResponse,
+                    cache_policy=cache_policy,
+                    cache_metadata={"author": request.autor.value, "style": request.estilo.value}
                 )
+                return self._finish_post(request, response, suggestions)
                 
-                # Para los demás atributos (que no son additional_instructions, ya manejado por _create_template_instance)
-                for attr in template_attrs:
-                    if attr != 'additional_instructions' and attr in template_kwargs:
-                        # Solo establecer atributos que la clase acepta
-                        if hasattr(custom_template, attr):
-                            setattr(custom_template, attr, template_kwargs[attr])
-                
-                # Usar esta plantilla personalizada en lugar de la original
-                self.update_prompt_template(custom_template)
-            else:
-                # Si no hay parámetros personalizados, usar la plantilla estándar del estilo
-                self.update_prompt_template(style_template)
-            
-            # Determinar si usar un modelo fine-tuned o el modelo estándar
-            use_fine_tuned = request.autor != LinkedInAuthor.DEFAULT
-            original_model = self.model
+        except Exception as e:
+            logger.error(f"Error al generar post de LinkedIn: {str(e)}")
+            raise
+    
+    async def stream_post(self, request: LinkedInPostRequest) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Genera un post de LinkedIn en streaming.
+        
+        Args:
+            request: Solicitud de generación de post
             
-            if use_fine_tuned:
-                # Actualizar el modelo al específico del autor
-                fine_tuned_model = self._get_model_for_author(request.autor)
-                self.update_model_settings(model=fine_tuned_model)
+        Yields:
+            Dict[str, Any]: Eventos de generación ("token", "partial" y "result")
+        """
+        try:
+            with generation_trace("linkedin.post.stream"):
+                with trace_stage("prompt"):
+                    context, kwargs = self._prepare_generation(request)
+                    suggestions = self.find_similar_drafts(request)
                 
-                # Añadir instrucciones específicas para emular al autor
-                author_instructions = get_author_system_prompt(request.autor)
-                if author_instructions:
-                    additional_instructions = self.prompt_template.additional_instructions or ""
-                    combined_instructions = f"{additional_instructions}\n\n{author_instructions}" if additional_instructions else author_instructions
-                    
-                    # Usar nuestro método auxiliar para crear la plantilla correctamente
-                    template_class = type(self.prompt_template)
-                    new_template = self._create_template_instance(
-                        template_class=template_class,
-                        original_template=self.prompt_template,
-                        additional_instructions=combined_instructions
+                async for event in self._stream_generation(
+                    context,
+                    kwargs,
+                    parse_line=self._parse_linkedin_line,
+                    build_response=lambda text: self._finish_post(
+                        request,
+                        self._build_response(request, context, text),
+                        suggestions
                     )
-                    
-                    self.update_prompt_template(new_template)
-            
-            # Preparar kwargs para el prompt
-            kwargs = {
-                "tema": request.tema,
-                "informacion_adicional": request.informacion_adicional or "No se proporcionó información adicional."
-            }
-            
-            # Generar el post
-            try:
-                response_text = await self._call_llm(**kwargs)
-                
-                # Formatear para legibilidad
-                # response_text = format_content_for_readability(response_text)
-                
-                # Procesar la respuesta
-                parsed_response = self._parse_linkedin_post(response_text)
-                
-                # Crear respuesta estructurada
-                return LinkedInPostResponse(
-                    texto=parsed_response["texto"],
-                    hashtags=parsed_response["hashtags"],
-                    content=parsed_response["texto"],  # Para compatibilidad con ContentResponse
-                    autor=request.autor.value,
-                    estilo=request.estilo.value,
-                    metadata={
-                        "post_type": "linkedin",
-                        "author": request.autor.value,
-                        "style": request.estilo.value,
-                        "model_used": self.model,
-                        "temperature": self.temperature
-                    }
-                )
-            finally:
-                # Restaurar plantilla y modelo originales
-                self.update_prompt_template(original_template)
-                if use_fine_tuned:
-                    self.update_model_settings(model=original_model)
+                ):
+                    yield event
                 
         except Exception as e:
-            logger.error(f"Error al generar post de LinkedIn: {str(e)}")
-            raise
\ No newline at end of file
+            logger.error(f"Error al generar post de LinkedIn en streaming: {str(e)}")
+            raise
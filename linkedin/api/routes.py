@@ -1,53 +1,66 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import StreamingResponse
 from typing import Dict, Any, List, Optional
 
 from linkedin.models.linkedin_models import (
     LinkedInPostRequest,
     LinkedInPostResponse,
-    LinkedInStyleConfigRequest
+    LinkedInStyleConfigRequest,
+    SuggestedDraft,
+    LinkedInBatchRequest
 )
 from linkedin.services.linkedin_service import LinkedInService
+from common.services.agent_registry import AgentRegistry
+from common.services.response_cache import CachePolicy
+from api.dependencies import get_agent_registry
+from api.instrumentation import MetricsRoute
+from common.utils.helpers import SSE_HEADERS, NDJSON_MEDIA_TYPE, iter_sse_events, iter_ndjson_lines
 from core.logger import get_logger
+from core.config import settings
 
 logger = get_logger("linkedin_api")
 
-router = APIRouter(prefix="/linkedin", tags=["LinkedIn"])
+router = APIRouter(prefix="/linkedin", tags=["LinkedIn"], route_class=MetricsRoute)
 
-# Variable global para mantener una única instancia del servicio
-_linkedin_service_instance = None
 
-async def get_linkedin_service() -> LinkedInService:
+async def get_linkedin_service(
+    registry: AgentRegistry = Depends(get_agent_registry)
+) -> LinkedInService:
     """
     Dependencia para obtener el servicio de LinkedIn.
-    Usa un patrón singleton para mantener una única instancia.
+    Mantiene una única instancia a través del registro de agentes de la aplicación.
+    
+    Args:
+        registry: Registro de agentes compartidos
     
     Returns:
         LinkedInService: Instancia del servicio
     """
-    global _linkedin_service_instance
-    if _linkedin_service_instance is None:
-        _linkedin_service_instance = LinkedInService()
-        logger.info("Se creó una nueva instancia del servicio de LinkedIn")
-    return _linkedin_service_instance
+    return registry.get_or_create("linkedin_service", lambda: LinkedInService(registry))
 
 
 @router.post("/generate", response_model=LinkedInPostResponse)
 async def generate_linkedin_post(
     request: LinkedInPostRequest,
-    service: LinkedInService = Depends(get_linkedin_service)
+    service: LinkedInService = Depends(get_linkedin_service),
+    cache_control: Optional[str] = Header(None)
 ):
     """
     Genera un post de LinkedIn según los parámetros proporcionados.
     
+    Si la caché de respuestas está activa, "Cache-Control: no-cache" fuerza
+    una generación nueva y "no-store" además evita guardarla.
+    
     Args:
         request: Parámetros para la generación
         service: Servicio de LinkedIn
+        cache_control: Cabecera Cache-Control (opcional)
     
     Returns:
         LinkedInPostResponse: Post generado
     """
     try:
-        return await service.generate_post(request)
+        return await service.generate_post(request, CachePolicy.from_header(cache_control))
     except Exception as e:
         logger.error(f"Error al generar post de LinkedIn: {str(e)}")
         raise HTTPException(
@@ -56,6 +69,95 @@ async def generate_linkedin_post(
         )
 
 
+@router.post("/generate/stream")
+async def stream_linkedin_post(
+    request: LinkedInPostRequest,
+    service: LinkedInService = Depends(get_linkedin_service)
+):
+    """
+    Genera un post de LinkedIn en streaming (Server-Sent Events).
+    
+    Emite eventos "token" con cada fragmento, eventos "partial" con los hashtags
+    detectados hasta el momento y un evento final "result" con los mismos campos
+    que LinkedInPostResponse.
+    
+    Args:
+        request: Parámetros para la generación
+        service: Servicio de LinkedIn
+    
+    Returns:
+        StreamingResponse: Flujo de eventos SSE
+    """
+    return StreamingResponse(
+        iter_sse_events(service.stream_post(request)),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
+@router.post("/generate/batch")
+async def generate_linkedin_batch(
+    batch: LinkedInBatchRequest,
+    service: LinkedInService = Depends(get_linkedin_service),
+    cache_control: Optional[str] = Header(None)
+):
+    """
+    Genera varios posts de LinkedIn (por ejemplo, un calendario de contenidos) en una sola petición.
+    
+    Devuelve NDJSON: una línea por post con los campos de LinkedInBatchItem
+    ("index" indica su posición en la solicitud) a medida que cada uno
+    termina, no en el orden de la solicitud. Los posts que fallan se emiten
+    con status "failed" sin interrumpir el resto.
+    
+    Args:
+        batch: Posts a generar y concurrencia deseada
+        service: Servicio de LinkedIn
+        cache_control: Cabecera Cache-Control (opcional)
+    
+    Returns:
+        StreamingResponse: Flujo NDJSON con los resultados
+    """
+    if len(batch.posts) > settings.LINKEDIN_BATCH_MAX_POSTS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"El lote admite como máximo {settings.LINKEDIN_BATCH_MAX_POSTS} posts"
+        )
+    
+    items = service.generate_batch(batch, CachePolicy.from_header(cache_control))
+    return StreamingResponse(
+        iter_ndjson_lines(item.model_dump(mode="json") async for item in items),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/drafts/similar", response_model=List[SuggestedDraft])
+async def find_similar_linkedin_drafts(
+    request: LinkedInPostRequest,
+    service: LinkedInService = Depends(get_linkedin_service)
+):
+    """
+    Busca posts generados anteriormente con un tema parecido, del mismo estilo y autor.
+    
+    Permite ofrecer un borrador existente antes de lanzar una generación nueva.
+    
+    Args:
+        request: Parámetros de la generación que se quiere hacer
+        service: Servicio de LinkedIn
+    
+    Returns:
+        List[SuggestedDraft]: Borradores por similitud descendente
+    """
+    try:
+        return await service.find_similar_drafts(request)
+    except Exception as e:
+        logger.error(f"Error al buscar borradores parecidos: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al buscar borradores parecidos: {str(e)}"
+        )
+
+
 @router.post("/styles/customize", response_model=Dict[str, Any])
 async def customize_linkedin_style(
     request: LinkedInStyleConfigRequest,
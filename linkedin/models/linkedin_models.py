@@ -100,6 +100,14 @@ class LinkedInPostRequest(ContentRequest):
             }
         }
 
+class SuggestedDraft(BaseModel):
+    """Borrador generado anteriormente para un tema parecido."""
+    tema: str = Field(description="Tema del borrador original")
+    texto: str = Field(description="Texto del borrador")
+    hashtags: List[str] = Field(default_factory=list, description="Hashtags del borrador")
+    similitud: float = Field(description="Similitud coseno con la solicitud (0-1)")
+
+
 class LinkedInPostResponse(ContentResponse):
     """Respuesta con el post de LinkedIn generado."""
     texto: str = Field(description="Texto del post")
@@ -109,6 +117,10 @@ class LinkedInPostResponse(ContentResponse):
     )
     autor: str = Field(description="Autor emulado en el post")
     estilo: str = Field(description="Estilo utilizado en el post")
+    borradores_sugeridos: List[SuggestedDraft] = Field(
+        default_factory=list,
+        description="Borradores anteriores del mismo estilo y autor con un tema parecido"
+    )
     
     class Config:
         json_schema_extra = {
@@ -125,6 +137,27 @@ class LinkedInPostResponse(ContentResponse):
         }
 
 
+class LinkedInBatchRequest(BaseModel):
+    """Solicitud de generación de varios posts de LinkedIn (por ejemplo, un calendario de contenidos)."""
+    posts: List[LinkedInPostRequest] = Field(
+        min_length=1,
+        description="Posts a generar"
+    )
+    concurrency: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Número máximo de posts que se generan a la vez (por defecto, el configurado en el servidor)"
+    )
+
+
+class LinkedInBatchItem(BaseModel):
+    """Resultado de un post de un lote, emitido como una línea NDJSON al terminar."""
+    index: int = Field(description="Posición del post en la solicitud")
+    status: Literal["succeeded", "failed"] = Field(description="Resultado de la generación")
+    post: Optional[LinkedInPostResponse] = Field(default=None, description="Post generado")
+    error: Optional[str] = Field(default=None, description="Error si la generación falló")
+
+
 class LinkedInStyleConfigRequest(BaseModel):
     """Solicitud para configurar un estilo de LinkedIn."""
     estilo: LinkedInPostStyle
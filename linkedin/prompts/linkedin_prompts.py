@@ -244,6 +244,88 @@ Desafía el pensamiento convencional y presenta una opinión que pueda generar d
 """
 
 
+class StyleTemplateRegistry:
+    """
+    Registro de plantillas de LinkedIn precompiladas e inmutables por estilo.
+    
+    Las plantillas por defecto se crean una sola vez y las personalizaciones
+    se aplican creando una nueva plantilla que sustituye a la del estilo, de
+    modo que las consultas no crean objetos ni recompilan prompts.
+    """
+    
+    def __init__(self):
+        """Crea y compila las plantillas por defecto de cada estilo."""
+        self._default_template = LinkedInPromptTemplate().freeze()
+        self._defaults: Dict[LinkedInPostStyle, LinkedInPromptTemplate] = {
+            LinkedInPostStyle.LEADERSHIP: LeadershipPromptTemplate().freeze(),
+            LinkedInPostStyle.BEHIND_THE_SCENES: BehindTheScenesPromptTemplate().freeze(),
+            LinkedInPostStyle.WINS: WinsPromptTemplate().freeze(),
+            LinkedInPostStyle.CEO_JOURNEY: CEOJourneyPromptTemplate().freeze(),
+            LinkedInPostStyle.HOT_TAKES: HotTakesPromptTemplate().freeze()
+        }
+        self._templates = dict(self._defaults)
+    
+    def get(self, style: LinkedInPostStyle) -> LinkedInPromptTemplate:
+        """
+        Obtiene la plantilla vigente de un estilo, incluida su personalización.
+        
+        Args:
+            style: Estilo de post de LinkedIn
+            
+        Returns:
+            LinkedInPromptTemplate: Plantilla inmutable del estilo
+        """
+        return self._templates.get(style, self._default_template)
+    
+    def get_default(self, style: LinkedInPostStyle) -> LinkedInPromptTemplate:
+        """
+        Obtiene la plantilla original de un estilo, sin personalizaciones.
+        
+        Args:
+            style: Estilo de post de LinkedIn
+            
+        Returns:
+            LinkedInPromptTemplate: Plantilla inmutable del estilo
+        """
+        return self._defaults.get(style, self._default_template)
+    
+    def customize(self, style: LinkedInPostStyle, config: Dict[str, Any]) -> LinkedInPromptTemplate:
+        """
+        Sustituye la plantilla de un estilo por la original con los valores indicados.
+        
+        Args:
+            style: Estilo de post de LinkedIn
+            config: Valores de los campos de la plantilla a sobrescribir
+            
+        Returns:
+            LinkedInPromptTemplate: Nueva plantilla del estilo
+        """
+        default_template = self.get_default(style)
+        template = type(default_template)()
+        for field, value in config.items():
+            if hasattr(template, field):
+                setattr(template, field, value)
+        template.freeze()
+        
+        # Se sustituye el diccionario completo para que las lecturas concurrentes no necesiten bloqueo
+        self._templates = {**self._templates, style: template}
+        logger.info(f"Plantilla del estilo {style.value} actualizada en el registro")
+        return template
+    
+    def reset(self, style: LinkedInPostStyle) -> None:
+        """
+        Restaura la plantilla original de un estilo.
+        
+        Args:
+            style: Estilo de post de LinkedIn
+        """
+        self._templates = {**self._templates, style: self.get_default(style)}
+
+
+# Registro compartido de plantillas por estilo
+style_template_registry = StyleTemplateRegistry()
+
+
 def get_prompt_template_for_style(style: LinkedInPostStyle) -> LinkedInPromptTemplate:
     """
     Devuelve la plantilla de prompt adecuada según el estilo seleccionado.
@@ -252,17 +334,9 @@ def get_prompt_template_for_style(style: LinkedInPostStyle) -> LinkedInPromptTem
         style: Estilo de post de LinkedIn
         
     Returns:
-        LinkedInPromptTemplate: Plantilla específica para el estilo
+        LinkedInPromptTemplate: Plantilla específica para el estilo (compartida e inmutable)
     """
-    style_templates = {
-        LinkedInPostStyle.LEADERSHIP: LeadershipPromptTemplate(),
-        LinkedInPostStyle.BEHIND_THE_SCENES: BehindTheScenesPromptTemplate(),
-        LinkedInPostStyle.WINS: WinsPromptTemplate(),
-        LinkedInPostStyle.CEO_JOURNEY: CEOJourneyPromptTemplate(),
-        LinkedInPostStyle.HOT_TAKES: HotTakesPromptTemplate()
-    }
-    
-    return style_templates.get(style, LinkedInPromptTemplate())
+    return style_template_registry.get(style)
 
 
 def get_author_system_prompt(author: LinkedInAuthor) -> str:
@@ -1,4 +1,5 @@
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Union, AsyncIterator
+import asyncio
 import json
 
 from linkedin.models.linkedin_models import (
@@ -7,13 +8,19 @@ from linkedin.models.linkedin_models import (
     LinkedInPostStyle,
     LinkedInAuthor,
     LinkedInStyleConfigRequest,
-    AuthorModelInfo
+    AuthorModelInfo,
+    SuggestedDraft,
+    LinkedInBatchRequest,
+    LinkedInBatchItem
 )
 from linkedin.agents.linkedin_agent import LinkedInAgent
 from linkedin.prompts.linkedin_prompts import (
     LinkedInPromptTemplate,
-    get_prompt_template_for_style
+    get_prompt_template_for_style,
+    style_template_registry
 )
+from common.services.agent_registry import AgentRegistry
+from common.services.response_cache import CachePolicy, DEFAULT_CACHE_POLICY
 from core.logger import get_logger
 from core.config import settings
 
@@ -23,10 +30,18 @@ logger = get_logger("linkedin_service")
 class LinkedInService:
     """Servicio para gestionar la generación de posts de LinkedIn."""
     
-    def __init__(self):
-        """Inicializa el servicio de LinkedIn con el agente necesario."""
-        # Inicializar agente base
-        self.agent = LinkedInAgent(LinkedInPromptTemplate())
+    def __init__(self, registry: Optional[AgentRegistry] = None):
+        """
+        Inicializa el servicio de LinkedIn con el agente necesario.
+        
+        Args:
+            registry: Registro de agentes compartidos (opcional)
+        """
+        # Inicializar agente base (compartido a través del registro si está disponible)
+        if registry is not None:
+            self.agent = registry.get_agent("linkedin", LinkedInAgent, prompt_template=LinkedInPromptTemplate())
+        else:
+            self.agent = LinkedInAgent(LinkedInPromptTemplate())
         
         # Configuraciones de estilo por defecto (se podrían cargar de BD o archivo)
         self._style_configs = {}
@@ -53,12 +68,17 @@ class LinkedInService:
         
         logger.info("Servicio de LinkedIn inicializado")
     
-    async def generate_post(self, request: LinkedInPostRequest) -> LinkedInPostResponse:
+    async def generate_post(
+        self,
+        request: LinkedInPostRequest,
+        cache_policy: CachePolicy = DEFAULT_CACHE_POLICY
+    ) -> LinkedInPostResponse:
         """
         Genera un post de LinkedIn según la solicitud.
         
         Args:
             request: Solicitud con parámetros para la generación
+            cache_policy: Uso de la caché de respuestas (opcional)
             
         Returns:
             LinkedInPostResponse: Post generado
@@ -66,21 +86,86 @@ class LinkedInService:
         try:
             logger.info(f"Generando post de LinkedIn sobre: {request.tema}, estilo: {request.estilo}, autor: {request.autor}")
             
-            # Actualizar temperatura o modelo si se proporcionaron
-            if request.temperature is not None or request.model is not None:
-                self.agent.update_model_settings(
-                    model=request.model or self.agent.model,
-                    temperature=request.temperature if request.temperature is not None else self.agent.temperature
-                )
-            
-            # Generar post
-            post = await self.agent.generate_post(request)
+            # Generar post (el modelo y la temperatura de la solicitud se aplican solo a esta llamada)
+            post = await self.agent.generate_post(request, cache_policy)
             return post
             
         except Exception as e:
             logger.error(f"Error al generar post de LinkedIn: {str(e)}")
             raise
     
+    async def stream_post(self, request: LinkedInPostRequest) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Genera un post de LinkedIn en streaming.
+        
+        Args:
+            request: Solicitud con parámetros para la generación
+            
+        Yields:
+            Dict[str, Any]: Eventos de generación
+        """
+        logger.info(f"Generando post de LinkedIn en streaming sobre: {request.tema}, estilo: {request.estilo}, autor: {request.autor}")
+        async for event in self.agent.stream_post(request):
+            yield event
+    
+    async def generate_batch(
+        self,
+        batch: LinkedInBatchRequest,
+        cache_policy: CachePolicy = DEFAULT_CACHE_POLICY
+    ) -> AsyncIterator[LinkedInBatchItem]:
+        """
+        Genera varios posts a la vez y los devuelve a medida que terminan.
+        
+        Todos los posts comparten el agente, las plantillas de estilo y los
+        clientes LLM; un semáforo limita cuántos se generan a la vez y el
+        límite de peticiones por modelo (LLM_RATE_LIMIT_RPM) reparte las
+        llamadas en el tiempo. Un post que falla no interrumpe el resto.
+        
+        Args:
+            batch: Posts a generar y concurrencia deseada
+            cache_policy: Uso de la caché de respuestas (opcional)
+            
+        Yields:
+            LinkedInBatchItem: Resultado de cada post, en orden de finalización
+        """
+        concurrency = min(
+            batch.concurrency or settings.LINKEDIN_BATCH_CONCURRENCY,
+            settings.LINKEDIN_BATCH_MAX_CONCURRENCY
+        )
+        semaphore = asyncio.Semaphore(concurrency)
+        logger.info(f"Generando lote de {len(batch.posts)} posts de LinkedIn (concurrencia {concurrency})")
+        
+        async def generate_one(index: int, request: LinkedInPostRequest) -> LinkedInBatchItem:
+            async with semaphore:
+                try:
+                    post = await self.agent.generate_post(request, cache_policy)
+                    return LinkedInBatchItem(index=index, status="succeeded", post=post)
+                except Exception as e:
+                    logger.error(f"Error al generar el post {index} del lote: {str(e)}")
+                    return LinkedInBatchItem(index=index, status="failed", error=str(e) or type(e).__name__)
+        
+        tasks = [asyncio.create_task(generate_one(index, request)) for index, request in enumerate(batch.posts)]
+        try:
+            for next_item in asyncio.as_completed(tasks):
+                yield await next_item
+        finally:
+            # Si el cliente se desconecta, no seguir generando posts que nadie va a recibir
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def find_similar_drafts(self, request: LinkedInPostRequest) -> List[SuggestedDraft]:
+        """
+        Busca borradores anteriores parecidos a la solicitud sin generar uno nuevo.
+        
+        Args:
+            request: Solicitud con parámetros para la generación
+            
+        Returns:
+            List[SuggestedDraft]: Borradores del mismo estilo y autor por similitud descendente
+        """
+        return self.agent.find_similar_drafts(request)
+    
     async def customize_style(self, request: LinkedInStyleConfigRequest) -> Dict[str, Any]:
         """
         Personaliza la configuración de un estilo de post.
@@ -92,8 +177,8 @@ class LinkedInService:
             Dict[str, Any]: Resultado de la operación
         """
         try:
-            # Obtener la plantilla base para el estilo
-            base_template = get_prompt_template_for_style(request.estilo)
+            # Obtener la plantilla original del estilo
+            base_template = style_template_registry.get_default(request.estilo)
             
             # Crear un diccionario con los valores actuales
             current_config = {
@@ -119,8 +204,9 @@ class LinkedInService:
             if request.additional_instructions:
                 current_config["additional_instructions"] = request.additional_instructions
             
-            # Guardar la configuración personalizada
+            # Guardar la configuración personalizada y aplicarla a las siguientes generaciones
             self._style_configs[request.estilo.value] = current_config
+            style_template_registry.customize(request.estilo, current_config)
             
             logger.info(f"Estilo {request.estilo.value} personalizado correctamente")
             
@@ -0,0 +1,90 @@
+import asyncio
+import copy
+import itertools
+import random
+
+from langchain_core.messages import AIMessage
+
+from linkedin.agents.linkedin_agent import LinkedInAgent
+from linkedin.models.linkedin_models import LinkedInAuthor, LinkedInPostRequest, LinkedInPostStyle
+from linkedin.prompts.linkedin_prompts import LinkedInPromptTemplate, get_prompt_template_for_style
+
+
+class FakeLLM:
+    """Cliente LLM falso que responde con el prompt recibido tras una espera aleatoria."""
+
+    def __init__(self, model: str, temperature: float, max_tokens: int):
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+
+    async def ainvoke(self, messages):
+        # La espera aleatoria intercala las peticiones concurrentes
+        await asyncio.sleep(random.uniform(0, 0.02))
+        system_message, human_message = messages
+        return AIMessage(content=(
+            f"MODEL={self.model}\n"
+            f"TEMPERATURE={self.temperature}\n"
+            f"SYSTEM={system_message.content}\n"
+            f"HUMAN={human_message.content}\n"
+            "#Test"
+        ))
+
+
+def fake_llm_provider(model: str, temperature: float, max_tokens: int) -> FakeLLM:
+    return FakeLLM(model, temperature, max_tokens)
+
+
+def _template_state(template: LinkedInPromptTemplate) -> dict:
+    """Copia de los campos públicos de una plantilla y de su prompt compilado."""
+    fields = {name: copy.deepcopy(value) for name, value in vars(template).items() if not name.startswith("_")}
+    return {"fields": fields, "compiled": template.compile()}
+
+
+def test_concurrent_posts_with_mixed_styles_and_authors():
+    agent = LinkedInAgent(LinkedInPromptTemplate(), model="gpt-4o", llm_provider=fake_llm_provider)
+    agent_template = _template_state(agent.prompt_template)
+    style_templates = {style: _template_state(get_prompt_template_for_style(style)) for style in LinkedInPostStyle}
+
+    combinations = list(itertools.product(LinkedInPostStyle, LinkedInAuthor))
+    requests = [
+        LinkedInPostRequest(
+            tema=f"Tema {index} ({style.value}, {author.value})",
+            estilo=style,
+            autor=author,
+            temperature=round((index % 10) / 10, 1),
+            tone=f"Tono propio de la petición {index}" if index % 3 == 0 else None
+        )
+        for index, (style, author) in enumerate(combinations * 8)
+    ]
+
+    async def run():
+        return await asyncio.gather(*(agent.generate_post(request) for request in requests))
+
+    responses = asyncio.run(run())
+
+    assert len(responses) == len(requests)
+    for request, response in zip(requests, responses):
+        expected_model = agent._get_model_for_author(request.autor) if request.autor != LinkedInAuthor.DEFAULT else "gpt-4o"
+        style_template = get_prompt_template_for_style(request.estilo)
+
+        assert response.estilo == request.estilo.value
+        assert response.autor == request.autor.value
+        assert response.metadata["model_used"] == expected_model
+        assert response.metadata["temperature"] == request.temperature
+        assert f"MODEL={expected_model}\n" in response.texto
+        assert f"TEMPERATURE={request.temperature}\n" in response.texto
+        assert f"Tema: {request.tema}" in response.texto
+        assert style_template.role_description in response.texto
+        if request.tone is not None:
+            assert request.tone in response.texto
+
+        # Ninguna otra petición se ha colado en el prompt
+        other_topics = [other.tema for other in requests if other is not request]
+        assert not any(f"Tema: {topic}\n" in response.texto for topic in other_topics)
+
+    # Las plantillas compartidas no se han modificado
+    assert _template_state(agent.prompt_template) == agent_template
+    for style, state in style_templates.items():
+        assert _template_state(get_prompt_template_for_style(style)) == state
+    assert agent.model == "gpt-4o"
@@ -0,0 +1,181 @@
+import asyncio
+
+import pytest
+
+from common.models.job_models import JobStatus
+from common.services.job_queue import JobQueue, JobQueueFullError
+from common.services.job_store import InMemoryJobStore
+
+
+def _make_queue(workers: int = 1, max_queued: int = 10) -> JobQueue:
+    return JobQueue("test", InMemoryJobStore(), workers=workers, max_queued=max_queued, heartbeat=0.05)
+
+
+async def _wait_finished(queue: JobQueue, job_id: str, timeout: float = 2.0):
+    """Espera a que un trabajo termine y devuelve su estado final."""
+    async def poll():
+        while True:
+            job = await queue.get(job_id)
+            if job.status.is_terminal:
+                return job
+            await asyncio.sleep(0.005)
+    return await asyncio.wait_for(poll(), timeout)
+
+
+def test_slow_subscriber_receives_every_status_until_the_end():
+    async def run():
+        queue = _make_queue()
+
+        async def handler():
+            await asyncio.sleep(0.01)
+            return {"titulo": "Caso de éxito"}
+
+        try:
+            job = await queue.submit("success_case", handler)
+            events = queue.subscribe(job.job_id)
+            statuses = [(await events.__anext__())["data"]["status"]]
+
+            # El trabajo avanza y termina mientras el consumidor está suspendido en el yield
+            await _wait_finished(queue, job.job_id)
+            async for event in events:
+                if event["event"] == "status":
+                    statuses.append(event["data"]["status"])
+                    last = event["data"]
+            return statuses, last
+        finally:
+            await queue.close()
+
+    statuses, last = asyncio.run(run())
+
+    assert statuses == ["queued", "running", "succeeded"]
+    assert last["result"] == {"titulo": "Caso de éxito"}
+
+
+def test_subscribing_to_a_finished_job_returns_its_final_status():
+    async def run():
+        queue = _make_queue()
+        try:
+            job = await queue.submit("success_case", lambda: asyncio.sleep(0, result={"ok": True}))
+            await _wait_finished(queue, job.job_id)
+            return [event async for event in queue.subscribe(job.job_id)]
+        finally:
+            await queue.close()
+
+    events = asyncio.run(run())
+
+    assert [event["data"]["status"] for event in events] == ["succeeded"]
+
+
+def test_higher_priority_runs_first_and_equal_priority_in_arrival_order():
+    async def run():
+        queue = _make_queue(workers=1)
+        release = asyncio.Event()
+        order = []
+
+        def handler(name):
+            async def run_job():
+                if name == "bloqueante":
+                    await release.wait()
+                order.append(name)
+                return {}
+            return run_job
+
+        try:
+            blocker = await queue.submit("test", handler("bloqueante"))
+            await asyncio.sleep(0.01)
+            jobs = [
+                await queue.submit("test", handler("baja-1"), priority=0),
+                await queue.submit("test", handler("alta"), priority=5),
+                await queue.submit("test", handler("baja-2"), priority=0)
+            ]
+            release.set()
+            for job in [blocker, *jobs]:
+                await _wait_finished(queue, job.job_id)
+            return order
+        finally:
+            await queue.close()
+
+    assert asyncio.run(run()) == ["bloqueante", "alta", "baja-1", "baja-2"]
+
+
+def test_cancel_queued_and_running_jobs():
+    async def run():
+        queue = _make_queue(workers=1)
+        started = asyncio.Event()
+        ran = []
+
+        async def never_ends():
+            started.set()
+            await asyncio.Event().wait()
+
+        async def should_not_run():
+            ran.append(True)
+            return {}
+
+        try:
+            running = await queue.submit("test", never_ends)
+            queued = await queue.submit("test", should_not_run)
+            await started.wait()
+
+            await queue.cancel(queued.job_id)
+            await queue.cancel(running.job_id)
+            results = (
+                await _wait_finished(queue, running.job_id),
+                await _wait_finished(queue, queued.job_id)
+            )
+            # Dejar que el worker descarte la entrada del trabajo cancelado
+            await asyncio.sleep(0.01)
+            return results, ran, queue.get_stats()
+        finally:
+            await queue.close()
+
+    (running, queued), ran, stats = asyncio.run(run())
+
+    assert running.status == JobStatus.CANCELLED
+    assert queued.status == JobStatus.CANCELLED
+    assert ran == []
+    assert stats["cancelled"] == 2
+
+
+def test_failed_job_records_the_error():
+    async def run():
+        queue = _make_queue()
+
+        async def fails():
+            raise ValueError("PDF ilegible")
+
+        try:
+            job = await queue.submit("test", fails)
+            return await _wait_finished(queue, job.job_id)
+        finally:
+            await queue.close()
+
+    job = asyncio.run(run())
+
+    assert job.status == JobStatus.FAILED
+    assert job.error == "PDF ilegible"
+
+
+def test_submit_rejects_jobs_when_the_queue_is_full():
+    async def run():
+        queue = _make_queue(workers=1, max_queued=1)
+        started = asyncio.Event()
+
+        async def blocks():
+            started.set()
+            await asyncio.Event().wait()
+
+        try:
+            await queue.submit("test", blocks)
+            await started.wait()
+            await queue.submit("test", blocks)
+            with pytest.raises(JobQueueFullError):
+                await queue.submit("test", blocks)
+            return queue.get_stats()
+        finally:
+            await queue.close()
+
+    stats = asyncio.run(run())
+
+    assert stats["rejected"] == 1
+    assert stats["queued"] == 1
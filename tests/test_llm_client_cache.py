@@ -0,0 +1,21 @@
+import asyncio
+
+from common.services.llm_client_cache import LLMClientCache
+from core.metrics import llm_client_cache_evictions_total, llm_client_cache_size
+
+
+def test_evictions_and_size_are_exported_as_metrics():
+    cache = LLMClientCache(max_size=2)
+    evictions_before = sum(llm_client_cache_evictions_total._values.values())
+
+    first = cache.get_client("gpt-4o", 0.7, 2000, api_key="sk-test")
+    cache.get_client("gpt-4o", 0.2, 2000, api_key="sk-test")
+    assert cache.get_client("gpt-4o", 0.7, 2000, api_key="sk-test") is first
+    cache.get_client("gpt-4o-mini", 0.7, 2000, api_key="sk-test")
+
+    assert cache.get_stats()["evictions"] == 1
+    assert sum(llm_client_cache_evictions_total._values.values()) == evictions_before + 1
+    assert "llm_client_cache_size 2" in llm_client_cache_size.collect()
+
+    asyncio.run(cache.close())
+    assert "llm_client_cache_size 0" in llm_client_cache_size.collect()
@@ -0,0 +1,193 @@
+import asyncio
+import time
+
+from common.services.pdf_extraction import PDFExtractionPool, extract_page_range
+from common.services.tiered_cache import TieredCache
+from core.metrics import cache_requests_total
+
+PAGE_COUNT = 40
+LINES_PER_PAGE = 150
+
+
+def make_pdf(page_count: int = PAGE_COUNT, lines_per_page: int = LINES_PER_PAGE) -> bytes:
+    """
+    Construye un PDF de texto con varias páginas, sin dependencias adicionales.
+
+    Args:
+        page_count: Número de páginas
+        lines_per_page: Líneas de texto de cada página
+
+    Returns:
+        bytes: Documento PDF
+    """
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Árbol de páginas, se rellena al conocer los identificadores
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    ]
+    page_ids = []
+    for page in range(page_count):
+        lines = b"".join(
+            f"0 -10 Td (Pagina {page} linea {line} del caso de exito de ejemplo) Tj\n".encode("ascii")
+            for line in range(lines_per_page)
+        )
+        stream = b"BT /F1 8 Tf 20 800 Td\n" + lines + b"ET"
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, page_count)
+
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref_offset = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        pdf += b"%010d 00000 n \n" % offset
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(pdf)
+
+
+async def _measure_loop_lag(work) -> float:
+    """
+    Mide el mayor retraso del event loop mientras se ejecuta una tarea.
+
+    Args:
+        work: Corrutina a ejecutar
+
+    Returns:
+        float: Retraso máximo en segundos de un temporizador de 5 ms
+    """
+    max_lag = 0.0
+    running = True
+
+    async def ticker():
+        nonlocal max_lag
+        while running:
+            expected = time.perf_counter() + 0.005
+            await asyncio.sleep(0.005)
+            max_lag = max(max_lag, time.perf_counter() - expected)
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.02)
+    try:
+        await work
+    finally:
+        running = False
+        await ticker_task
+    return max_lag
+
+
+def test_iter_pages_returns_pages_in_order():
+    pdf_bytes = make_pdf(page_count=12, lines_per_page=5)
+    pool = PDFExtractionPool(max_workers=2, pages_per_task=4, max_chars=10 ** 6)
+
+    async def run():
+        try:
+            return [page async for page in pool.iter_pages(pdf_bytes)]
+        finally:
+            pool.shutdown()
+
+    pages = asyncio.run(run())
+
+    assert len(pages) == 12
+    for index, page in enumerate(pages):
+        assert f"Pagina {index} linea 0" in page
+
+
+def test_iter_pages_stops_at_character_budget():
+    pdf_bytes = make_pdf(page_count=12, lines_per_page=5)
+    page_chars = len(extract_page_range(pdf_bytes, 0, 1)[0])
+    pool = PDFExtractionPool(max_workers=2, pages_per_task=2, max_chars=3 * page_chars)
+
+    async def run():
+        try:
+            return [page async for page in pool.iter_pages(pdf_bytes)]
+        finally:
+            pool.shutdown()
+
+    pages = asyncio.run(run())
+
+    assert len(pages) == 3
+    assert pool.get_stats()["early_stops"] == 1
+
+
+def test_cache_hits_and_misses_are_exported_as_metrics():
+    pdf_bytes = make_pdf(page_count=4, lines_per_page=5)
+    cache = TieredCache("pdf_text_test", max_bytes=10 ** 6)
+    pool = PDFExtractionPool(max_workers=1, max_chars=10 ** 6, cache=cache)
+
+    async def run():
+        try:
+            first = [page async for page in pool.iter_pages(pdf_bytes)]
+            second = [page async for page in pool.iter_pages(pdf_bytes)]
+            return first, second
+        finally:
+            pool.shutdown()
+
+    first, second = asyncio.run(run())
+
+    assert first == second
+    assert pool.get_stats()["cache_hits"] == 1
+    samples = cache_requests_total.collect()
+    assert 'cache_requests_total{cache="pdf_text_test",result="miss"} 1' in samples
+    assert 'cache_requests_total{cache="pdf_text_test",result="hit"} 1' in samples
+
+
+def test_cache_is_written_when_the_budget_stops_extraction():
+    pdf_bytes = make_pdf(page_count=12, lines_per_page=5)
+    page_chars = len(extract_page_range(pdf_bytes, 0, 1)[0])
+    cache = TieredCache("pdf_text_budget_test", max_bytes=10 ** 6)
+    pool = PDFExtractionPool(max_workers=2, pages_per_task=2, max_chars=3 * page_chars, cache=cache)
+
+    async def run():
+        try:
+            # El consumidor deja de iterar en cuanto recibe la primera página del último rango
+            async for page in pool.iter_pages(pdf_bytes):
+                if "Pagina 2 " in page:
+                    break
+            return [page async for page in pool.iter_pages(pdf_bytes)]
+        finally:
+            pool.shutdown()
+
+    cached_pages = asyncio.run(run())
+
+    assert len(cached_pages) == 3
+    stats = pool.get_stats()
+    assert stats["cache_hits"] == 1
+    assert stats["early_stops"] == 1
+
+
+def test_event_loop_stays_responsive_while_parsing():
+    """Benchmark: latencia del event loop con el parseo en línea frente al pool de procesos."""
+    pdf_bytes = make_pdf()
+    pool = PDFExtractionPool(max_workers=2, max_chars=10 ** 7, timeout=60)
+
+    async def parse_inline():
+        extract_page_range(pdf_bytes, 0, PAGE_COUNT)
+
+    async def parse_in_pool():
+        return [page async for page in pool.iter_pages(pdf_bytes)]
+
+    async def run():
+        pool.start()
+        # Arrancar los procesos antes de medir
+        await parse_in_pool()
+        try:
+            inline_lag = await _measure_loop_lag(parse_inline())
+            pool_lag = await _measure_loop_lag(parse_in_pool())
+            return inline_lag, pool_lag
+        finally:
+            pool.shutdown()
+
+    inline_lag, pool_lag = asyncio.run(run())
+    print(f"\nRetraso máximo del event loop: en línea {inline_lag * 1000:.0f} ms, pool {pool_lag * 1000:.0f} ms")
+
+    assert pool_lag < inline_lag / 4
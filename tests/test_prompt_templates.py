@@ -0,0 +1,58 @@
+import timeit
+
+import pytest
+
+from linkedin.prompts.linkedin_prompts import LinkedInPromptTemplate
+
+ITERATIONS = 2000
+
+
+def test_compile_is_reused_until_a_field_changes():
+    template = LinkedInPromptTemplate()
+    compiled = template.compile()
+
+    assert template.compile() is compiled
+    assert compiled.system_message == template.get_system_message()
+
+    # Asignar el mismo valor no invalida la compilación
+    template.tone = template.tone
+    assert template.compile() is compiled
+
+    template.tone = "Tono cercano y directo"
+    recompiled = template.compile()
+    assert recompiled is not compiled
+    assert "Tono cercano y directo" in recompiled.system_message
+
+
+def test_frozen_template_rejects_changes_and_copies_keep_the_original():
+    template = LinkedInPromptTemplate().freeze()
+    compiled = template.compile()
+
+    with pytest.raises(AttributeError):
+        template.tone = "Otro tono"
+
+    variant = template.copy_with(tone="Otro tono")
+    assert "Otro tono" in variant.compile().system_message
+    assert template.compile() is compiled
+    assert template.copy_with().compile() is compiled
+
+
+def test_compiled_prompt_is_faster_than_rebuilding():
+    """Micro-benchmark: prompt compilado frente a reconstruirlo en cada llamada."""
+    template = LinkedInPromptTemplate()
+
+    def rebuild():
+        return template.get_system_message(), template.get_human_template()
+
+    def compiled():
+        return template.compile()
+
+    assert compiled() == template.compile()
+    rebuild_time = min(timeit.repeat(rebuild, number=ITERATIONS, repeat=3))
+    compiled_time = min(timeit.repeat(compiled, number=ITERATIONS, repeat=3))
+    print(
+        f"\n{ITERATIONS} prompts: reconstruido {rebuild_time * 1000:.1f} ms, "
+        f"compilado {compiled_time * 1000:.1f} ms ({rebuild_time / compiled_time:.0f}x)"
+    )
+
+    assert compiled_time * 5 < rebuild_time
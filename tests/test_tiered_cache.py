@@ -0,0 +1,75 @@
+import os
+import time
+
+from common.services import tiered_cache
+from common.services.tiered_cache import TieredCache
+
+
+def _disk_files(path):
+    return sorted(name for name in os.listdir(path) if name.endswith(".zst"))
+
+
+def test_disk_tier_evicts_oldest_files_over_the_limit(tmp_path):
+    cache = TieredCache("test", max_bytes=10 ** 6, disk_dir=str(tmp_path))
+    cache.set("clave-0", {"text": os.urandom(2000).hex()})
+    cache.max_disk_bytes = int(cache.get_stats()["disk_bytes"] * 2.5)
+
+    for index in range(1, 5):
+        cache.set(f"clave-{index}", {"text": os.urandom(2000).hex()})
+
+    stats = cache.get_stats()
+    assert stats["disk_bytes"] <= cache.max_disk_bytes
+    assert stats["disk_entries"] == 2
+    assert stats["disk_evictions"] == 3
+    assert len(_disk_files(tmp_path)) == 2
+
+    # Las más recientes siguen en disco; las más antiguas ya no
+    cache.clear()
+    assert cache.get("clave-4") is not None
+    assert cache.get("clave-0") is None
+
+
+def test_expired_disk_entries_are_deleted_on_read(tmp_path):
+    cache = TieredCache("test", max_bytes=10 ** 6, ttl=60, disk_dir=str(tmp_path))
+    entry = cache.set("clave", {"text": "hola"})
+    cache.clear()
+
+    entry.expires_at = time.time() - 1
+    cache._write_disk("clave", entry)
+
+    assert cache.get("clave", allow_stale=True) is None
+    assert _disk_files(tmp_path) == []
+    assert cache.get_stats()["disk_expired"] == 1
+
+
+def test_stale_entries_are_kept_for_revalidation(tmp_path):
+    cache = TieredCache("test", max_bytes=10 ** 6, ttl=60, disk_dir=str(tmp_path), stale_ttl=3600)
+    entry = cache.set("clave", {"text": "hola"})
+    cache.clear()
+
+    entry.expires_at = time.time() - 1
+    cache._write_disk("clave", entry)
+
+    stale = cache.get("clave", allow_stale=True)
+    assert stale is not None and not stale.is_fresh()
+
+
+def test_periodic_sweep_and_restart_index(tmp_path, monkeypatch):
+    cache = TieredCache("test", max_bytes=10 ** 6, ttl=60, disk_dir=str(tmp_path))
+    cache.set("caducada", {"text": "vieja"}, ttl=-1)
+    cache.set("vigente", {"text": "nueva"})
+    (tmp_path / "interrumpida.tmp").write_bytes(b"x")
+
+    # Un nuevo proceso indexa lo que hay en disco y descarta los temporales
+    restarted = TieredCache("test", max_bytes=10 ** 6, ttl=60, disk_dir=str(tmp_path))
+    assert restarted.get_stats()["disk_entries"] == 2
+    assert not (tmp_path / "interrumpida.tmp").exists()
+
+    # El barrido periódico se hace al escribir una vez pasado el intervalo
+    monkeypatch.setattr(tiered_cache, "DISK_SWEEP_INTERVAL", 0)
+    cache.set("otra", {"text": "más"})
+
+    assert len(_disk_files(tmp_path)) == 2
+    assert cache.get_stats()["disk_expired"] == 1
+    cache.clear()
+    assert cache.get("vigente") is not None
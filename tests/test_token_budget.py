@@ -0,0 +1,116 @@
+import pytest
+
+from common.utils.helpers import TokenCounter, token_counter
+from common.utils.token_budget import ContextItem, TokenBudgetPlanner, get_context_window
+from core.config import settings
+
+CHARS_PER_TOKEN = TokenCounter.CHARS_PER_TOKEN_ESTIMATE
+
+
+@pytest.fixture(autouse=True)
+def char_based_tokens(monkeypatch):
+    """Cuenta los tokens por caracteres para que los repartos sean exactos y no haga falta red."""
+    monkeypatch.setattr(token_counter, "_try_encoding", lambda model: None)
+
+
+def _text(tokens: int, char: str = "a") -> str:
+    """Texto que ocupa exactamente el número de tokens indicado."""
+    return char * (tokens * CHARS_PER_TOKEN)
+
+
+def _planner(available: int, max_output_tokens: int = 100, safety_margin: int = 10) -> TokenBudgetPlanner:
+    """Planificador cuyo espacio para contexto, sin prompt fijo, es `available` tokens."""
+    fixed = TokenBudgetPlanner("gpt-4o", max_output_tokens, context_window=10 ** 6, safety_margin=safety_margin).plan([], [])
+    return TokenBudgetPlanner(
+        "gpt-4o",
+        max_output_tokens,
+        context_window=available + max_output_tokens + safety_margin + fixed.fixed_tokens,
+        safety_margin=safety_margin
+    )
+
+
+def test_items_that_fit_are_kept_whole():
+    items = [ContextItem(key="url:0", text=_text(30)), ContextItem(key="url:1", text=_text(50))]
+
+    plan = _planner(available=100).plan([], items)
+
+    assert plan.trimmed == []
+    assert plan.texts == {item.key: item.text for item in items}
+    assert plan.used_tokens == 80
+
+
+def test_equal_priority_items_share_the_remainder():
+    items = [
+        ContextItem(key="corto", text=_text(20)),
+        ContextItem(key="largo-1", text=_text(200, "b")),
+        ContextItem(key="largo-2", text=_text(300, "c"))
+    ]
+
+    plan = _planner(available=120).plan([], items)
+
+    # El corto entra completo y los largos se reparten a partes iguales lo que sobra
+    assert plan.texts["corto"] == items[0].text
+    assert plan.texts["largo-1"] == _text(50, "b")
+    assert plan.texts["largo-2"] == _text(50, "c")
+    assert plan.trimmed == ["largo-1", "largo-2"]
+
+
+def test_higher_priority_items_are_allocated_first():
+    items = [
+        ContextItem(key="contenido", text=_text(200)),
+        ContextItem(key="aviso", text=_text(10, "e"), priority=1)
+    ]
+
+    plan = _planner(available=50).plan([], items)
+
+    assert plan.texts["aviso"] == items[1].text
+    assert plan.texts["contenido"] == _text(40)
+
+
+def test_output_and_safety_margin_are_reserved():
+    system_message = _text(40, "s")
+    human_message = _text(60, "h")
+    planner = TokenBudgetPlanner("gpt-4o", max_output_tokens=500, context_window=2000, safety_margin=100)
+
+    plan = planner.plan([human_message], [ContextItem(key="pdf", text=_text(5000))], static_texts=[system_message])
+
+    assert plan.fixed_tokens > 100
+    assert plan.available_tokens == 2000 - 500 - 100 - plan.fixed_tokens
+    assert plan.used_tokens == plan.available_tokens
+    assert plan.texts["pdf"] == _text(plan.available_tokens)
+
+
+def test_fixed_prompt_larger_than_the_window_leaves_no_context():
+    planner = TokenBudgetPlanner("gpt-4o", max_output_tokens=500, context_window=1000, safety_margin=0)
+
+    plan = planner.plan([_text(800)], [ContextItem(key="url:0", text=_text(10))])
+
+    assert plan.available_tokens == 0
+    assert plan.texts["url:0"] == ""
+    assert plan.trimmed == ["url:0"]
+
+
+def test_context_window_by_model():
+    assert get_context_window("gpt-4o-2024-08-06") == 128000
+    assert get_context_window("gpt-4") == 8192
+    assert get_context_window("ft:gpt-4o-pablo-linkedin-20250320") == 128000
+    assert get_context_window("modelo-desconocido") == settings.DEFAULT_CONTEXT_WINDOW
+    assert TokenBudgetPlanner("modelo-desconocido", 100).context_window == settings.DEFAULT_CONTEXT_WINDOW
+
+
+def test_pdf_pages_are_kept_in_order_until_the_budget_runs_out():
+    # Igual que SuccessCaseBlogAgent: las primeras páginas tienen más prioridad
+    pages = [ContextItem(key=f"page:{index}", text=_text(40, str(index)), priority=-index) for index in range(6)]
+
+    plan = _planner(available=130).plan([], pages)
+
+    assert [plan.texts[f"page:{index}"] for index in range(3)] == [page.text for page in pages[:3]]
+    assert plan.texts["page:3"] == _text(10, "3")
+    assert plan.texts["page:4"] == plan.texts["page:5"] == ""
+    assert plan.trimmed == ["page:3", "page:4", "page:5"]
+
+
+def test_counter_estimates_by_characters_without_encoding():
+    assert token_counter.count(_text(7) + "a", "gpt-4o") == 8
+    assert token_counter.truncate(_text(10), "gpt-4o", 4) == _text(4)
+    assert token_counter.truncate(_text(10), "gpt-4o", 0) == ""
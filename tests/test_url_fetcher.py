@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from common.services.url_fetcher import AsyncURLFetcher
+
+# Latencia simulada de cada página de referencia
+STUB_DELAY = 0.3
+URL_COUNT = 5
+
+
+class SlowPageHandler(BaseHTTPRequestHandler):
+    """Sirve una página HTML sencilla tras una espera fija."""
+
+    def do_GET(self):
+        time.sleep(STUB_DELAY)
+        body = f"<html><body><script>ignorar()</script><p>Página {self.path}</p></body></html>".encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def stub_urls():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowPageHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    yield [f"http://{host}:{port}/ref-{index}" for index in range(URL_COUNT)]
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_many_returns_partial_results_in_order(stub_urls):
+    async def run():
+        fetcher = AsyncURLFetcher(per_host_limit=URL_COUNT)
+        try:
+            return await fetcher.fetch_many([*stub_urls, "http://127.0.0.1:1/cerrado"])
+        finally:
+            await fetcher.close()
+
+    results = asyncio.run(run())
+
+    assert [result.url for result in results[:-1]] == stub_urls
+    for index, result in enumerate(results[:-1]):
+        assert result.error is None
+        assert f"Página /ref-{index}" in result.content
+        assert "ignorar" not in result.content
+    assert results[-1].content is None and results[-1].error
+
+
+def test_host_semaphores_are_dropped_once_idle(stub_urls):
+    async def run():
+        fetcher = AsyncURLFetcher(per_host_limit=2)
+        try:
+            task = asyncio.create_task(fetcher.fetch_many(stub_urls))
+            await asyncio.sleep(STUB_DELAY / 2)
+            during = dict(fetcher._host_users)
+            await task
+            return during, fetcher._host_semaphores, fetcher._host_users
+        finally:
+            await fetcher.close()
+
+    during, semaphores, users = asyncio.run(run())
+
+    # Las cinco descargas comparten el semáforo de su host mientras están en curso o en espera
+    assert list(during.values()) == [URL_COUNT]
+    assert semaphores == {} and users == {}
+
+
+def test_fetch_many_costs_one_round_trip(stub_urls):
+    """Benchmark: varias URLs en paralelo frente a la descarga una tras otra."""
+    async def run():
+        fetcher = AsyncURLFetcher(per_host_limit=URL_COUNT)
+        try:
+            started_at = time.perf_counter()
+            for url in stub_urls:
+                await fetcher.fetch(url)
+            sequential = time.perf_counter() - started_at
+
+            started_at = time.perf_counter()
+            results = await fetcher.fetch_many(stub_urls)
+            concurrent = time.perf_counter() - started_at
+            return sequential, concurrent, results
+        finally:
+            await fetcher.close()
+
+    sequential, concurrent, results = asyncio.run(run())
+    print(f"\n{URL_COUNT} URLs: secuencial {sequential:.2f}s, en paralelo {concurrent:.2f}s ({sequential / concurrent:.1f}x)")
+
+    assert all(result.error is None for result in results)
+    assert sequential >= URL_COUNT * STUB_DELAY
+    assert concurrent < 2 * STUB_DELAY